@@ -4,3 +4,20 @@ from . import utils
 from . import progress
 from . import scroller
 from . import tweet
+from . import js_engine
+from . import locators
+from . import offline
+from . import pipeline
+from . import record
+from . import cache
+from . import enrich
+from . import resolver
+from . import normalize
+from . import dedup
+from . import watermark
+from . import waits
+from . import graphql
+from . import ratelimit
+from . import pool
+from . import accounts
+from . import run
@@ -3,6 +3,8 @@ import sys
 import argparse
 import getpass
 from twitter_scraper import Twitter_Scraper
+from pool import ScraperPool
+from accounts import AccountPool
 
 try:
     from dotenv import load_dotenv
@@ -160,6 +162,110 @@ def main():
             choices=["chrome", "firefox"],
         )
 
+        parser.add_argument(
+            "--engine",
+            type=str,
+            default="webdriver",
+            help="Tweet extraction engine. [webdriver/js/batch/observer/snapshot/graphql]",
+            choices=["webdriver", "js", "batch", "observer", "snapshot", "graphql"],
+        )
+
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Parser processes for the snapshot engine (default: CPU count).",
+        )
+
+        parser.add_argument(
+            "--fields",
+            type=str,
+            default=None,
+            help="Comma-separated tweet fields to scrape and save, e.g. tweet_id,handle,date_time,content (default: all).",
+        )
+
+        parser.add_argument(
+            "--records",
+            action="store_true",
+            help="Keep scraped tweets as compact records (less memory on long runs; counts are saved as numbers).",
+        )
+
+        parser.add_argument(
+            "--poster_workers",
+            type=int,
+            default=0,
+            help="Extra logged in browsers fetching poster details (-a pd) from profile pages, each loading pages with the same account; 0 hovers every tweet instead (default: 0).",
+        )
+
+        parser.add_argument(
+            "--poster_cache",
+            type=str,
+            default=None,
+            help="SQLite file caching poster details (-a pd) between runs.",
+        )
+
+        parser.add_argument(
+            "--normalize",
+            action="store_true",
+            help="Save counts as numbers, dates as timestamps and add the tweet time decoded from its id.",
+        )
+
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Stop once the tweets scraped by the previous run on the same page are reached.",
+        )
+
+        parser.add_argument(
+            "--prune",
+            type=str,
+            default=None,
+            choices=["remove", "spacer"],
+            help="Drop scraped tweets from the page once scrolled past, keeping browser memory flat on long runs: remove them, or leave a spacer of the same height.",
+        )
+
+        parser.add_argument(
+            "--speed",
+            type=str,
+            default="normal",
+            choices=["safe", "normal", "fast"],
+            help="Timeouts of the readiness checks and length of deliberate delays (default: normal).",
+        )
+
+        parser.add_argument(
+            "--budget",
+            type=int,
+            default=None,
+            help="Scroll steps per 15 minutes to pace the account to, a page load counting as 5; the pace lowers itself when rate limited (default: no pacing).",
+        )
+
+        parser.add_argument(
+            "--targets",
+            type=str,
+            default=None,
+            help="File of URLs to scrape (profiles, searches...), one per line, in parallel browsers; tweets are saved to one JSONL file.",
+        )
+
+        parser.add_argument(
+            "--pool_workers",
+            type=int,
+            default=None,
+            help="Browsers scraping --targets at once (default: as many as CPUs and memory allow).",
+        )
+
+        parser.add_argument(
+            "--accounts",
+            type=str,
+            default=None,
+            help="File of accounts to scrape with, one username:password per line, instead of --user/--password; a throttled account is swapped for a rested one.",
+        )
+
+        parser.add_argument(
+            "--selector_stats",
+            action="store_true",
+            help="Print hit/miss counts and latency of every selector after scraping.",
+        )
+
         args = parser.parse_args()
 
         USER_MAIL = args.mail
@@ -167,10 +273,16 @@ def main():
         USER_PASSWORD = args.password
         HEADLESS_MODE= args.headlessState
 
-        if USER_UNAME is None:
+        accounts = None
+        if args.accounts is not None:
+            # leased from the pool
+            accounts = AccountPool(args.accounts)
+            USER_UNAME = USER_PASSWORD = None
+
+        if USER_UNAME is None and accounts is None:
             USER_UNAME = input("Twitter Username: ")
 
-        if USER_PASSWORD is None:
+        if USER_PASSWORD is None and accounts is None:
             USER_PASSWORD = getpass.getpass("Enter Password: ")
 
         if HEADLESS_MODE is None:
@@ -193,6 +305,8 @@ def main():
 
         additional_data: list = args.add.split(",")
 
+        fields = args.fields.split(",") if args.fields is not None else None
+
         if len(tweet_type_args) > 1:
             print("Please specify only one of --username, --hashtag, --bookmarks, or --query.")
             sys.exit(1)
@@ -201,16 +315,65 @@ def main():
             print("Please specify either --latest or --top. Not both.")
             sys.exit(1)
 
+        if args.engine == "graphql" and args.browser != "chrome":
+            print("The graphql engine needs --browser=chrome.")
+            sys.exit(1)
+
         if args.mode == "conversation" and args.url is None:
             print("Please specify a conversation URL to scrape.")
             sys.exit(1)
 
-        if USER_UNAME is not None and USER_PASSWORD is not None:
+        if args.targets is not None and args.records:
+            # the pool writes each target's tweets as it is done, keeping none
+            print("--records has no effect with --targets: tweets are written as each target is done.")
+            sys.exit(1)
+
+        has_account = accounts is not None or (USER_UNAME is not None and USER_PASSWORD is not None)
+
+        if has_account and args.targets is not None:
+            with open(args.targets, "r", encoding="utf-8") as f:
+                targets = [line.strip() for line in f if line.strip()]
+            pool = ScraperPool(
+                scraper_kwargs=dict(
+                    username=USER_UNAME,
+                    password=USER_PASSWORD,
+                    headlessState=HEADLESS_MODE,
+                    browser=args.browser,
+                    poster_cache_path=args.poster_cache,
+                    speed=args.speed,
+                    network_log=args.engine == "graphql",
+                    budget=args.budget,
+                    accounts=accounts,
+                ),
+                scrape_kwargs=dict(
+                    max_tweets=args.tweets,
+                    no_tweets_limit=args.no_tweets_limit if args.no_tweets_limit is not None else True,
+                    scrape_poster_details="pd" in additional_data,
+                    engine=args.engine,
+                    workers=args.workers,
+                    fields=fields,
+                    poster_workers=args.poster_workers,
+                    incremental=args.incremental,
+                    prune=args.prune,
+                ),
+                workers=args.pool_workers,
+                normalize=args.normalize,
+            )
+            pool.run(targets)
+            print(pool.summary())
+            if accounts is not None:
+                print(accounts.summary())
+        elif has_account:
             scraper = Twitter_Scraper(
                 username=USER_UNAME,
                 password=USER_PASSWORD,
                 headlessState=HEADLESS_MODE,
                 browser=args.browser,
+                poster_cache_path=args.poster_cache,
+                speed=args.speed,
+                network_log=args.engine == "graphql",
+                budget=args.budget,
+                accounts=accounts,
             )
             scraper.login()
             if args.mode == "timeline":
@@ -219,6 +382,13 @@ def main():
                     no_tweets_limit= args.no_tweets_limit if args.no_tweets_limit is not None else True,
                     mode=args.mode,
                     scrape_poster_details="pd" in additional_data,
+                    engine=args.engine,
+                    workers=args.workers,
+                    fields=fields,
+                    return_type="record" if args.records else "dict",
+                    poster_workers=args.poster_workers,
+                    incremental=args.incremental,
+                    prune=args.prune,
                 )
             elif args.mode == "conversation":
                 data = scraper.scrape_tweets(
@@ -226,14 +396,23 @@ def main():
                     no_tweets_limit= args.no_tweets_limit if args.no_tweets_limit is not None else True,
                     mode=args.mode,
                     scrape_poster_details="pd" in additional_data,
-                    url=args.url
+                    url=args.url,
+                    engine=args.engine,
+                    workers=args.workers,
+                    fields=fields,
+                    return_type="record" if args.records else "dict",
+                    poster_workers=args.poster_workers,
+                    incremental=args.incremental,
+                    prune=args.prune,
                 )
             else:
                 raise ValueError("Invalid mode:", args.mode)
+            if args.selector_stats:
+                scraper.print_selector_stats()
             if args.save_mode == "csv":
-                scraper.save_to_csv(data)
+                scraper.save_to_csv(data, normalize=args.normalize)
             elif args.save_mode == "jsonl":
-                scraper.save_to_jsonl(data)
+                scraper.save_to_jsonl(data, normalize=args.normalize)
             else:
                 raise ValueError("Invalid save mode:", args.save_mode)
             if not scraper.interrupted:
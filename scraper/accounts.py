@@ -0,0 +1,138 @@
+import os
+from time import time
+
+from .ratelimit import Cooldowns
+
+# health of an account, kept with its rate limit state
+HEALTHY = "ok"
+CHALLENGED = "challenged"  # asked to confirm its identity at login
+FAILED = "failed"  # could not log in
+
+# how long a failed login keeps an account out, doubled for each failure
+# in a row: the cause may have been the connection, not the account
+FAILED_RETRY = 30 * 60
+FAILED_RETRY_CAP = 24 * 3600
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (OSError, ValueError):
+        # it exists, owned by someone else (or no way to tell here)
+        return True
+    return True
+
+
+class AccountPool:
+    """
+    Accounts a job can scrape with, read from a file of username:password
+    lines (blank lines and # comments are skipped).
+
+    Their health, last throttle and cooldown are kept with their rate limit
+    state (see ratelimit.Cooldowns), shared by every scraper using the same
+    state file, in any process. lease() hands out the account best rested
+    among those not leased already and not cooling down (challenged ones,
+    then those that failed to log in, last); an account that failed to log
+    in is left out for a while, longer after each failure in a row, and an
+    account leased by a process that is gone is free again.
+    """
+
+    def __init__(self, path: str, state_path: str = "./tweets/rate_limits.json") -> None:
+        self.path = path
+        self.cooldowns = Cooldowns(state_path)
+        self.accounts = {}  # username -> password
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                username, separator, password = line.partition(":")
+                if not separator:
+                    raise ValueError(f"Invalid account line (username:password): {username}")
+                self.accounts[username.strip()] = password.strip()
+        if not self.accounts:
+            raise ValueError(f"No accounts in {path}")
+
+    def _free(self, state: dict) -> bool:
+        leased_by = state.get("leased_by")
+        return leased_by is None or not _alive(leased_by)
+
+    def _ready_at(self, state: dict) -> float:
+        # epoch time the account can be used again
+        ready_at = state.get("until", 0)
+        if state.get("health") == FAILED:
+            retry = FAILED_RETRY * 2 ** (state.get("failures", 1) - 1)
+            ready_at = max(ready_at, state.get("failed_at", 0) + min(retry, FAILED_RETRY_CAP))
+        return ready_at
+
+    def lease(self) -> dict | None:
+        """{"username", "password"} of an account ready to use, None if there is none"""
+        now = time()
+        with self.cooldowns.locked() as states:
+            ready = [
+                username for username in self.accounts
+                if self._ready_at(states.get(username, {})) <= now
+                and self._free(states.get(username, {}))
+            ]
+            if not ready:
+                return None
+            order = {HEALTHY: 0, CHALLENGED: 1, FAILED: 2}
+            username = min(ready, key=lambda username: (
+                order.get(states.get(username, {}).get("health", HEALTHY), 0),
+                states.get(username, {}).get("strikes", 0),
+                states.get(username, {}).get("until", 0),
+            ))
+            states[username] = {**states.get(username, {}), "leased_by": os.getpid()}
+        return {"username": username, "password": self.accounts[username]}
+
+    def release(self, username: str, health: str | None = None) -> None:
+        with self.cooldowns.locked() as states:
+            state = states.get(username, {})
+            state.pop("leased_by", None)
+            if health is not None:
+                state["health"] = health
+            states[username] = state
+
+    def report(self, username: str, health: str) -> None:
+        """Records how the account's last login went"""
+        with self.cooldowns.locked() as states:
+            state = {**states.get(username, {}), "health": health}
+            if health == FAILED:
+                state["failures"] = state.get("failures", 0) + 1
+                state["failed_at"] = time()
+            else:
+                state.pop("failures", None)
+                state.pop("failed_at", None)
+            states[username] = state
+
+    def next_ready(self) -> float | None:
+        """Seconds before a free account is done cooling down, None if none will"""
+        now = time()
+        states = {username: self.cooldowns.get(username) for username in self.accounts}
+        waits = [
+            max(0.0, self._ready_at(state) - now)
+            for state in states.values()
+            if self._free(state)
+        ]
+        return min(waits) if waits else None
+
+    def summary(self) -> str:
+        now = time()
+        lines = []
+        for username in self.accounts:
+            state = self.cooldowns.get(username)
+            status = state.get("health", HEALTHY)
+            if state["until"] > now:
+                left = int(state["until"] - now)
+                status += ", cooling down for {}:{:02d}".format(left // 60, left % 60)
+            elif self._ready_at(state) > now:
+                left = int(self._ready_at(state) - now)
+                status += ", retried in {}:{:02d}".format(left // 60, left % 60)
+            if not self._free(state):
+                status += ", leased"
+            if state.get("last_throttle"):
+                status += ", last throttled " + state["last_throttle"]
+            lines.append(f"{username}: {status}")
+        return "\n".join(lines)
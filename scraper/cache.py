@@ -0,0 +1,194 @@
+import atexit
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from time import monotonic, time
+
+
+class Cache:
+    """
+    LRU cache whose entries expire ttl seconds after they were set.
+
+    With path, entries are also written to a SQLite file (one table shared
+    by every cache, keyed by name) so that they survive between runs;
+    values must then be JSON serializable. Writes are batched: they go to
+    the file every flush_every changes or flush_interval seconds, and on
+    close (or at exit, when the cache was not closed). The file keeps at most maxsize entries per cache too, dropping
+    those least recently set or loaded, in batches once it has grown a
+    tenth past it (and down to maxsize on close).
+    Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = 10_000,
+        ttl: float = 24 * 3600,
+        path: str | None = None,
+        flush_every: int = 500,
+        flush_interval: float = 5.0,
+    ) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (expires, value)
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.db = None
+        if path is not None:
+            self.db = sqlite3.connect(path, check_same_thread=False)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "name TEXT, key TEXT, value TEXT, expires REAL, used REAL, "
+                "PRIMARY KEY (name, key))"
+            )
+            columns = [row[1] for row in self.db.execute("PRAGMA table_info(cache)")]
+            if "used" not in columns:
+                # file written before entries were evicted on disk
+                self.db.execute("ALTER TABLE cache ADD COLUMN used REAL DEFAULT 0")
+            self.db.execute("CREATE INDEX IF NOT EXISTS cache_used ON cache (name, used)")
+            self.db.execute(
+                "DELETE FROM cache WHERE name = ? AND expires <= ?", (name, time())
+            )
+            self.db.commit()
+            self.rows = self._count()
+            # a run interrupted before close() keeps its pending writes
+            atexit.register(self.close)
+        # rows the file can grow past maxsize before some are evicted
+        self.slack = max(1, maxsize // 10)
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.flushed = monotonic()
+        # changes not written to the file yet
+        self.pending = {}  # key -> (expires, value, used)
+        self.used = {}  # key -> last loaded
+        self.deleted = set()
+
+    def _count(self) -> int:
+        return self.db.execute(
+            "SELECT COUNT(*) FROM cache WHERE name = ?", (self.name,)
+        ).fetchone()[0]
+
+    def _load(self, key: str):
+        if key in self.pending:
+            expires, value, _ = self.pending[key]
+            return expires, value
+        if key in self.deleted:
+            return None
+        row = self.db.execute(
+            "SELECT expires, value FROM cache WHERE name = ? AND key = ?",
+            (self.name, key),
+        ).fetchone()
+        if row is None:
+            return None
+        self.used[key] = time()
+        self._changed()
+        return row[0], json.loads(row[1])
+
+    def _delete(self, key: str) -> None:
+        self.entries.pop(key, None)
+        if self.db is not None:
+            self.pending.pop(key, None)
+            self.used.pop(key, None)
+            self.deleted.add(key)
+            self._changed()
+
+    def _changed(self) -> None:
+        changes = len(self.pending) + len(self.used) + len(self.deleted)
+        if changes >= self.flush_every or monotonic() - self.flushed >= self.flush_interval:
+            self._flush()
+
+    def _flush(self) -> None:
+        # one transaction, none left open in between: other processes can
+        # write to the file too
+        if self.pending or self.used or self.deleted:
+            with self.db:
+                self.db.executemany(
+                    "DELETE FROM cache WHERE name = ? AND key = ?",
+                    [(self.name, key) for key in self.deleted],
+                )
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO cache (name, key, value, expires, used) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (self.name, key, json.dumps(value), expires, used)
+                        for key, (expires, value, used) in self.pending.items()
+                    ],
+                )
+                self.db.executemany(
+                    "UPDATE cache SET used = ? WHERE name = ? AND key = ?",
+                    [(used, self.name, key) for key, used in self.used.items()],
+                )
+            # at most: some may have replaced rows
+            self.rows += len(self.pending)
+            self.pending.clear()
+            self.used.clear()
+            self.deleted.clear()
+        self.flushed = monotonic()
+        if self.rows > self.maxsize + self.slack:
+            self._evict()
+
+    def _evict(self) -> None:
+        with self.db:
+            self.db.execute(
+                "DELETE FROM cache WHERE name = ? AND key IN ("
+                "SELECT key FROM cache WHERE name = ? "
+                "ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                (self.name, self.name, self.maxsize),
+            )
+        self.rows = self._count()
+
+    def get(self, key: str, default=None):
+        """Returns the cached value, or default if key is missing or expired"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None and self.db is not None:
+                entry = self._load(key)
+                if entry is not None:
+                    self.entries[key] = entry
+                    while len(self.entries) > self.maxsize:
+                        self.entries.popitem(last=False)
+            if entry is None or entry[0] <= time():
+                if entry is not None:
+                    self._delete(key)
+                self.misses += 1
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value, ttl: float | None = None) -> None:
+        """ttl overrides the cache's default for this entry"""
+        expires = time() + (self.ttl if ttl is None else ttl)
+        with self.lock:
+            self.entries[key] = (expires, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+            if self.db is not None:
+                self.deleted.discard(key)
+                self.used.pop(key, None)
+                self.pending[key] = (expires, value, time())
+                self._changed()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def summary(self) -> str:
+        return "{} cache: {} hits, {} misses ({:.0%} hit rate)".format(
+            self.name, self.hits, self.misses, self.hit_rate
+        )
+
+    def close(self) -> None:
+        with self.lock:
+            if self.db is not None:
+                self._flush()
+                if self.rows > self.maxsize:
+                    self._evict()
+                self.db.close()
+                self.db = None
+                atexit.unregister(self.close)
@@ -1,18 +1,51 @@
 import re
+from time import perf_counter
 
 from selenium.common.exceptions import NoSuchElementException
 from selenium.webdriver.remote.webelement import WebElement
 
+from .locators import get as selector
+
 
 class Card:
-    def __init__(self, card: WebElement):
+    # field -> method scraping it, for cards created with lazy=True
+    LAZY_FIELDS = {
+        "error": "_scrape_basics",
+        "user": "_scrape_user",
+        "handle": "_scrape_handle",
+        "date_time": "_scrape_datetime",
+        "is_ad": "_scrape_datetime",
+        "poster_details": "_scrape_poster",
+        "content": "_scrape_content",
+        "truncated": "_scrape_content",
+        "reply_cnt": "_scrape_engagement_counts",
+        "retweet_cnt": "_scrape_engagement_counts",
+        "like_cnt": "_scrape_engagement_counts",
+        "analytics_cnt": "_scrape_engagement_counts",
+        "tags": "_scrape_tags_mentions_emojis",
+        "mentions": "_scrape_tags_mentions_emojis",
+        "emojis": "_scrape_tags_mentions_emojis",
+        "tweet_link": "_scrape_tweet_link",
+        "tweet_id": "_scrape_tweet_link",
+        "videos": "_scrape_videos",
+        "image_urls": "_scrape_images",
+    }
+
+    def __init__(self, card: WebElement, lazy: bool = False):
         self.card = card
+        self.lazy = lazy
+        self.extraction_time = 0.0
+        self._fetching = False
+        if lazy:
+            # fields are scraped on first access, see __getattr__
+            return
         # initialize all variables to None
         self.error = False
         self.user = None
         self.handle = None
         self.date_time = None
         self.content = None
+        self.truncated = None
         self.tags = None
         self.mentions = None
         self.emojis = None
@@ -29,27 +62,56 @@ class Card:
         self.media_count = None
         self.poster_details = None
 
+    def __getattr__(self, name: str):
+        # only reached for attributes that are not set yet, i.e. the fields of
+        # a lazy card that have not been accessed. The scraped value is stored
+        # on the instance, so the next access does not come back here.
+        if not self.__dict__.get("lazy") or name not in self.LAZY_FIELDS:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            )
+        outermost = not self._fetching
+        self._fetching = True
+        start = perf_counter()
+        try:
+            getattr(self, self.LAZY_FIELDS[name])()
+        finally:
+            if outermost:
+                # scrapers reading other lazy fields are timed only once
+                self._fetching = False
+                self.extraction_time += perf_counter() - start
+        return self.__dict__.get(name)
+
+    def _apply(self, record: dict):
+        # populate fields from a record built outside of WebDriver
+        # (in-page script or offline parser) instead of scraping them
+        self.error = record["error"]
+        self.is_ad = record["is_ad"]
+        for field in (
+            "user", "handle", "date_time", "content", "truncated", "tags", "mentions",
+            "emojis", "tweet_link", "tweet_id", "reply_cnt", "retweet_cnt",
+            "like_cnt", "analytics_cnt", "image_urls", "videos",
+        ):
+            setattr(self, field, record.get(field))
+        self.poster_details.update(record["poster_details"])
+
     def _scrape_user(self):
         try:
-            self.user = self.card.find_element(
-                "xpath", './/div[@data-testid="User-Name"]//span'
-            ).text
+            self.user = selector("user").find(self.card).text
         except NoSuchElementException:
             self.error = True
             self.user = "skip"
 
     def _scrape_handle(self):
         try:
-            self.handle = self.card.find_element(
-                "xpath", './/span[contains(text(), "@")]'
-            ).text
+            self.handle = selector("handle").find(self.card).text
         except NoSuchElementException:
             self.error = True
             self.handle = "skip"
 
     def _scrape_datetime(self):
         try:
-            self.date_time = self.card.find_element("xpath", ".//time").get_attribute(
+            self.date_time = selector("time").find(self.card).get_attribute(
                 "datetime"
             )
             if self.date_time is not None:
@@ -59,21 +121,33 @@ class Card:
             self.error = True
             self.date_time = "skip"
 
+    def _scrape_basics(self):
+        self.error = False
+        self._scrape_user()
+        self._scrape_handle()
+        self._scrape_datetime()
+
+    def _scrape_poster(self):
+        self.poster_details = {}
+        self._scrape_verification()
+        self._scrape_profile_image()
+
     def _scrape_verification(self):
         try:
-            self.card.find_element(
-                "xpath", './/*[local-name()="svg" and @data-testid="icon-verified"]'
-            )
+            selector("verified").find(self.card)
             self.poster_details["verified"] = True
         except NoSuchElementException:
             self.poster_details["verified"] = False
 
     def _scrape_content(self):
         self.content = ""
+        self.truncated = False
         try:
-            tweet_text_div = self.card.find_element("xpath", './/div[@data-testid="tweetText"]')
+            tweet_text_div = selector("tweet_text").find(self.card)
+            # the text is cut short until its "Show more" button is clicked
+            self.truncated = len(selector("text_truncated").find_all(tweet_text_div)) > 0
 
-            elements = tweet_text_div.find_elements("xpath", './span | ./img[@alt] | ./div')
+            elements = selector("tweet_text_parts").find_all(tweet_text_div)
 
             for element in elements:
                 if element.tag_name == "img":
@@ -83,7 +157,7 @@ class Card:
                     # Handle different div cases
                     try:
                         # Case 1: Div containing a link
-                        link = element.find_element("xpath", './/a')
+                        link = selector("tweet_text_link").find(element)
                         self.content += link.text
                     except NoSuchElementException:
                         # Case 2: Add other div cases here as needed
@@ -99,9 +173,7 @@ class Card:
     def _scrape_engagement_counts(self):
         # Reply count
         try:
-            self.reply_cnt = self.card.find_element(
-                "xpath", './/button[@data-testid="reply"]//span'
-            ).text
+            self.reply_cnt = selector("reply_cnt").find(self.card).text
             if self.reply_cnt == "":
                 self.reply_cnt = "0"
         except NoSuchElementException:
@@ -109,9 +181,7 @@ class Card:
 
         # Retweet count
         try:
-            self.retweet_cnt = self.card.find_element(
-                "xpath", './/button[@data-testid="retweet"]//span'
-            ).text
+            self.retweet_cnt = selector("retweet_cnt").find(self.card).text
             if self.retweet_cnt == "":
                 self.retweet_cnt = "0"
         except NoSuchElementException:
@@ -119,9 +189,7 @@ class Card:
 
         # Like count
         try:
-            self.like_cnt = self.card.find_element(
-                "xpath", './/button[@data-testid="like"]//span'
-            ).text
+            self.like_cnt = selector("like_cnt").find(self.card).text
             if self.like_cnt == "":
                 self.like_cnt = "0"
         except NoSuchElementException:
@@ -129,9 +197,7 @@ class Card:
 
         # Analytics count
         try:
-            self.analytics_cnt = self.card.find_element(
-                "xpath", './/a[contains(@href, "/analytics")]//span'
-            ).text
+            self.analytics_cnt = selector("analytics_cnt").find(self.card).text
             if self.analytics_cnt == "":
                 self.analytics_cnt = "0"
         except NoSuchElementException:
@@ -140,27 +206,21 @@ class Card:
     def _scrape_tags_mentions_emojis(self):
         # Tags
         try:
-            self.tags = self.card.find_elements(
-                "xpath", './/a[contains(@href, "src=hashtag_click")]',
-            )
+            self.tags = selector("tags").find_all(self.card)
             self.tags = [tag.text for tag in self.tags]
         except NoSuchElementException:
             self.tags = []
 
         # Mentions
         try:
-            self.mentions = self.card.find_elements(
-                "xpath", '(.//div[@data-testid="tweetText"])[1]//a[contains(text(), "@")]',
-            )
+            self.mentions = selector("mentions").find_all(self.card)
             self.mentions = [mention.text for mention in self.mentions]
         except NoSuchElementException:
             self.mentions = []
 
         # Emojis
         try:
-            raw_emojis = self.card.find_elements(
-                "xpath", '(.//div[@data-testid="tweetText"])[1]/img[contains(@src, "emoji")]',
-            )
+            raw_emojis = selector("emojis").find_all(self.card)
             self.emojis = [
                 emoji.get_attribute("alt").encode("unicode-escape").decode("ASCII")
                 for emoji in raw_emojis
@@ -170,17 +230,15 @@ class Card:
 
     def _scrape_profile_image(self):
         try:
-            self.poster_details["profile_img"] = self.card.find_element(
-                "xpath", './/div[@data-testid="Tweet-User-Avatar"]//img'
+            self.poster_details["profile_img"] = selector("profile_img").find(
+                self.card
             ).get_attribute("src")
         except NoSuchElementException:
             self.poster_details["profile_img"] = None
 
     def _scrape_tweet_link(self):
       try:
-          tweet_link = self.card.find_element(
-              "xpath", ".//a[contains(@href, '/status/')]",
-          ).get_attribute("href")
+          tweet_link = selector("tweet_link").find(self.card).get_attribute("href")
 
           pattern = r".*/status/(\d+)"
           match = re.search(pattern, tweet_link)
@@ -204,19 +262,17 @@ class Card:
         }
         try:
             # Get video blob URL
-            video_source = video_player.find_element("xpath", './/video//source')
+            video_source = selector("video_source").find(video_player)
             video_url = video_source.get_attribute("src")
             video_id = video_url.split("/")[-1]
             
             # Get video thumbnail/poster
-            video_element = video_player.find_element("xpath", './/video')
+            video_element = selector("video").find(video_player)
             thumbnail = video_element.get_attribute("poster")
             
             # Get video duration
             try:
-                duration_element = video_player.find_element(
-                    "xpath", './/span[contains(text(), ":")]'
-                )
+                duration_element = selector("video_duration").find(video_player)
                 duration = duration_element.text.strip()
             except:
                 duration = "unknown"
@@ -235,9 +291,7 @@ class Card:
     def _scrape_videos(self):
         # Extract video data from quoted tweet
         try:
-            video_players = self.card.find_elements(
-                "xpath", './/div[@data-testid="videoPlayer"]'
-            )
+            video_players = selector("video_player").find_all(self.card)
             videos = []
             for video_player in video_players:
                 try:
@@ -254,9 +308,7 @@ class Card:
 
         # Extract images from quoted tweet
         try:
-            images = self.card.find_elements(
-                "xpath", './/div[@data-testid="tweetPhoto"]//img'
-            )
+            images = selector("images").find_all(self.card)
             image_urls = []
             video_thumbnails = set(
                 v["thumbnail"] for v in self.videos 
@@ -280,9 +332,7 @@ class Card:
 
     def _scrape(self, scrape_media: bool = True):
         # Basic tweet information
-        self._scrape_user()
-        self._scrape_handle()
-        self._scrape_datetime()
+        self._scrape_basics()
 
         if self.error:
             return
@@ -0,0 +1,73 @@
+import hashlib
+import math
+from collections import deque
+
+
+class BloomFilter:
+    """
+    Set membership in a fixed number of bits: no false negatives, false
+    positives at about error_rate once capacity items have been added.
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        # double hashing: k positions from two 64 bit halves of one digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+class SeenIds:
+    """
+    Tweet ids already scraped, in bounded memory: the last `window` ids are
+    kept exactly and older ones only in a Bloom filter sized for `capacity`
+    ids, so an id may rarely (error_rate) be taken for seen but a seen id
+    is never taken for new.
+    """
+
+    def __init__(
+        self,
+        window: int = 10_000,
+        capacity: int = 1_000_000,
+        error_rate: float = 0.0001,
+    ) -> None:
+        self.window = window
+        self.recent = deque()
+        self.recent_ids = set()
+        self.older = BloomFilter(capacity, error_rate)
+
+    def __contains__(self, tweet_id: str) -> bool:
+        return tweet_id in self.recent_ids or tweet_id in self.older
+
+    def __len__(self) -> int:
+        return len(self.recent_ids) + self.older.count
+
+    def add(self, tweet_id: str) -> bool:
+        """Returns False if tweet_id was seen already"""
+        if tweet_id in self:
+            return False
+        self.recent.append(tweet_id)
+        self.recent_ids.add(tweet_id)
+        if len(self.recent) > self.window:
+            oldest = self.recent.popleft()
+            self.recent_ids.discard(oldest)
+            self.older.add(oldest)
+        return True
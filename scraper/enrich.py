@@ -0,0 +1,175 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from .cache import Cache
+from .locators import get as selector
+from .tweet import POSTER_FIELDS
+
+
+class PosterEnricher:
+    """
+    Poster details fetched out of band: authors seen while scraping are
+    queued to a small pool of extra browsers that load their profile pages,
+    so the scroll loop never hovers a card. Each browser is created by
+    make_driver on first use and given the cookies of the logged in session.
+
+    submit() registers the poster_details dict of a scraped tweet; join()
+    waits for the profiles and updates those dicts in place, with the same
+    keys the hover card gives (user_id, following_cnt, follower_cnt).
+    """
+
+    def __init__(
+        self,
+        make_driver,
+        cookies: list | None = None,
+        workers: int = 2,
+        cache: Cache | None = None,
+        home_url: str = "https://x.com/",
+        profile_url: str = "https://x.com/{}",
+        timeout: float = 10,
+    ) -> None:
+        self.make_driver = make_driver
+        self.cookies = cookies or []
+        self.cache = cache
+        self.home_url = home_url
+        self.profile_url = profile_url
+        self.timeout = timeout
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.idle = queue.Queue()
+        self.drivers = []
+        self.lock = threading.Lock()
+        self.futures = {}  # handle -> future of its details
+        self.details = {}  # handle -> details, once fetched
+        self.targets = {}  # handle -> poster_details dicts to update
+        self.fetched = 0
+        self.cached = 0
+        self.failed = 0
+
+    def submit(self, handle: str, poster_details: dict) -> None:
+        if not handle or handle == "skip":
+            return
+        if handle in self.targets:
+            self.targets[handle].append(poster_details)
+            return
+        self.targets[handle] = [poster_details]
+
+        cached = self.cache.get(handle) if self.cache is not None else None
+        if cached is not None:
+            self.cached += 1
+            self.details[handle] = cached
+        else:
+            self.futures[handle] = self.pool.submit(self._fetch, handle)
+
+    def _driver(self):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        driver = self.make_driver()
+        with self.lock:
+            self.drivers.append(driver)
+        if self.cookies:
+            # cookies can only be set for the domain the driver is on
+            driver.get(self.home_url)
+            for cookie in self.cookies:
+                driver.add_cookie(cookie)
+        return driver
+
+    def _drop(self, driver) -> None:
+        # a browser that crashed (or whose session is gone): the next fetch
+        # starts a new one
+        with self.lock:
+            self.drivers.remove(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _fetch(self, handle: str) -> dict | None:
+        driver = self._driver()
+        try:
+            driver.get(self.profile_url.format(handle.lstrip("@")))
+            details = self._extract(driver)
+        except WebDriverException:
+            self._drop(driver)
+            raise
+        except Exception:
+            self.idle.put(driver)
+            raise
+        self.idle.put(driver)
+        if details is not None and self.cache is not None:
+            self.cache.set(handle, details)
+        return details
+
+    def _extract(self, driver) -> dict | None:
+        try:
+            WebDriverWait(driver, self.timeout).until(
+                lambda d: selector("profile_followers").find_all(d)
+            )
+        except TimeoutException:
+            return None
+
+        details = {}
+        try:
+            raw_user_id = selector("profile_user_id").find(driver).get_attribute("data-testid")
+            details["user_id"] = str(raw_user_id.split("-")[0]) if raw_user_id else None
+        except NoSuchElementException:
+            details["user_id"] = None
+
+        for field, name in (
+            ("following_cnt", "profile_following"),
+            ("follower_cnt", "profile_followers"),
+        ):
+            try:
+                details[field] = selector(name).find(driver).text or None
+            except NoSuchElementException:
+                details[field] = None
+
+        details["verified"] = len(selector("profile_verified").find_all(driver)) > 0
+        try:
+            details["profile_img"] = selector("profile_avatar").find(driver).get_attribute("src")
+        except NoSuchElementException:
+            details["profile_img"] = None
+        return {field: details[field] for field in POSTER_FIELDS}
+
+    def join(self) -> None:
+        """Waits for every submitted author and fills in their tweets"""
+        for handle, future in self.futures.items():
+            try:
+                details = future.result()
+            except Exception as e:
+                print(f"Warning: Could not fetch poster details of {handle}: {e}")
+                details = None
+            if details is None:
+                self.failed += 1
+            else:
+                self.fetched += 1
+                self.details[handle] = details
+        self.futures = {}
+
+        for handle, targets in self.targets.items():
+            details = self.details.get(handle)
+            if details is None:
+                continue
+            for poster_details in targets:
+                # the card's own verified/profile_img are kept
+                for field, value in details.items():
+                    poster_details.setdefault(field, value)
+
+    def summary(self) -> str:
+        return "Poster details: {} profiles fetched, {} from cache, {} failed".format(
+            self.fetched, self.cached, self.failed
+        )
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        for driver in self.drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        self.drivers = []
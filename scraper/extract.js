@@ -0,0 +1,457 @@
+// Single round-trip tweet extraction.
+//
+// Mirrors the field model of Card/Tweet/Quote so that one execute_script call
+// returns the same dictionary Tweet._build_tweet_dict produces. SELECTORS is
+// defined by js_engine from the locators registry, so every backend uses the
+// same selectors (CSS where given, XPath otherwise).
+
+function xpFirst(ctx, xpath) {
+    return document.evaluate(
+        xpath, ctx, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+    ).singleNodeValue;
+}
+
+function xpAll(ctx, xpath) {
+    const result = document.evaluate(
+        xpath, ctx, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null
+    );
+    const nodes = [];
+    for (let i = 0; i < result.snapshotLength; i++) {
+        nodes.push(result.snapshotItem(i));
+    }
+    return nodes;
+}
+
+function first(ctx, name) {
+    const selector = SELECTORS[name];
+    if (selector.css !== null) return ctx.querySelector(selector.css);
+    return xpFirst(ctx, selector.xpath);
+}
+
+function all(ctx, name) {
+    const selector = SELECTORS[name];
+    if (selector.css !== null) return Array.from(ctx.querySelectorAll(selector.css));
+    return xpAll(ctx, selector.xpath);
+}
+
+function textOf(el) {
+    // Text as WebElement.text reports it for the card markup: the text
+    // nodes, with a line break for each <br>. Read from the markup rather
+    // than the layout (innerText), which a card removed from the page no
+    // longer has (see drainObservedCards): cards on and off the page read
+    // the same, as they do in the offline parser.
+    let text = "";
+    for (const node of el.childNodes) {
+        if (node.nodeType === Node.TEXT_NODE) {
+            text += node.data;
+        } else if (node.nodeType === Node.ELEMENT_NODE) {
+            text += node.tagName === "BR" ? "\n" : textOf(node);
+        }
+    }
+    return text;
+}
+
+function unicodeEscape(s) {
+    // Python's str.encode("unicode-escape").decode("ASCII")
+    let out = "";
+    for (const ch of s) {
+        const cp = ch.codePointAt(0);
+        if (ch === "\\") out += "\\\\";
+        else if (ch === "\t") out += "\\t";
+        else if (ch === "\n") out += "\\n";
+        else if (ch === "\r") out += "\\r";
+        else if (cp >= 0x20 && cp < 0x7f) out += ch;
+        else if (cp < 0x100) out += "\\x" + cp.toString(16).padStart(2, "0");
+        else if (cp < 0x10000) out += "\\u" + cp.toString(16).padStart(4, "0");
+        else out += "\\U" + cp.toString(16).padStart(8, "0");
+    }
+    return out;
+}
+
+function countText(card, name) {
+    const el = first(card, name);
+    if (!el) return "0";
+    const text = textOf(el);
+    return text === "" ? "0" : text;
+}
+
+function extractContent(card) {
+    const textDiv = first(card, "tweet_text");
+    if (!textDiv) return "";
+    let content = "";
+    for (const el of all(textDiv, "tweet_text_parts")) {
+        const tag = el.tagName.toLowerCase();
+        if (tag === "img") {
+            content += el.getAttribute("alt");
+        } else if (tag === "div") {
+            const link = first(el, "tweet_text_link");
+            if (!link) {
+                throw new Error(
+                    "Unknown div type in tweet content: " + el.outerHTML.slice(0, 100) + "..."
+                );
+            }
+            content += textOf(link);
+        } else {
+            content += textOf(el);
+        }
+    }
+    return content;
+}
+
+function extractVideo(player) {
+    const video = {
+        video_id: "unknown",
+        source: "unknown",
+        duration: "unknown",
+        thumbnail: "unknown",
+    };
+    const source = first(player, "video_source");
+    const videoEl = first(player, "video");
+    if (!source || !videoEl) return video;
+    const durationEl = first(player, "video_duration");
+    video.video_id = source.src.split("/").pop();
+    video.source = source.src;
+    video.duration = durationEl ? textOf(durationEl).trim() : "unknown";
+    video.thumbnail = videoEl.poster;
+    return video;
+}
+
+function thumbnailsOf(videos) {
+    return new Set(
+        videos
+            .map((v) => v.thumbnail)
+            .filter((t) => t !== null && t !== undefined && t !== "unknown")
+    );
+}
+
+function imageSources(card) {
+    const urls = [];
+    for (const img of all(card, "images")) {
+        let src = img.src;
+        if (!src) continue;
+        if (src.includes("name=small")) src = src.replace("name=small", "name=large");
+        urls.push(src);
+    }
+    return urls;
+}
+
+function extractBase(card) {
+    const record = { error: false, is_ad: false, poster_details: {} };
+
+    const user = first(card, "user");
+    const handle = first(card, "handle");
+    const time = first(card, "time");
+    record.user = user ? textOf(user) : "skip";
+    record.handle = handle ? textOf(handle) : "skip";
+    record.date_time = time ? time.getAttribute("datetime") : "skip";
+    record.is_ad = !time;
+    record.error = !user || !handle || !time;
+    if (record.error) return record;
+
+    record.poster_details.verified = !!first(card, "verified");
+    record.content = extractContent(card);
+    const text = first(card, "tweet_text");
+    record.truncated = !!(text && first(text, "text_truncated"));
+
+    record.reply_cnt = countText(card, "reply_cnt");
+    record.retweet_cnt = countText(card, "retweet_cnt");
+    record.like_cnt = countText(card, "like_cnt");
+    record.analytics_cnt = countText(card, "analytics_cnt");
+
+    record.tags = all(card, "tags").map(textOf);
+    record.mentions = all(card, "mentions").map(textOf);
+    record.emojis = all(card, "emojis").map((img) => unicodeEscape(img.getAttribute("alt")));
+
+    const avatar = first(card, "profile_img");
+    record.poster_details.profile_img = avatar ? avatar.src : null;
+
+    record.tweet_link = "";
+    record.tweet_id = "";
+    const link = first(card, "tweet_link");
+    if (link) {
+        const match = /.*\/status\/(\d+)/.exec(link.href);
+        if (match) {
+            record.tweet_link = match[0];
+            record.tweet_id = match[1];
+        }
+    }
+    return record;
+}
+
+function extractQuote(card) {
+    const quoteCard = first(card, "quote_card");
+    if (!quoteCard) return null;
+
+    const record = extractBase(quoteCard);
+    if (record.error) return null;
+
+    record.videos = all(quoteCard, "video_player").map(extractVideo);
+    const thumbnails = thumbnailsOf(record.videos);
+    record.image_urls = imageSources(quoteCard).filter((src) => !thumbnails.has(src));
+    return record;
+}
+
+function extractCard(card) {
+    const record = extractBase(card);
+    const quote = extractQuote(card);
+    record.quoted_tweet = quote;
+
+    const quoteVideoIds = new Set(quote ? quote.videos.map((v) => v.video_id) : []);
+    record.videos = [];
+    for (const player of all(card, "video_player")) {
+        const source = first(player, "video_source");
+        if (!source) continue;
+        if (quoteVideoIds.has(source.src.split("/").pop())) continue;
+        record.videos.push(extractVideo(player));
+    }
+
+    const excluded = thumbnailsOf(record.videos);
+    if (quote) {
+        quote.image_urls.forEach((src) => excluded.add(src));
+        thumbnailsOf(quote.videos).forEach((src) => excluded.add(src));
+    }
+    record.image_urls = imageSources(card).filter((src) => !excluded.has(src));
+
+    record.media_urls = [];
+    for (const wrapper of all(card, "media_cards")) {
+        for (const a of all(wrapper, "media_card_links")) {
+            if (a.href && a.href.includes("t.co/")) record.media_urls.push(a.href);
+        }
+    }
+    return record;
+}
+
+function statusId(card) {
+    // "" for cards without a status link
+    const link = first(card, "tweet_link");
+    const match = link ? /.*\/status\/(\d+)/.exec(link.href) : null;
+    return match ? match[1] : "";
+}
+
+function statusIds(cards) {
+    return cards.map(statusId);
+}
+
+function expandTruncated() {
+    // Clicks every "Show more" button not clicked by a previous call, all at
+    // once. A button still there on the next call (the click did not expand
+    // the text) is left alone, so its tweet is reported as truncated.
+    const clicked = window.__scraperExpanded || (window.__scraperExpanded = new WeakSet());
+    const buttons = all(document, "show_more").filter((button) => !clicked.has(button));
+    for (const button of buttons) {
+        clicked.add(button);
+        button.click();
+    }
+    return buttons;
+}
+
+function cardPosition(el) {
+    return el.getBoundingClientRect().top + window.scrollY;
+}
+
+function processedCards() {
+    // Cards whose data has been taken, and so may be pruned (see pruneCards)
+    return window.__scraperProcessed || (window.__scraperProcessed = new WeakSet());
+}
+
+// status ids remembered in the page; older repeats are caught by the
+// scraper's own dedup (see dedup.SeenIds), so the page's memory stays flat
+const SEEN_WINDOW = 2000;
+
+function markSeen(id) {
+    // False if the status id was returned by a recent call already
+    const seenIds = window.__scraperSeenIds || (window.__scraperSeenIds = new Set());
+    if (seenIds.has(id)) return false;
+    seenIds.add(id);
+    // a Set iterates in insertion order: the first one is the oldest
+    if (seenIds.size > SEEN_WINDOW) seenIds.delete(seenIds.values().next().value);
+    return true;
+}
+
+function newCards(scroll) {
+    // Cards rendered since the previous call, in page order, up to the
+    // "Discover more" section. Cards are keyed by status id; cards without
+    // one by element identity.
+    const seenCards = window.__scraperSeenCards || (window.__scraperSeenCards = new WeakSet());
+
+    const discoverMore = first(document, "discover_more");
+    const boundary = discoverMore ? cardPosition(discoverMore) : Infinity;
+
+    const found = { cards: [], boundary: false };
+    let last = null;
+    for (const card of all(document, "tweet_cards")) {
+        const y = cardPosition(card);
+        if (y >= boundary) {
+            // Skip tweets that are after "Discover more"
+            found.boundary = true;
+            break;
+        }
+        last = card;
+
+        const id = statusId(card);
+        if (id) {
+            if (!markSeen(id)) continue;
+        } else {
+            if (seenCards.has(card)) continue;
+            seenCards.add(card);
+        }
+        processedCards().add(card);
+        found.cards.push({ card: card, y: y, id: id });
+    }
+    if (scroll && last) last.scrollIntoView();
+    return found;
+}
+
+function cardsUnder(node) {
+    // Cards in an added or removed subtree, the subtree root included
+    if (node.nodeType !== Node.ELEMENT_NODE) return [];
+    const cards = all(node, "tweet_cards");
+    if (node.matches(SELECTORS.tweet_cards.css)) cards.unshift(node);
+    return cards;
+}
+
+function observedCards() {
+    // Queue of the cards inserted in the page, filled by a MutationObserver
+    // started along with the install, right after the page loads (see
+    // js_engine.observe_cards; on first use otherwise), so that no card is
+    // missed however many are rendered at once. A queued card removed from
+    // the page before being drained (recycled by the virtualized list) is
+    // extracted on removal.
+    let observed = window.__scraperObserved;
+    if (observed) return observed;
+    observed = window.__scraperObserved = { queue: [], entries: new WeakMap() };
+
+    const enqueue = (card) => {
+        if (observed.entries.has(card)) return;
+        const entry = { card: card, record: null };
+        observed.entries.set(card, entry);
+        observed.queue.push(entry);
+    };
+    const capture = (card) => {
+        const entry = observed.entries.get(card);
+        if (entry && !entry.drained) entry.record = extractCard(card);
+    };
+    new MutationObserver((mutations) => {
+        for (const mutation of mutations) {
+            mutation.addedNodes.forEach((node) => cardsUnder(node).forEach(enqueue));
+            mutation.removedNodes.forEach((node) => cardsUnder(node).forEach(capture));
+        }
+    }).observe(document.body, { childList: true, subtree: true });
+    // the cards rendered before the observer started
+    all(document, "tweet_cards").forEach(enqueue);
+    return observed;
+}
+
+function drainObservedCards(scroll) {
+    // One scroll step: extract every card queued since the previous call,
+    // in insertion order, skipping status ids returned already and cards
+    // past the "Discover more" section. Cards still on the page are
+    // extracted now (their latest state); the others come with the record
+    // taken on removal and no card.
+    const observed = observedCards();
+    const queue = observed.queue;
+    observed.queue = [];
+
+    const discoverMore = first(document, "discover_more");
+    const boundary = discoverMore ? cardPosition(discoverMore) : Infinity;
+
+    const drained = { records: [], boundary: false };
+    for (const entry of queue) {
+        entry.drained = true;
+        const connected = entry.card.isConnected;
+        const y = connected ? cardPosition(entry.card) : null;
+        if (connected && y >= boundary) {
+            // Skip tweets that are after "Discover more"
+            drained.boundary = true;
+            continue;
+        }
+        const id = statusId(entry.card);
+        if (id && !markSeen(id)) continue;
+        const record = connected ? extractCard(entry.card) : entry.record;
+        if (!record) continue;
+        record.card = connected ? entry.card : null;
+        record.y = y;
+        processedCards().add(entry.card);
+        drained.records.push(record);
+    }
+
+    if (scroll) {
+        const cards = all(document, "tweet_cards").filter((card) => cardPosition(card) < boundary);
+        if (cards.length) cards[cards.length - 1].scrollIntoView();
+    }
+    return drained;
+}
+
+function pruneCards(mode, cards, margin) {
+    // Drops the processed cards (the ones passed in, and the ones returned
+    // by newCards) and the hidden ones once they are margin pixels (by
+    // default a viewport) above the visible area, so that the page's memory stays flat on long runs.
+    // "remove" deletes their rows; "spacer" empties each row into a block of
+    // the same height, so that the virtualized list measures the same rows.
+    // Either way the visible cards stay where they were. With no mode,
+    // nothing is pruned. Returns the number of cards pruned and the JS heap
+    // size in bytes (null where the browser does not report it).
+    const processed = processedCards();
+    cards.forEach((card) => processed.add(card));
+
+    let pruned = 0;
+    if (mode) {
+        if (margin === null) margin = window.innerHeight;
+        const limit = window.scrollY - margin;
+        const candidates = all(document, "tweet_cards")
+            .filter((card) => processed.has(card))
+            .concat(all(document, "hidden_tweet_cards"));
+        // measure everything before the layout changes
+        const rows = [];
+        for (const card of candidates) {
+            const row = card.closest(SELECTORS.card_cell.css) || card;
+            const rect = row.getBoundingClientRect();
+            if (rect.bottom + window.scrollY <= limit) rows.push({ row: row, height: rect.height });
+        }
+        const anchor = all(document, "tweet_cards").find(
+            (card) => card.getBoundingClientRect().bottom > 0
+        );
+        const anchorTop = anchor ? anchor.getBoundingClientRect().top : 0;
+
+        for (const entry of rows) {
+            if (mode === "remove") {
+                entry.row.remove();
+            } else {
+                const spacer = document.createElement("div");
+                spacer.style.height = entry.height + "px";
+                entry.row.replaceChildren(spacer);
+            }
+        }
+        // rows laid out in flow move up when the ones above are removed
+        if (anchor && anchor.isConnected) {
+            window.scrollBy(0, anchor.getBoundingClientRect().top - anchorTop);
+        }
+        pruned = rows.length;
+    }
+    const memory = performance.memory;
+    return { pruned: pruned, heap: memory ? memory.usedJSHeapSize : null };
+}
+
+function extractNewCards(scroll) {
+    // One scroll step: extract every card not returned by a previous call.
+    const found = newCards(scroll);
+    const records = found.cards.map((entry) => {
+        const record = extractCard(entry.card);
+        record.card = entry.card;
+        record.y = entry.y;
+        return record;
+    });
+    return { records: records, boundary: found.boundary };
+}
+
+function snapshotNewCards(scroll) {
+    // One scroll step: serialize every card not returned by a previous call
+    // so it can be parsed outside the browser.
+    const found = newCards(scroll);
+    const snapshots = found.cards.map((entry) => ({
+        id: entry.id,
+        y: entry.y,
+        html: entry.card.outerHTML,
+    }));
+    return { snapshots: snapshots, boundary: found.boundary, url: location.href };
+}
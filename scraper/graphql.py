@@ -0,0 +1,348 @@
+import base64
+import html
+import json
+import re
+from datetime import datetime
+from time import perf_counter
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from .dedup import SeenIds
+from .resolver import ShortUrlResolver
+from .tweet import Tweet
+
+GRAPHQL_PATH = "/i/api/graphql/"
+# operations whose responses fill the pages scrape_tweets reads
+TIMELINE_OPERATIONS = (
+    "HomeTimeline",
+    "HomeLatestTimeline",
+    "SearchTimeline",
+    "TweetDetail",
+    "UserTweets",
+    "UserTweetsAndReplies",
+    "UserMedia",
+    "Likes",
+    "Bookmarks",
+    "ListLatestTweetsTimeline",
+)
+# TweetDetail entries of the "Discover more" section
+RELATED_ENTRY_PREFIX = "tweetdetailrelatedtweets"
+
+# an emoji with its modifiers and ZWJ sequence, as the page renders one <img>
+EMOJI = re.compile(
+    "[\U0001F000-\U0001FAFF\u2600-\u27BF\u2B00-\u2BFF]"
+    "(?:[\uFE0F\U0001F3FB-\U0001F3FF]|\u200D[\U0001F000-\U0001FAFF\u2600-\u27BF])*"
+)
+
+
+class GraphQLCapture:
+    """
+    Bodies of the GraphQL responses received by the page, read from Chrome's
+    performance log (the driver must be created with the goog:loggingPrefs
+    performance capability, see Twitter_Scraper's network_log) and fetched
+    through the DevTools Network domain.
+
+    GraphQL responses with a 429 status are not read but noted, with the
+    time the limit resets at, for rate_limit(); with no operations, only
+    those are looked for.
+    """
+
+    def __init__(self, driver: WebDriver, operations: tuple = TIMELINE_OPERATIONS) -> None:
+        self.driver = driver
+        self.operations = operations
+        self.driver.execute_cdp_cmd("Network.enable", {})
+        self.pending = {}  # request id -> operation
+        self.throttled = False
+        self.limit_reset = None
+        # events logged before the capture started are of no use
+        self.driver.get_log("performance")
+
+    def _operation(self, url: str) -> str | None:
+        path = urlsplit(url).path
+        if GRAPHQL_PATH not in path:
+            return None
+        operation = path.rsplit("/", 1)[-1]
+        return operation if operation in self.operations else None
+
+    def _body(self, request_id: str):
+        try:
+            response = self.driver.execute_cdp_cmd(
+                "Network.getResponseBody", {"requestId": request_id}
+            )
+        except WebDriverException as e:
+            print(f"Warning: Could not read a GraphQL response: {e.msg}")
+            return None
+        body = response["body"]
+        if response.get("base64Encoded"):
+            body = base64.b64decode(body).decode("utf-8")
+        try:
+            return json.loads(body)
+        except ValueError:
+            return None
+
+    def responses(self) -> list:
+        """(operation, payload) of every response finished since the last call"""
+        finished = []
+        for entry in self.driver.get_log("performance"):
+            message = json.loads(entry["message"])["message"]
+            method, params = message["method"], message.get("params", {})
+            if method == "Network.responseReceived":
+                response = params["response"]
+                if response.get("status") == 429 and GRAPHQL_PATH in response["url"]:
+                    self._throttle(response.get("headers", {}))
+                    continue
+                operation = self._operation(response["url"])
+                if operation is not None:
+                    self.pending[params["requestId"]] = operation
+            elif method == "Network.loadingFinished":
+                operation = self.pending.pop(params["requestId"], None)
+                if operation is not None:
+                    payload = self._body(params["requestId"])
+                    if payload is not None:
+                        finished.append((operation, payload))
+            elif method == "Network.loadingFailed":
+                self.pending.pop(params["requestId"], None)
+        return finished
+
+    def _throttle(self, headers: dict) -> None:
+        self.throttled = True
+        for name, value in headers.items():
+            if name.lower() == "x-rate-limit-reset" and str(value).isdigit():
+                self.limit_reset = int(value)
+
+    def rate_limit(self) -> tuple:
+        """
+        (whether a 429 was received since the last call, epoch time its limit
+        resets at or None), from the events read by responses()
+        """
+        limit = (self.throttled, self.limit_reset if self.throttled else None)
+        self.throttled = False
+        self.limit_reset = None
+        return limit
+
+
+def _items(node, entry_id: str = ""):
+    # (entry id, item holding tweet_results) of every timeline item, in order
+    if isinstance(node, dict):
+        entry_id = node.get("entryId", entry_id)
+        if "tweet_results" in node:
+            yield entry_id, node
+            return
+        for value in node.values():
+            yield from _items(value, entry_id)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _items(value, entry_id)
+
+
+def _unwrap(result: dict | None) -> dict | None:
+    # the tweet of a result, None for tombstones and unavailable tweets
+    if result is None:
+        return None
+    if result.get("__typename") == "TweetWithVisibilityResults":
+        result = result.get("tweet")
+    if result is None or "legacy" not in result:
+        return None
+    return result
+
+
+def _date(created_at: str) -> str:
+    # "Sat Jun 14 16:13:13 +0000 2025" as the page's datetime attribute
+    date = datetime.strptime(created_at, "%a %b %d %H:%M:%S %z %Y")
+    return date.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def _duration(millis: int | None) -> str:
+    if millis is None:
+        return "unknown"
+    seconds = round(millis / 1000)
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+def _count(count: int | None) -> str | None:
+    return str(count) if count is not None else None
+
+
+def _user(result: dict) -> dict:
+    user = result["core"]["user_results"]["result"]
+    legacy = user.get("legacy", {})
+    # newer responses moved some fields out of legacy
+    core = user.get("core", {})
+    avatar = user.get("avatar", {})
+    return {
+        "id": user.get("rest_id"),
+        "name": core.get("name", legacy.get("name")),
+        "screen_name": core.get("screen_name", legacy.get("screen_name")),
+        "verified": bool(user.get("is_blue_verified") or legacy.get("verified")),
+        "profile_img": avatar.get("image_url", legacy.get("profile_image_url_https")),
+        "following_cnt": legacy.get("friends_count"),
+        "follower_cnt": legacy.get("followers_count"),
+    }
+
+
+class ResponseParser:
+    """
+    Maps timeline GraphQL responses to the records js_engine returns, so
+    that Tweet builds the same dicts from them. Counts are exact, content is
+    the full text (long posts included, links expanded) and videos point to
+    their best mp4 variant. With poster_details, the author's id and
+    following/follower counts are filled in as hovering would.
+    """
+
+    def __init__(self, poster_details: bool = False) -> None:
+        self.poster_details = poster_details
+
+    def parse(self, payload: dict) -> tuple:
+        """(records in timeline order, whether "Discover more" was reached)"""
+        records = []
+        for entry_id, item in _items(payload):
+            if entry_id.startswith(RELATED_ENTRY_PREFIX):
+                return records, True
+            result = _unwrap(item["tweet_results"].get("result"))
+            if result is None:
+                continue
+            record = self.tweet_record(result)
+            record["is_ad"] = "promotedMetadata" in item or entry_id.startswith("promoted")
+            records.append(record)
+        return records, False
+
+    def _content(self, result: dict) -> tuple:
+        # (text, entities) as displayed: long posts in full, links expanded,
+        # reply mentions left out
+        note = result.get("note_tweet", {}).get("note_tweet_results", {}).get("result")
+        if note is not None:
+            text, entities, start = note["text"], note.get("entity_set", {}), 0
+        else:
+            legacy = result["legacy"]
+            # indices count "&amp;" and the like as one character
+            text = html.unescape(legacy["full_text"])
+            start, end = legacy.get("display_text_range", (0, len(text)))
+            text, entities = text[:end], legacy.get("entities", {})
+        content = text[start:]
+        for url in entities.get("urls", []):
+            if url.get("expanded_url"):
+                content = content.replace(url["url"], url["expanded_url"])
+        entities = {
+            key: [entity for entity in entities.get(key, []) if entity["indices"][0] >= start]
+            for key in ("hashtags", "user_mentions")
+        }
+        return content, entities
+
+    def _media(self, legacy: dict) -> tuple:
+        images, videos = [], []
+        for media in legacy.get("extended_entities", {}).get("media", []):
+            if media["type"] == "photo":
+                base, extension = media["media_url_https"].rsplit(".", 1)
+                images.append(f"{base}?format={extension}&name=large")
+            else:
+                info = media.get("video_info", {})
+                variants = [v for v in info.get("variants", []) if v.get("content_type") == "video/mp4"]
+                best = max(variants, key=lambda v: v.get("bitrate", 0), default=None)
+                videos.append({
+                    "video_id": media.get("id_str", "unknown"),
+                    "source": best["url"] if best else "unknown",
+                    "duration": _duration(info.get("duration_millis")),
+                    "thumbnail": media.get("media_url_https", "unknown"),
+                })
+        return images, videos
+
+    def base_record(self, result: dict) -> dict:
+        legacy = result["legacy"]
+        user = _user(result)
+        content, entities = self._content(result)
+        views = result.get("views", {}).get("count")
+
+        poster_details = {"verified": user["verified"], "profile_img": user["profile_img"]}
+        if self.poster_details:
+            poster_details.update({
+                "user_id": user["id"],
+                # None when missing, as from the hover card
+                "following_cnt": _count(user["following_cnt"]),
+                "follower_cnt": _count(user["follower_cnt"]),
+            })
+        return {
+            "error": False,
+            "is_ad": False,
+            "user": user["name"],
+            "handle": "@" + user["screen_name"],
+            "date_time": _date(legacy["created_at"]),
+            "content": content,
+            "truncated": False,
+            "reply_cnt": str(legacy.get("reply_count", 0)),
+            "retweet_cnt": str(legacy.get("retweet_count", 0)),
+            "like_cnt": str(legacy.get("favorite_count", 0)),
+            "analytics_cnt": str(views or 0),
+            "tags": ["#" + tag["text"] for tag in entities["hashtags"]],
+            "mentions": ["@" + mention["screen_name"] for mention in entities["user_mentions"]],
+            "emojis": [
+                emoji.encode("unicode-escape").decode("ASCII")
+                for emoji in EMOJI.findall(content)
+            ],
+            "tweet_link": "https://x.com/{}/status/{}".format(user["screen_name"], result["rest_id"]),
+            "tweet_id": result["rest_id"],
+            "poster_details": poster_details,
+        }
+
+    def tweet_record(self, result: dict) -> dict:
+        retweeted = _unwrap(result["legacy"].get("retweeted_status_result", {}).get("result"))
+        if retweeted is not None:
+            # the page shows the reposted tweet
+            result = retweeted
+        record = self.base_record(result)
+        record["image_urls"], record["videos"] = self._media(result["legacy"])
+
+        quoted = _unwrap(result.get("quoted_status_result", {}).get("result"))
+        if quoted is not None:
+            quote = self.base_record(quoted)
+            quote["image_urls"], quote["videos"] = self._media(quoted["legacy"])
+            record["quoted_tweet"] = quote
+        else:
+            record["quoted_tweet"] = None
+
+        card_url = result.get("card", {}).get("legacy", {}).get("url")
+        record["media_urls"] = [card_url] if card_url and "t.co/" in card_url else []
+        return record
+
+
+class GraphQLPipeline:
+    """
+    Engine reading tweets from the GraphQL responses that fill the page
+    instead of its DOM: every step parses the responses received since the
+    previous one (scrolling, which requests the next page of results, is
+    left to the caller). Needs Chrome (see GraphQLCapture).
+    """
+
+    def __init__(
+        self,
+        driver: WebDriver,
+        fields: list | None = None,
+        resolver: ShortUrlResolver | None = None,
+        poster_details: bool = False,
+    ) -> None:
+        self.capture = GraphQLCapture(driver)
+        self.parser = ResponseParser(poster_details)
+        self.fields = fields
+        self.resolver = resolver
+        self.tweet_ids = SeenIds()
+
+    def step(self) -> tuple:
+        """(new Tweets, whether "Discover more" was reached)"""
+        start = perf_counter()
+        records, boundary = [], False
+        for _, payload in self.capture.responses():
+            found, reached = self.parser.parse(payload)
+            records.extend(found)
+            boundary = boundary or reached
+
+        tweets = []
+        for record in records:
+            if not self.tweet_ids.add(record["tweet_id"]):
+                continue
+            tweets.append(Tweet(None, record=record, fields=self.fields, resolver=self.resolver))
+        if tweets:
+            step_time = (perf_counter() - start) / len(tweets)
+            for tweet in tweets:
+                tweet.extraction_time += step_time
+        return tweets, boundary
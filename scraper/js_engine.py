@@ -0,0 +1,134 @@
+import hashlib
+import json
+import re
+from pathlib import Path
+
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+
+from . import locators
+
+EXTRACT_JS = (Path(__file__).parent / "extract.js").read_text(encoding="utf-8")
+# the functions of extract.js, installed on window once per page load
+EXPORTS = re.findall(r"^function (\w+)\(", EXTRACT_JS, re.MULTILINE)
+
+INSTALL_JS = (
+    "window.__scraper = (function () {{\n"
+    "const SELECTORS = {selectors};\n{source}\n"
+    "return {{ version: {version}, {exports} }};\n"
+    "}})();\n"
+)
+# only the call is sent once installed: the script is not shipped and
+# compiled again on every round trip
+CALL_JS = (
+    "const scraper = window.__scraper;\n"
+    "if (!scraper || scraper.version !== {version}) return {{ __scraperMissing: true }};\n"
+    "return scraper.{call};"
+)
+
+_installed = {"selectors": None, "version": None, "script": None}
+
+
+def _installer() -> tuple:
+    # selectors are read from the registry on every call so that a selector
+    # swapped at runtime is picked up by the in-page extractor too: the
+    # version changes with them, and the functions are installed again
+    selectors = json.dumps(locators.as_json())
+    if selectors != _installed["selectors"]:
+        version = json.dumps(hashlib.sha1((selectors + EXTRACT_JS).encode()).hexdigest()[:16])
+        _installed.update(
+            selectors=selectors,
+            version=version,
+            script=INSTALL_JS.format(
+                selectors=selectors, source=EXTRACT_JS, version=version, exports=", ".join(EXPORTS)
+            ),
+        )
+    return _installed["version"], _installed["script"]
+
+
+def _call(driver: WebDriver, call: str, *args):
+    """Runs call (e.g. "extractCard(arguments[0])") with the extract.js functions"""
+    version, install = _installer()
+    result = driver.execute_script(CALL_JS.format(version=version, call=call), *args)
+    if isinstance(result, dict) and result.get("__scraperMissing"):
+        # a new page (or new selectors): installed with the call
+        result = driver.execute_script(install + "return window.__scraper.{};".format(call), *args)
+    return result
+
+
+def extract_card(card: WebElement) -> dict:
+    """
+    Extract a tweet card in a single execute_script round trip.
+    Returns a raw record holding the Card fields plus the nested quoted tweet.
+    """
+    return _call(card.parent, "extractCard(arguments[0])", card)
+
+
+def status_ids(driver: WebDriver, cards: list) -> list:
+    """Status id of each card ("" if it has none) in one round trip"""
+    return _call(driver, "statusIds(arguments[0])", cards)
+
+
+def expand_truncated(driver: WebDriver) -> list:
+    """
+    Click every "Show more" button not clicked before in one round trip.
+    Returns the buttons clicked; each one goes away once its text is expanded.
+    """
+    return _call(driver, "expandTruncated()")
+
+
+def prune_cards(
+    driver: WebDriver, mode: str | None, cards: list = (), margin: int | None = None
+) -> dict:
+    """
+    Mark cards as processed and, with mode ("remove" or "spacer"), drop the
+    processed and hidden cards scrolled more than margin pixels (default: the
+    viewport height) above the visible area, in one round trip.
+    Cards returned by extract_new_cards/snapshot_new_cards are processed
+    already. Returns {"pruned": int, "heap": JS heap bytes or None}.
+    """
+    return _call(
+        driver, "pruneCards(arguments[0], arguments[1], arguments[2])", mode, list(cards), margin
+    )
+
+
+def extract_new_cards(driver: WebDriver, scroll: bool = True) -> dict:
+    """
+    Extract every card rendered since the previous call in one round trip.
+    Returns {"records": [...], "boundary": bool}; each record also carries its
+    WebElement ("card") and page offset ("y"). boundary is True once the
+    "Discover more" section has been reached. With scroll, the last card
+    is scrolled into view so the next step renders new ones.
+    """
+    return _call(driver, "extractNewCards(arguments[0])", scroll)
+
+
+def observe_cards(driver: WebDriver) -> int:
+    """
+    Install the extractor and start the MutationObserver of
+    drain_observed_cards in one round trip, right after a page load, so that
+    no card is rendered (and recycled) before it watches. Returns the number
+    of cards queued so far.
+    """
+    return _call(driver, "observedCards().queue.length")
+
+
+def drain_observed_cards(driver: WebDriver, scroll: bool = True) -> dict:
+    """
+    Same step as extract_new_cards, but the new cards are the ones a
+    MutationObserver (see observe_cards; started by the first call
+    otherwise) saw inserted since the previous call, so none is missed when
+    many are rendered or recycled at once. A card removed from the page before the call comes with the record
+    taken on removal and "card" None.
+    """
+    return _call(driver, "drainObservedCards(arguments[0])", scroll)
+
+
+def snapshot_new_cards(driver: WebDriver, scroll: bool = True) -> dict:
+    """
+    Same step as extract_new_cards, but returns the outerHTML of each new
+    card instead of extracting it: {"snapshots": [{"id", "y", "html"}, ...],
+    "boundary": bool, "url": page url}. Snapshots are parsed with
+    offline.OfflineParser, resolving links against url.
+    """
+    return _call(driver, "snapshotNewCards(arguments[0])", scroll)
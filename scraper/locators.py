@@ -0,0 +1,174 @@
+from time import perf_counter
+
+from lxml import etree
+from selenium.common.exceptions import NoSuchElementException
+
+
+class Selector:
+    """
+    A DOM selector defined once for every extraction backend.
+
+    css is used in the browser whenever it is given (cheaper than XPath);
+    xpath is always given, is the fallback for what CSS cannot express
+    (text predicates, parent axes) and is precompiled for the offline backend.
+    Lookups are counted per selector so expensive ones can be found.
+    """
+
+    def __init__(self, name: str, xpath: str, css: str | None = None) -> None:
+        self.name = name
+        self.xpath = xpath
+        self.css = css
+        self.compiled = etree.XPath(xpath)
+        self.hits = 0
+        self.misses = 0
+        self.elapsed = 0.0
+
+    @property
+    def by(self) -> tuple:
+        if self.css is not None:
+            return "css selector", self.css
+        return "xpath", self.xpath
+
+    def _count(self, found: bool, start: float) -> None:
+        self.elapsed += perf_counter() - start
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def find(self, ctx):
+        """WebDriver lookup; raises NoSuchElementException like find_element"""
+        start = perf_counter()
+        try:
+            element = ctx.find_element(*self.by)
+        except NoSuchElementException:
+            self._count(False, start)
+            raise
+        self._count(True, start)
+        return element
+
+    def find_all(self, ctx) -> list:
+        start = perf_counter()
+        elements = ctx.find_elements(*self.by)
+        self._count(len(elements) > 0, start)
+        return elements
+
+    def select(self, ctx) -> list:
+        """Offline (lxml) lookup"""
+        start = perf_counter()
+        elements = self.compiled(ctx)
+        self._count(len(elements) > 0, start)
+        return elements
+
+    def select_one(self, ctx):
+        elements = self.select(ctx)
+        return elements[0] if elements else None
+
+
+SELECTORS = {}
+
+
+def register(name: str, xpath: str, css: str | None = None) -> Selector:
+    SELECTORS[name] = Selector(name, xpath, css)
+    return SELECTORS[name]
+
+
+def get(name: str) -> Selector:
+    return SELECTORS[name]
+
+
+def as_json() -> dict:
+    """Selector definitions for the in-page extractor (extract.js)"""
+    return {
+        name: {"css": selector.css, "xpath": selector.xpath}
+        for name, selector in SELECTORS.items()
+    }
+
+
+def stats() -> list:
+    """Per-selector counters, most expensive first"""
+    rows = [
+        {
+            "name": selector.name,
+            "engine": "css" if selector.css is not None else "xpath",
+            "hits": selector.hits,
+            "misses": selector.misses,
+            "total_ms": 1000 * selector.elapsed,
+            "avg_ms": 1000 * selector.elapsed / max(selector.hits + selector.misses, 1),
+        }
+        for selector in SELECTORS.values()
+        if selector.hits or selector.misses
+    ]
+    return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+
+def print_stats() -> None:
+    print("{:<24} {:<6} {:>8} {:>8} {:>10} {:>8}".format(
+        "selector", "engine", "hits", "misses", "total ms", "avg ms"
+    ))
+    for row in stats():
+        print("{name:<24} {engine:<6} {hits:>8} {misses:>8} {total_ms:>10.1f} {avg_ms:>8.2f}".format(**row))
+
+
+def reset_stats() -> None:
+    for selector in SELECTORS.values():
+        selector.hits = 0
+        selector.misses = 0
+        selector.elapsed = 0.0
+
+
+# Tweet card (relative to an article or a quote card)
+register("user", './/div[@data-testid="User-Name"]//span', 'div[data-testid="User-Name"] span')
+register("handle", './/span[contains(text(), "@")]')
+register("time", './/time', 'time')
+register("verified", './/*[local-name()="svg" and @data-testid="icon-verified"]', 'svg[data-testid="icon-verified"]')
+register("tweet_text", './/div[@data-testid="tweetText"]', 'div[data-testid="tweetText"]')
+register("tweet_text_parts", './span | ./img[@alt] | ./div', ':scope > span, :scope > img[alt], :scope > div')
+register("tweet_text_link", './/a', 'a')
+# relative to tweet_text: "Show more" button (expands in place) or link (to the status page)
+register("text_truncated", './following-sibling::*[@data-testid="tweet-text-show-more-link"]')
+register("reply_cnt", './/button[@data-testid="reply"]//span', 'button[data-testid="reply"] span')
+register("retweet_cnt", './/button[@data-testid="retweet"]//span', 'button[data-testid="retweet"] span')
+register("like_cnt", './/button[@data-testid="like"]//span', 'button[data-testid="like"] span')
+register("analytics_cnt", './/a[contains(@href, "/analytics")]//span', 'a[href*="/analytics"] span')
+register("tags", './/a[contains(@href, "src=hashtag_click")]', 'a[href*="src=hashtag_click"]')
+register("mentions", '(.//div[@data-testid="tweetText"])[1]//a[contains(text(), "@")]')
+register("emojis", '(.//div[@data-testid="tweetText"])[1]/img[contains(@src, "emoji")]')
+register("profile_img", './/div[@data-testid="Tweet-User-Avatar"]//img', 'div[data-testid="Tweet-User-Avatar"] img')
+register("tweet_link", ".//a[contains(@href, '/status/')]", 'a[href*="/status/"]')
+register("video_player", './/div[@data-testid="videoPlayer"]', 'div[data-testid="videoPlayer"]')
+register("video_source", './/video//source', 'video source')
+register("video", './/video', 'video')
+register("video_duration", './/span[contains(text(), ":")]')
+register("images", './/div[@data-testid="tweetPhoto"]//img', 'div[data-testid="tweetPhoto"] img')
+register("media_cards", './/div[@data-testid="card.wrapper"]', 'div[data-testid="card.wrapper"]')
+register("media_card_links", './/a[@href]', 'a[href]')
+register("quote_card", './/span[text()="Quote"]/parent::div/parent::div')
+
+# Poster hover card
+register("hover_card", '//div[@data-testid="hoverCardParent"]', 'div[data-testid="hoverCardParent"]')
+register("hover_user_id", '(.//div[contains(@data-testid, "-follow")]) | (.//div[contains(@data-testid, "-unfollow")])', 'div[data-testid*="-follow"], div[data-testid*="-unfollow"]')
+register("hover_following", './/a[contains(@href, "/following")]//span', 'a[href*="/following"] span')
+register("hover_followers", './/a[contains(@href, "/verified_followers")]//span', 'a[href*="/verified_followers"] span')
+
+# Profile page header (poster details fetched out of band)
+register("profile_user_id", '//div[substring(@data-testid, string-length(@data-testid) - 6) = "-follow" or substring(@data-testid, string-length(@data-testid) - 8) = "-unfollow"]', 'div[data-testid$="-follow"], div[data-testid$="-unfollow"]')
+register("profile_following", '//a[substring(@href, string-length(@href) - 9) = "/following"]//span', 'a[href$="/following"] span')
+register("profile_followers", '//a[substring(@href, string-length(@href) - 18) = "/verified_followers"]//span', 'a[href$="/verified_followers"] span')
+register("profile_verified", '//div[@data-testid="UserName"]//*[local-name()="svg" and @data-testid="icon-verified"]', 'div[data-testid="UserName"] svg[data-testid="icon-verified"]')
+register("profile_avatar", '//div[starts-with(@data-testid, "UserAvatar-Container")]//img', 'div[data-testid^="UserAvatar-Container"] img')
+
+# Page
+register("tweet_cards", '//article[@data-testid="tweet" and not(@disabled)]', 'article[data-testid="tweet"]:not([disabled])')
+register("hidden_tweet_cards", '//article[@data-testid="tweet" and @disabled]', 'article[data-testid="tweet"][disabled]')
+# row of the timeline holding a card (relative to the card)
+register("card_cell", './ancestor::div[@data-testid="cellInnerDiv"]', 'div[data-testid="cellInnerDiv"]')
+register("show_more", '//button[@data-testid="tweet-text-show-more-link"]', 'button[data-testid="tweet-text-show-more-link"]')
+# shown while the next tweets are loading
+register("loading_spinner", '//div[@role="progressbar"]', 'div[role="progressbar"]')
+register("discover_more", '//span[text()="Discover more"]')
+register("retry_button", "//span[text()='Retry']/../../..")
+register("refuse_cookies", "//span[text()='Refuse non-essential cookies']/../../..")
+register("username_input", "//input[@autocomplete='username']", 'input[autocomplete="username"]')
+register("unusual_activity_input", "//input[@data-testid='ocfEnterTextTextInput']", 'input[data-testid="ocfEnterTextTextInput"]')
+register("password_input", "//input[@autocomplete='current-password']", 'input[autocomplete="current-password"]')
@@ -0,0 +1,70 @@
+import pandas as pd
+
+from .utils import COUNT_MULTIPLIERS
+
+COUNT_COLUMNS = ("reply_cnt", "retweet_cnt", "like_cnt", "analytics_cnt")
+# poster_details counts, flattened into their own columns
+POSTER_COUNT_COLUMNS = {
+    "following_cnt": "poster_following_cnt",
+    "follower_cnt": "poster_follower_cnt",
+}
+CATEGORICAL_COLUMNS = ("user", "handle")
+
+# ms since the Unix epoch of the first tweet id timestamp
+TWITTER_EPOCH_MS = 1288834974657
+
+
+def parse_counts(values: pd.Series) -> pd.Series:
+    """
+    Whole column version of utils.parse_count: "1,234", "12.5K", "3M"...
+    to nullable int64 (<NA> where a value is not a count).
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype("Int64")
+    text = values.astype("string").str.strip().str.replace(",", "", regex=False).str.upper()
+    parts = text.str.extract(r"^(?P<number>\d+(?:\.\d+)?)(?P<suffix>[KMB]?)$")
+    number = pd.to_numeric(parts["number"], errors="coerce")
+    multiplier = parts["suffix"].map(COUNT_MULTIPLIERS).fillna(1)
+    return (number * multiplier).round().astype("Int64")
+
+
+def snowflake_time(tweet_ids: pd.Series) -> pd.Series:
+    """Creation time encoded in tweet ids (UTC), <NaT> for invalid ids"""
+    ids = pd.to_numeric(
+        tweet_ids.astype("string"), errors="coerce", dtype_backend="numpy_nullable"
+    ).astype("Int64")
+    ms = ids // (1 << 22) + TWITTER_EPOCH_MS
+    return pd.to_datetime(ms, unit="ms", utc=True)
+
+
+def normalize(df: pd.DataFrame, categorical: bool = True) -> pd.DataFrame:
+    """
+    Typed copy of a tweets DataFrame: counts as Int64, date_time as UTC
+    datetime64, the poster's following/follower counts flattened into
+    poster_following_cnt/poster_follower_cnt, the creation time decoded from
+    tweet_id in tweet_time and, with categorical, user/handle as categories.
+    Columns that are not there (see fields) are skipped.
+    """
+    df = df.copy()
+    for column in COUNT_COLUMNS:
+        if column in df:
+            df[column] = parse_counts(df[column])
+
+    if "date_time" in df:
+        df["date_time"] = pd.to_datetime(df["date_time"], utc=True, errors="coerce")
+
+    if "tweet_id" in df:
+        df["tweet_time"] = snowflake_time(df["tweet_id"])
+
+    if "poster_details" in df:
+        details = df["poster_details"]
+        for key, column in POSTER_COUNT_COLUMNS.items():
+            values = details.str.get(key)
+            if values.notna().any():
+                df[column] = parse_counts(values)
+
+    if categorical:
+        for column in CATEGORICAL_COLUMNS:
+            if column in df:
+                df[column] = df[column].astype("category")
+    return df
@@ -0,0 +1,214 @@
+import re
+from urllib.parse import urljoin
+
+import lxml.html
+
+from .locators import get as selector
+from .tweet import Tweet
+
+
+class OfflineParser:
+    """
+    Parses saved tweet HTML (a card's outerHTML or a whole page) into the
+    same records js_engine returns, without a browser. base_url resolves
+    relative links the way the browser would for the page they came from.
+    """
+
+    def __init__(self, base_url: str = "https://x.com/") -> None:
+        self.base_url = base_url
+
+    def parse(self, html: str) -> list:
+        """Returns a tweet dict per card found in html, skipping ads and
+        cards that could not be extracted (as scrape_tweets does)"""
+        tweets = []
+        for record in self.parse_records(html):
+            tweet = Tweet(None, record=record)
+            if not tweet.error and not tweet.is_ad:
+                tweets.append(tweet.tweet)
+        return tweets
+
+    def parse_records(self, html: str) -> list:
+        root = lxml.html.fromstring(html)
+        for br in root.iter("br"):
+            # rendered text has a line break where the markup has <br>
+            br.tail = "\n" + (br.tail or "")
+        return [self.extract_card(card) for card in selector("tweet_cards").select(root)]
+
+    def _text(self, el) -> str:
+        return el.text_content()
+
+    def _url(self, el, attribute: str) -> str | None:
+        value = el.get(attribute)
+        if value is None:
+            return None
+        return urljoin(self.base_url, value)
+
+    def _count(self, card, name: str) -> str:
+        el = selector(name).select_one(card)
+        if el is None:
+            return "0"
+        return self._text(el) or "0"
+
+    def _content(self, card) -> str:
+        text_div = selector("tweet_text").select_one(card)
+        if text_div is None:
+            return ""
+        content = ""
+        for el in selector("tweet_text_parts").select(text_div):
+            if el.tag == "img":
+                content += el.get("alt")
+            elif el.tag == "div":
+                link = selector("tweet_text_link").select_one(el)
+                if link is None:
+                    raise NotImplementedError(
+                        f"Unknown div type in tweet content: {lxml.html.tostring(el, encoding='unicode')[:100]}..."
+                    )
+                content += self._text(link)
+            else:
+                content += self._text(el)
+        return content
+
+    def _video(self, player) -> dict:
+        video = {
+            "video_id": "unknown",
+            "source": "unknown",
+            "duration": "unknown",
+            "thumbnail": "unknown",
+        }
+        source = selector("video_source").select_one(player)
+        video_el = selector("video").select_one(player)
+        if source is None or video_el is None:
+            return video
+        duration = selector("video_duration").select_one(player)
+        src = self._url(source, "src") or ""
+        video["video_id"] = src.split("/")[-1]
+        video["source"] = src
+        video["duration"] = self._text(duration).strip() if duration is not None else "unknown"
+        video["thumbnail"] = self._url(video_el, "poster") or ""
+        return video
+
+    def _thumbnails(self, videos: list) -> set:
+        return set(
+            v["thumbnail"] for v in videos
+            if v.get("thumbnail") not in [None, "unknown"]
+        )
+
+    def _images(self, card) -> list:
+        image_urls = []
+        for img in selector("images").select(card):
+            src = self._url(img, "src")
+            if not src:
+                continue
+            if 'name=small' in src:
+                # Convert to higher quality
+                src = src.replace('name=small', 'name=large')
+            image_urls.append(src)
+        return image_urls
+
+    def _base(self, card) -> dict:
+        record = {"error": False, "is_ad": False, "poster_details": {}}
+
+        user = selector("user").select_one(card)
+        handle = selector("handle").select_one(card)
+        time = selector("time").select_one(card)
+        record["user"] = self._text(user) if user is not None else "skip"
+        record["handle"] = self._text(handle) if handle is not None else "skip"
+        record["date_time"] = time.get("datetime") if time is not None else "skip"
+        record["is_ad"] = time is None
+        record["error"] = user is None or handle is None or time is None
+        if record["error"]:
+            return record
+
+        record["poster_details"]["verified"] = selector("verified").select_one(card) is not None
+        record["content"] = self._content(card)
+        text_div = selector("tweet_text").select_one(card)
+        record["truncated"] = (
+            text_div is not None and selector("text_truncated").select_one(text_div) is not None
+        )
+
+        record["reply_cnt"] = self._count(card, "reply_cnt")
+        record["retweet_cnt"] = self._count(card, "retweet_cnt")
+        record["like_cnt"] = self._count(card, "like_cnt")
+        record["analytics_cnt"] = self._count(card, "analytics_cnt")
+
+        record["tags"] = [
+            self._text(tag)
+            for tag in selector("tags").select(card)
+        ]
+        record["mentions"] = [
+            self._text(mention)
+            for mention in selector("mentions").select(card)
+        ]
+        record["emojis"] = [
+            emoji.get("alt").encode("unicode-escape").decode("ASCII")
+            for emoji in selector("emojis").select(card)
+        ]
+
+        avatar = selector("profile_img").select_one(card)
+        record["poster_details"]["profile_img"] = (
+            self._url(avatar, "src") if avatar is not None else None
+        )
+
+        record["tweet_link"] = ""
+        record["tweet_id"] = ""
+        link = selector("tweet_link").select_one(card)
+        if link is not None:
+            match = re.search(r".*/status/(\d+)", self._url(link, "href"))
+            if match:
+                record["tweet_link"] = match.group(0)
+                record["tweet_id"] = match.group(1)
+        return record
+
+    def _quote(self, card) -> dict | None:
+        quote_card = selector("quote_card").select_one(card)
+        if quote_card is None:
+            return None
+
+        record = self._base(quote_card)
+        if record["error"]:
+            return None
+
+        record["videos"] = [
+            self._video(player)
+            for player in selector("video_player").select(quote_card)
+        ]
+        thumbnails = self._thumbnails(record["videos"])
+        record["image_urls"] = [
+            src for src in self._images(quote_card) if src not in thumbnails
+        ]
+        return record
+
+    def extract_card(self, card) -> dict:
+        """Same record layout as extractCard in extract.js"""
+        record = self._base(card)
+        quote = self._quote(card)
+        record["quoted_tweet"] = quote
+
+        quote_video_ids = set(v["video_id"] for v in quote["videos"]) if quote else set()
+        record["videos"] = []
+        for player in selector("video_player").select(card):
+            source = selector("video_source").select_one(player)
+            if source is None:
+                continue
+            if (self._url(source, "src") or "").split("/")[-1] in quote_video_ids:
+                # video is from quoted tweet
+                continue
+            record["videos"].append(self._video(player))
+
+        excluded = self._thumbnails(record["videos"])
+        if quote:
+            excluded |= set(quote["image_urls"]) | self._thumbnails(quote["videos"])
+        record["image_urls"] = [src for src in self._images(card) if src not in excluded]
+
+        record["media_urls"] = []
+        for wrapper in selector("media_cards").select(card):
+            for link in selector("media_card_links").select(wrapper):
+                href = self._url(link, "href")
+                if href and "t.co/" in href:
+                    record["media_urls"].append(href)
+        return record
+
+
+def parse_snapshot(html: str, base_url: str) -> list:
+    """Process pool entry point: records for the cards in a snapshot"""
+    return OfflineParser(base_url).parse_records(html)
@@ -0,0 +1,74 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait
+from time import perf_counter
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from .dedup import SeenIds
+from .js_engine import snapshot_new_cards
+from .offline import parse_snapshot
+from .resolver import ShortUrlResolver
+from .tweet import Tweet
+
+
+class SnapshotPipeline:
+    """
+    Snapshot-then-parse: the browser thread only ships the outerHTML of newly
+    rendered cards, a process pool parses them with the offline parser while
+    scrolling goes on, and parsed tweets are handed back in page order.
+    """
+
+    def __init__(
+        self,
+        driver: WebDriver,
+        workers: int | None = None,
+        fields: list | None = None,
+        resolver: ShortUrlResolver | None = None,
+    ) -> None:
+        self.driver = driver
+        self.fields = fields
+        self.resolver = resolver
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.pending = deque()
+        self.tweet_ids = SeenIds()
+
+    def step(self, scroll: bool = True) -> tuple:
+        """
+        Ships the cards rendered since the last step to the pool.
+        Returns (number of cards shipped, whether "Discover more" was reached)
+        """
+        start = perf_counter()
+        step = snapshot_new_cards(self.driver, scroll)
+        snapshots = step["snapshots"]
+        if snapshots:
+            # each card is charged its part of the snapshot call only: the
+            # parsing runs in the pool, while the scraper scrolls on
+            step_time = (perf_counter() - start) / len(snapshots)
+            for snapshot in snapshots:
+                future = self.pool.submit(parse_snapshot, snapshot["html"], step["url"])
+                self.pending.append((future, step_time))
+        return len(snapshots), step["boundary"]
+
+    def ready(self, block: bool = False):
+        """
+        Yields a Tweet for every parsed card, stopping at the first card that
+        is still being parsed unless block is set.
+        """
+        while self.pending:
+            future, step_time = self.pending[0]
+            if not future.done():
+                if not block:
+                    return
+                wait([future])
+            self.pending.popleft()
+
+            for record in future.result():
+                tweet = Tweet(None, record=record, fields=self.fields, resolver=self.resolver)
+                if tweet.tweet_id and not self.tweet_ids.add(tweet.tweet_id):
+                    continue
+                tweet.extraction_time += step_time
+                yield tweet
+
+    def close(self) -> None:
+        self.pool.shutdown(cancel_futures=True)
+        self.pending.clear()
@@ -0,0 +1,288 @@
+import json
+import multiprocessing
+import os
+import queue
+import sys
+from collections import Counter, deque
+from datetime import datetime
+from time import sleep
+
+import pandas as pd
+
+from .normalize import normalize as normalize_frame
+
+# memory a worker takes (its browser above all), to size the pool by
+WORKER_MEMORY = 1 << 30
+
+
+def available_memory() -> int | None:
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, OSError, ValueError):
+        # not on this platform
+        return None
+
+
+def auto_size(targets: int | None = None) -> int:
+    """Workers the machine can run: one per CPU, as long as memory allows"""
+    workers = os.cpu_count() or 1
+    memory = available_memory()
+    if memory is not None:
+        workers = min(workers, memory // WORKER_MEMORY)
+    if targets is not None:
+        workers = min(workers, targets)
+    return max(1, workers)
+
+
+def scrape_worker(index, scraper_kwargs, scrape_kwargs, inbox, outbox, log_path):
+    """
+    Worker process: one logged in Twitter_Scraper scraping the targets the
+    pool sends to its inbox until it gets None. Its output goes to log_path;
+    messages to the pool go to its outbox.
+    """
+    # in the worker only: the pool itself needs no browser
+    from .twitter_scraper import Twitter_Scraper
+
+    sys.stdout = sys.stderr = open(log_path, "a", buffering=1, encoding="utf-8")
+    scraper = Twitter_Scraper(**scraper_kwargs)
+    scraper.on_progress = lambda current, waiting: outbox.put(
+        ("progress", index, current, waiting)
+    )
+    scraper.login()
+    outbox.put(("ready", index))
+    while True:
+        item = inbox.get()
+        if item is None:
+            break
+        number, target = item
+        try:
+            data = scraper.scrape_tweets(**{**scrape_kwargs, **target, "return_type": "dict"})
+        except Exception as e:
+            outbox.put(("failed", index, number, str(e)))
+            continue
+        outbox.put(("done", index, number, data))
+    scraper.close()
+
+
+class JsonlWriter:
+    """
+    The pool's single writer: the tweets of every target appended to one
+    JSONL file as they come, each with the target it was scraped from.
+    With normalize, columns are typed as Twitter_Scraper.save_to_jsonl
+    types them (see normalize.normalize).
+    """
+
+    def __init__(self, path: str, normalize: bool = False) -> None:
+        self.path = path
+        self.normalize = normalize
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.file = open(path, "a", encoding="utf-8")
+        self.written = 0
+
+    def write(self, target: dict, tweets: list) -> None:
+        source = target.get("url") or target.get("mode")
+        if self.normalize and tweets:
+            df = normalize_frame(pd.DataFrame(tweets), categorical=False)
+            df.insert(0, "target", source)
+            self.file.write(df.to_json(orient="records", lines=True, date_format="iso").rstrip("\n") + "\n")
+        else:
+            for tweet in tweets:
+                self.file.write(json.dumps({"target": source, **tweet}, default=str) + "\n")
+        self.file.flush()
+        self.written += len(tweets)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class ScraperPool:
+    """
+    Scrapes many targets in parallel: each worker is a process with its own
+    browser and login (see scrape_worker), given the next queued target
+    whenever it is idle, and their tweets are written by this process only,
+    as each target is done.
+
+    A target is a URL (scraped in "url" mode) or a dict of scrape_tweets
+    arguments, on top of scrape_kwargs. A worker that dies is restarted (up
+    to max_restarts times) and the target it was on is queued again; a
+    target is given up after max_attempts failures. normalize types the
+    columns written (see JsonlWriter).
+    """
+
+    def __init__(
+        self,
+        scraper_kwargs: dict,
+        scrape_kwargs: dict | None = None,
+        workers: int | None = None,
+        writer: JsonlWriter | None = None,
+        save_folder_path: str = "./tweets/",
+        max_attempts: int = 2,
+        max_restarts: int = 3,
+        work=scrape_worker,
+        normalize: bool = False,
+    ) -> None:
+        self.scraper_kwargs = scraper_kwargs
+        self.scrape_kwargs = scrape_kwargs or {}
+        self.workers = workers
+        self.save_folder_path = save_folder_path
+        if writer is None:
+            now = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            writer = JsonlWriter(
+                os.path.join(save_folder_path, f"{now}_pool_tweets.jsonl"), normalize=normalize
+            )
+        self.writer = writer
+        self.max_attempts = max_attempts
+        self.max_restarts = max_restarts
+        self.work = work
+        self.processes = {}  # worker index -> (process, inbox, outbox)
+        self.status = {}  # worker index -> what it is doing
+        self.current = {}  # worker index -> target number it is on
+        self.restarts = Counter()
+        self.attempts = Counter()
+        self.counts = {}  # target number -> tweets written
+        self.failed = {}  # target number -> last error
+
+    @staticmethod
+    def _target(target) -> dict:
+        if isinstance(target, str):
+            return {"mode": "url", "url": target}
+        return dict(target)
+
+    def _start(self, index: int) -> None:
+        # queues of its own: a worker dying in the middle of a read or a
+        # write can leave a queue locked
+        inbox, outbox = self.context.Queue(), self.context.Queue()
+        log_path = os.path.join(self.save_folder_path, f"worker-{index}.log")
+        process = self.context.Process(
+            target=self.work,
+            args=(index, self.scraper_kwargs, self.scrape_kwargs, inbox, outbox, log_path),
+        )
+        process.start()
+        self.processes[index] = (process, inbox, outbox)
+        self.status[index] = "logging in"
+
+    def _assign(self) -> None:
+        # hands the queued targets to the idle workers
+        while self.queue and self.idle:
+            index = self.idle.pop()
+            number = self.queue.popleft()
+            self.current[index] = number
+            self.status[index] = f"#{number} 0"
+            self.processes[index][1].put((number, self.targets[number]))
+
+    def _retry(self, number: int, error: str) -> None:
+        self.attempts[number] += 1
+        if self.attempts[number] < self.max_attempts:
+            self.queue.append(number)
+        else:
+            self.failed[number] = error
+
+    def _receive(self, outbox) -> bool:
+        # handles what a worker sent; False if it sent nothing
+        received = False
+        while True:
+            try:
+                message = outbox.get_nowait()
+            except queue.Empty:
+                return received
+            self._handle(message)
+            received = True
+
+    def _check_workers(self) -> None:
+        # restarts the workers that died, queueing their target again
+        for index, (process, _, outbox) in list(self.processes.items()):
+            if process.is_alive():
+                continue
+            # what it sent before dying comes first
+            self._receive(outbox)
+            del self.processes[index]
+            self.idle.discard(index)
+            number = self.current.pop(index, None)
+            if number is not None:
+                self._retry(number, f"worker died (exit code {process.exitcode})")
+            if self.restarts[index] < self.max_restarts:
+                self.restarts[index] += 1
+                self._start(index)
+            else:
+                self.status[index] = "down"
+
+    def _print_status(self) -> None:
+        workers = " | ".join(
+            f"w{index}: {self.status[index]}" for index in sorted(self.status)
+        )
+        sys.stdout.write(
+            "\rTargets: {} of {} - Tweets: {} - {}          ".format(
+                len(self.counts) + len(self.failed), len(self.targets), self.writer.written, workers
+            )
+        )
+        sys.stdout.flush()
+
+    def _handle(self, message: tuple) -> None:
+        kind, index = message[0], message[1]
+        if kind == "progress":
+            _, _, current, waiting = message
+            number = self.current.get(index)
+            self.status[index] = "#{} {}{}".format(number, current, " (rate limited)" if waiting else "")
+            return
+        if kind == "done":
+            _, _, number, data = message
+            self.writer.write(self.targets[number], data)
+            self.counts[number] = len(data)
+        elif kind == "failed":
+            _, _, number, error = message
+            self._retry(number, error)
+        self.current.pop(index, None)
+        self.status[index] = "idle"
+        self.idle.add(index)
+
+    def run(self, targets: list) -> dict:
+        """
+        Scrapes the targets; returns the number of tweets of each target
+        that was done, by position in targets (see failed for the others).
+        """
+        self.targets = [self._target(target) for target in targets]
+        size = self.workers or auto_size(len(self.targets))
+        os.makedirs(self.save_folder_path, exist_ok=True)
+        self.context = multiprocessing.get_context()
+        self.queue = deque(range(len(self.targets)))
+        self.idle = set()
+
+        print(f"Scraping {len(self.targets)} targets with {size} workers...")
+        for index in range(size):
+            self._start(index)
+
+        try:
+            while len(self.counts) + len(self.failed) < len(self.targets):
+                if not self.processes:
+                    print()
+                    print("All workers are down")
+                    break
+                received = False
+                for _, _, outbox in list(self.processes.values()):
+                    received = self._receive(outbox) or received
+                self._check_workers()
+                self._assign()
+                self._print_status()
+                if not received:
+                    sleep(0.1)
+        finally:
+            for _, inbox, _ in self.processes.values():
+                inbox.put(None)
+            for process, _, _ in self.processes.values():
+                process.join(timeout=30)
+                if process.is_alive():
+                    process.terminate()
+            self.writer.close()
+
+        print()
+        return dict(sorted(self.counts.items()))
+
+    def summary(self) -> str:
+        return "Pool: {} of {} targets done, {} failed, {} tweets written to {} ({} worker restarts)".format(
+            len(self.counts),
+            len(self.targets),
+            len(self.failed),
+            self.writer.written,
+            self.writer.path,
+            sum(self.restarts.values()),
+        )
@@ -5,8 +5,23 @@ class Progress:
     def __init__(self, current, total) -> None:
         self.current = current
         self.total = total
+        # JS heap of the page in bytes, shown when known
+        self.heap = None
+        # seconds left before the next try while rate limited
+        self.wait_left = None
+        # called with (current, waiting) after each print
+        self.listener = None
         pass
 
+    def _heap(self) -> str:
+        if self.heap is None:
+            return ""
+        return " - JS heap: {:.1f} MB".format(self.heap / 2**20)
+
+    def _wait(self, retry_cnt) -> str:
+        left = int(self.wait_left or 0)
+        return " - rate limited, retry {} in {}:{:02d}".format(retry_cnt, left // 60, left % 60)
+
     def print_progress(self, current, waiting, retry_cnt, no_tweets_limit) -> None:
         self.current = current
         progress = current / self.total
@@ -20,27 +35,29 @@ class Progress:
         if no_tweets_limit:
             if waiting:
                 sys.stdout.write(
-                    "\rTweets scraped : {} - waiting to access older tweets {} min on 15 min".format(
-                        current, retry_cnt
+                    "\rTweets scraped : {}{}{}          ".format(
+                        current, self._heap(), self._wait(retry_cnt)
                     )
                 )
             else:
                 sys.stdout.write(
-                    "\rTweets scraped : {}                                                  ".format(
-                        current
+                    "\rTweets scraped : {}{}                                                  ".format(
+                        current, self._heap()
                     )
                 )
         else:
             if waiting:
                 sys.stdout.write(
-                    "\rProgress: [{:<40}] {:.2%} {} of {} - waiting to access older tweets {} min on 15 min".format(
-                        progress_bar, progress, current, self.total, retry_cnt
+                    "\rProgress: [{:<40}] {:.2%} {} of {}{}{}          ".format(
+                        progress_bar, progress, current, self.total, self._heap(), self._wait(retry_cnt)
                     )
                 )
             else:
                 sys.stdout.write(
-                    "\rProgress: [{:<40}] {:.2%} {} of {}                                                  ".format(
-                        progress_bar, progress, current, self.total
+                    "\rProgress: [{:<40}] {:.2%} {} of {}{}                                                  ".format(
+                        progress_bar, progress, current, self.total, self._heap()
                     )
                 )
         sys.stdout.flush()
+        if self.listener is not None:
+            self.listener(current, waiting)
@@ -4,12 +4,19 @@ from .card import Card
 
 
 class Quote(Card):
-    def __init__(self, quote_card: WebElement) -> None:
+    def __init__(self, quote_card: WebElement | None, record: dict | None = None) -> None:
+        """
+        record is an already extracted quote (see js_engine); when given,
+        quote_card is not scraped
+        """
         super().__init__(quote_card)
         self.error = False
         self.quote = None
         self.poster_details = {}
-        self._scrape()
+        if record is None:
+            self._scrape()
+        else:
+            self._apply(record)
         # Build final tweet dictionary
         self._build_tweet_dict()
 
@@ -23,6 +30,7 @@ class Quote(Card):
             "handle": self.handle,
             "date_time": self.date_time,
             "content": self.content,
+            "truncated": self.truncated,
             "tags": self.tags,
             "mentions": self.mentions,
             "emojis": self.emojis,
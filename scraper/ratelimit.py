@@ -0,0 +1,282 @@
+import random
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from time import monotonic, time
+
+from .utils import load_json, locked_json
+
+# requests a page load makes, counted in scroll steps
+PAGE_LOAD_COST = 5
+
+
+class Backoff:
+    """
+    Exponential delays with jitter: the n-th delay in a row is drawn between
+    jitter * d and d, where d = base * factor ** n, capped. Several scrapers
+    throttled at once do not come back at the same time.
+    """
+
+    def __init__(
+        self,
+        base: float = 30.0,
+        factor: float = 2.0,
+        cap: float = 15 * 60,
+        jitter: float = 0.5,
+        rng: random.Random | None = None,
+    ) -> None:
+        self.base = base
+        self.factor = factor
+        self.cap = cap
+        self.jitter = jitter
+        self.rng = rng if rng is not None else random.Random()
+
+    def delay(self, attempt: int) -> float:
+        delay = min(self.cap, self.base * self.factor ** attempt)
+        return self.rng.uniform(self.jitter * delay, delay)
+
+
+class TokenBucket:
+    """
+    Paces requests at rate per second on average, with at most burst of
+    them saved up, so that a budget is spent evenly instead of all at once.
+
+    The rate tunes itself from throttles: halved on each one (down to
+    min_rate), then raised by a fraction of max_rate for every request that
+    went through (additive increase, multiplicative decrease), so that it
+    settles a little below what the account is allowed.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float = 10,
+        min_rate: float | None = None,
+        max_rate: float | None = None,
+        stop: threading.Event | None = None,
+    ) -> None:
+        self.max_rate = max_rate if max_rate is not None else rate
+        self.min_rate = min_rate if min_rate is not None else self.max_rate / 16
+        self.rate = min(self.max_rate, max(self.min_rate, rate))
+        self.burst = burst
+        self.stop = stop if stop is not None else threading.Event()
+        self.tokens = burst
+        self.updated = monotonic()
+        self.waited = 0.0
+
+    def _refill(self) -> None:
+        now = monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, cost: float = 1) -> bool:
+        """Waits until cost tokens are there; False if stop was set meanwhile"""
+        self._refill()
+        # a request costing more than the burst runs into debt
+        needed = min(cost, self.burst)
+        while self.tokens < needed:
+            delay = (needed - self.tokens) / self.rate
+            if self.stop.wait(delay):
+                return False
+            self.waited += delay
+            self._refill()
+        self.tokens -= cost
+        return True
+
+    def decrease(self) -> None:
+        self.rate = max(self.min_rate, self.rate / 2)
+        # no burst right after a throttle
+        self.tokens = min(self.tokens, 0)
+
+    def increase(self, cost: float = 1) -> None:
+        self.rate = min(self.max_rate, self.rate + self.max_rate * cost / 100)
+
+
+class Cooldowns:
+    """
+    Rate limit state of every account (until when it cools down, throttles
+    in a row, the pace it was tuned to), kept in a JSON file so that the
+    next run, or another scraper, does not use an account before its limit
+    is over.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+        self.states = self._load()
+
+    def __getstate__(self) -> dict:
+        # handed to worker processes
+        return {"path": self.path, "states": self.states}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def _load(self) -> dict:
+        return load_json(self.path) if self.path is not None else {}
+
+    @contextmanager
+    def locked(self):
+        """
+        The states of every account as in the file, locked against other
+        threads and processes, and written back once changed
+        """
+        with self.lock:
+            if self.path is None:
+                yield self.states
+                return
+            # as written by other scrapers meanwhile
+            with locked_json(self.path) as states:
+                self.states = states
+                yield states
+
+    def get(self, account: str) -> dict:
+        with self.lock:
+            if self.path is not None:
+                self.states = self._load()
+            return {"until": 0, "strikes": 0, **self.states.get(account, {})}
+
+    def set(self, account: str, **state) -> None:
+        with self.locked() as states:
+            states[account] = {
+                **states.get(account, {}),
+                **state,
+                "updated": datetime.now().isoformat(timespec="seconds"),
+            }
+
+
+class RateLimiter:
+    """
+    Backs off when an account is throttled (the "Retry" button, 429
+    responses, a feed that stays empty). Each throttle in a row waits
+    longer (see Backoff), or until the reset time the server gave; a step
+    that brings tweets again ends the streak. The cooldown is saved in
+    Cooldowns, per account.
+
+    With a budget, pace() spends at most that many requests (page loads,
+    scroll steps) per window, evenly (see TokenBucket); the pace it tunes
+    itself to is saved with the cooldown and the next run starts there.
+
+    wait() and pace() return early, with False, once stop is set: a
+    supervisor can take the work away from a throttled scraper instead of
+    waiting for it.
+    """
+
+    def __init__(
+        self,
+        account: str,
+        cooldowns: Cooldowns | None = None,
+        backoff: Backoff | None = None,
+        max_attempts: int = 15,
+        stop: threading.Event | None = None,
+        tick: float = 1.0,
+        budget: float | None = None,
+        window: float = 15 * 60,
+        burst: float = 10,
+    ) -> None:
+        self.account = account
+        self.cooldowns = cooldowns if cooldowns is not None else Cooldowns()
+        self.backoff = backoff if backoff is not None else Backoff()
+        self.max_attempts = max_attempts
+        self.stop = stop if stop is not None else threading.Event()
+        self.tick = tick
+        state = self.cooldowns.get(account)
+        self.until = state["until"]
+        self.strikes = state["strikes"]
+        self.bucket = None
+        if budget is not None:
+            max_rate = budget / window
+            self.bucket = TokenBucket(
+                state.get("rate", max_rate), burst, max_rate=max_rate, stop=self.stop
+            )
+        # metrics of this run
+        self.signals = Counter()
+        self.waited = 0.0
+        self.interrupted = False
+
+    def remaining(self) -> float:
+        """Seconds left before the account can be used again"""
+        return max(0.0, self.until - time())
+
+    def exhausted(self) -> bool:
+        return self.strikes >= self.max_attempts
+
+    def throttle(self, signal: str, reset_at: float | None = None) -> float:
+        """
+        Records a throttle (signal names its cause) and returns the delay
+        before the next try. reset_at is the epoch time the server said the
+        limit resets at, if it did.
+        """
+        self.signals[signal] += 1
+        delay = self.backoff.delay(self.strikes)
+        if reset_at is not None:
+            # a little after the reset, jittered as well
+            delay = max(reset_at - time(), 0) + self.backoff.delay(0) * 0.1
+        self.strikes += 1
+        self.until = time() + delay
+        if self.bucket is not None:
+            self.bucket.decrease()
+        self.save(last_throttle=datetime.now().isoformat(timespec="seconds"))
+        return delay
+
+    def success(self) -> None:
+        """The account brings tweets again"""
+        if self.strikes or self.until:
+            self.strikes = 0
+            self.until = 0
+            self.save()
+
+    def pace(self, cost: float = 1) -> bool:
+        """
+        Waits for the budget to allow a request of that cost (a page load
+        costs more than a scroll step). False if stop was set meanwhile.
+        """
+        if self.bucket is None:
+            return True
+        if not self.bucket.take(cost):
+            self.interrupted = True
+            return False
+        self.bucket.increase(cost)
+        return True
+
+    def save(self, **extra) -> None:
+        state = {"until": self.until, "strikes": self.strikes, **extra}
+        if self.bucket is not None:
+            state["rate"] = self.bucket.rate
+        self.cooldowns.set(self.account, **state)
+
+    def wait(self, on_tick=None) -> bool:
+        """
+        Waits out the cooldown, calling on_tick(self) every tick seconds.
+        Returns False if stop was set meanwhile.
+        """
+        while self.remaining() > 0:
+            if on_tick is not None:
+                on_tick(self)
+            step = min(self.tick, self.remaining())
+            if self.stop.wait(step):
+                self.interrupted = True
+                return False
+            self.waited += step
+        return True
+
+    def summary(self) -> str:
+        signals = ", ".join(f"{name}: {count}" for name, count in self.signals.most_common())
+        waited = int(self.waited)
+        text = "Rate limit ({}): {} throttle(s) ({}), waited {}:{:02d}".format(
+            self.account,
+            sum(self.signals.values()),
+            signals,
+            waited // 60,
+            waited % 60,
+        )
+        if self.bucket is not None:
+            paced = int(self.bucket.waited)
+            text += "; paced at {:.1f} requests/min, waited {}:{:02d}".format(
+                60 * self.bucket.rate, paced // 60, paced % 60
+            )
+        if self.interrupted:
+            text += ", interrupted"
+        return text
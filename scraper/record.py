@@ -0,0 +1,129 @@
+import sys
+
+import pandas as pd
+
+from .tweet import TWEET_FIELDS
+from .utils import parse_count
+
+QUOTE_FIELDS = (
+    "user",
+    "handle",
+    "date_time",
+    "content",
+    "truncated",
+    "tags",
+    "mentions",
+    "emojis",
+    "tweet_link",
+    "tweet_id",
+    "image_urls",
+    "videos",
+    "poster_details",
+)
+
+COUNT_FIELDS = ("reply_cnt", "retweet_cnt", "like_cnt", "analytics_cnt")
+# repeated across many tweets of a run: one shared copy per distinct value
+INTERNED_FIELDS = ("user", "handle")
+LIST_FIELDS = ("tags", "mentions", "emojis", "image_urls", "videos", "media_urls", "resolved_media_urls")
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class _Record:
+    """
+    Compact, read-only form of a tweet dict: one slot per field instead of
+    a dict, user/handle/tags/mentions interned, lists stored as tuples and
+    counts as ints (None when the displayed count could not be read).
+    Fields left out by a projection are simply not set.
+    """
+
+    __slots__ = ()
+    FIELDS = ()
+
+    def __init__(self, tweet: dict) -> None:
+        for field, value in tweet.items():
+            if field in INTERNED_FIELDS:
+                value = _intern(value)
+            elif field in COUNT_FIELDS:
+                value = parse_count(value)
+            elif field in ("tags", "mentions"):
+                value = tuple(_intern(v) for v in value) if value is not None else None
+            elif field == "resolved_media_urls":
+                # kept as is: a background resolver fills this list in place
+                pass
+            elif field in LIST_FIELDS:
+                value = tuple(value) if value is not None else None
+            elif field == "quoted_tweet":
+                value = QuoteRecord(value) if value is not None else None
+            object.__setattr__(self, field, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"'{type(self).__name__}' is read-only")
+
+    def __iter__(self):
+        # fields that are set, in output order
+        for field in self.FIELDS:
+            try:
+                yield field, getattr(self, field)
+            except AttributeError:
+                continue
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return "{}(tweet_id={!r}, handle={!r})".format(
+            type(self).__name__, getattr(self, "tweet_id", None), getattr(self, "handle", None)
+        )
+
+    def to_dict(self) -> dict:
+        tweet = {}
+        for field, value in self:
+            if field in LIST_FIELDS and value is not None:
+                value = list(value)
+            elif field == "quoted_tweet" and value is not None:
+                value = value.to_dict()
+            tweet[field] = value
+        return tweet
+
+
+class QuoteRecord(_Record):
+    __slots__ = QUOTE_FIELDS
+    FIELDS = QUOTE_FIELDS
+
+
+class TweetRecord(_Record):
+    __slots__ = TWEET_FIELDS
+    FIELDS = TWEET_FIELDS
+
+
+def to_dicts(data: list) -> list:
+    """Tweet dicts for a list of tweet dicts or TweetRecords"""
+    return [tweet.to_dict() if isinstance(tweet, TweetRecord) else tweet for tweet in data]
+
+
+def to_frame(records: list) -> pd.DataFrame:
+    """
+    DataFrame with a column per field set on the records, built column by
+    column so that no per-tweet dict is created
+    """
+    if not records:
+        return pd.DataFrame()
+    columns = {}
+    for field in TWEET_FIELDS:
+        if not hasattr(records[0], field):
+            continue
+        values = [getattr(record, field) for record in records]
+        if field in COUNT_FIELDS:
+            # nullable ints: a missing count does not turn the column to float
+            values = pd.array(values, dtype="Int64")
+        elif field in LIST_FIELDS:
+            values = [list(v) if v is not None else None for v in values]
+        elif field == "quoted_tweet":
+            values = [v.to_dict() if v is not None else None for v in values]
+        columns[field] = values
+    return pd.DataFrame(columns)
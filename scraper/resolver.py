@@ -0,0 +1,144 @@
+import threading
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .cache import Cache
+
+
+class ShortUrlResolver:
+    """
+    Resolves short links (t.co) in the background so that scraping never
+    waits on a redirect target.
+
+    Requests share one keep-alive session and run on a thread pool; a URL
+    already being resolved is not requested twice, and at most per_host
+    requests hit the same host at once (redirects are followed hop by hop
+    so every host is limited). fill() queues the URLs of a list and join()
+    writes the resolved URLs back into it, in place.
+
+    With a cache, each resolution ({"url", "chain", "ok"}) is kept for
+    ok_ttl seconds, or fail_ttl if the link could not be followed, so that
+    known dead links do not cost the timeout again.
+    """
+
+    def __init__(
+        self,
+        workers: int = 8,
+        per_host: int = 4,
+        timeout: float = 10,
+        max_redirects: int = 10,
+        prefixes: tuple = ("https://t.co/",),
+        cache: Cache | None = None,
+        ok_ttl: float = 30 * 24 * 3600,
+        fail_ttl: float = 24 * 3600,
+    ) -> None:
+        self.cache = cache
+        self.ok_ttl = ok_ttl
+        self.fail_ttl = fail_ttl
+        self.timeout = timeout
+        self.max_redirects = max_redirects
+        self.prefixes = prefixes
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.lock = threading.Lock()
+        self.host_limits = defaultdict(lambda: threading.BoundedSemaphore(per_host))
+        self.in_flight = {}  # url -> future
+        self.pending = []  # (list, index, future) to write back on join
+        self.requested = 0
+        self.shared = 0
+        self.cached = 0
+
+    def _host_limit(self, url: str) -> threading.BoundedSemaphore:
+        with self.lock:
+            return self.host_limits[urlsplit(url).netloc]
+
+    def _follow(self, url: str) -> dict:
+        # the last URL reached (url itself if it could not be followed, as
+        # utils.resolve_short_url does) and every URL on the way
+        chain = [url]
+        try:
+            for _ in range(self.max_redirects):
+                with self._host_limit(chain[-1]):
+                    response = self.session.head(
+                        chain[-1], allow_redirects=False, timeout=self.timeout
+                    )
+                location = response.headers.get("Location")
+                if not response.is_redirect or not location:
+                    break
+                chain.append(urljoin(chain[-1], location))
+            return {"url": chain[-1], "chain": chain, "ok": True}
+        except requests.RequestException as e:
+            print(f"Warning: Could not resolve short URL {url}: {e}")
+            return {"url": url, "chain": chain, "ok": False}
+
+    def _resolve(self, url: str) -> str:
+        resolution = self._follow(url)
+        if self.cache is not None:
+            ttl = self.ok_ttl if resolution["ok"] else self.fail_ttl
+            self.cache.set(url, resolution, ttl=ttl)
+        return resolution["url"]
+
+    def _done(self, url: str) -> None:
+        with self.lock:
+            self.in_flight.pop(url, None)
+
+    def _resolved(self, url: str) -> Future:
+        future = Future()
+        future.set_result(url)
+        return future
+
+    def submit(self, url: str) -> Future:
+        """Future of the resolved URL"""
+        if not url.startswith(self.prefixes):
+            return self._resolved(url)
+        resolution = self.cache.get(url) if self.cache is not None else None
+        if resolution is not None:
+            self.cached += 1
+            return self._resolved(resolution["url"])
+        with self.lock:
+            future = self.in_flight.get(url)
+            if future is not None:
+                self.shared += 1
+                return future
+            self.requested += 1
+            future = self.pool.submit(self._resolve, url)
+            self.in_flight[url] = future
+        future.add_done_callback(lambda _: self._done(url))
+        return future
+
+    def resolve(self, url: str) -> str:
+        return self.submit(url).result()
+
+    def fill(self, urls: list) -> list:
+        """
+        Queues every URL of urls; join() replaces them with the resolved
+        ones. Returns urls.
+        """
+        for index, url in enumerate(urls):
+            self.pending.append((urls, index, self.submit(url)))
+        return urls
+
+    def join(self) -> None:
+        """Waits for every filled list to be resolved"""
+        pending, self.pending = self.pending, []
+        for urls, index, future in pending:
+            urls[index] = future.result()
+
+    def summary(self) -> str:
+        return "Short URLs: {} resolved, {} from cache, {} shared an in-flight request".format(
+            self.requested, self.cached, self.shared
+        )
+
+    def close(self) -> None:
+        self.join()
+        self.pool.shutdown(wait=True)
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
@@ -0,0 +1,107 @@
+from .dedup import SeenIds
+from .record import TweetRecord
+
+
+class ScrapeRun:
+    """
+    Options and state of one Twitter_Scraper.scrape_tweets call, shared by
+    the steps of its scroll loop: the tweets kept so far, and which of the
+    new ones are kept (not an error or an ad, not scraped by a previous
+    run, until max_tweets are kept).
+
+    The page objects (progress, scroller, pipeline, capture) and the
+    optional helpers (watermark, enricher) are set by scrape_tweets.
+    """
+
+    def __init__(
+        self,
+        max_tweets: int = 50,
+        mode: str = "timeline",
+        no_tweets_limit: bool = False,
+        scrape_poster_details: bool = False,
+        url: str | None = None,
+        engine: str = "webdriver",
+        fields: list | None = None,
+        return_type: str = "dict",
+        dedup_error_rate: float = 0.0001,
+        watermark_slack: int = 5,
+        prune: str | None = None,
+    ) -> None:
+        self.max_tweets = max_tweets
+        self.mode = mode
+        self.no_tweets_limit = no_tweets_limit
+        self.scrape_poster_details = scrape_poster_details
+        self.url = url
+        self.engine = engine
+        self.fields = fields
+        self.return_type = return_type
+        self.watermark_slack = watermark_slack
+        self.prune = prune
+
+        self.progress = None
+        self.scroller = None
+        self.pipeline = None
+        # 429 responses, when network events are logged
+        self.capture = None
+        self.watermark = None
+        self.enricher = None
+
+        self.data = []
+        self.tweet_ids = SeenIds(error_rate=dedup_error_rate)
+        # extraction time, totalled rather than kept per tweet
+        self.extraction_time = 0.0
+        self.extracted = 0
+        self.covered_in_row = 0
+        self.reached_watermark = False
+        # the whole feed was scraped, down to its end
+        self.feed_ended = False
+
+    @property
+    def full(self) -> bool:
+        return len(self.data) >= self.max_tweets and not self.no_tweets_limit
+
+    def timed(self, tweet) -> None:
+        self.extraction_time += tweet.extraction_time
+        self.extracted += 1
+
+    def take(self, tweet) -> bool:
+        """
+        Keeps the tweet unless it is not to be kept; True if kept.
+        watermark_slack tweets in a row scraped by a previous run set
+        reached_watermark (older tweets can be mixed with new ones: pinned
+        tweets, "Top" results).
+        """
+        accepted = not tweet.error and tweet.tweet is not None and not tweet.is_ad
+        # read after the checks: lazy tweets are scraped by them
+        self.timed(tweet)
+        if not accepted:
+            return False
+
+        watermark = self.watermark
+        if watermark is not None and watermark.covers(tweet.tweet_id, tweet.date_time):
+            # scraped by a previous run
+            self.covered_in_row += 1
+            if self.covered_in_row >= self.watermark_slack:
+                self.reached_watermark = True
+            return False
+        if watermark is not None and watermark.scraped(tweet.tweet_id, tweet.date_time):
+            # scraped by a previous run stopped before the watermark
+            return False
+
+        self.covered_in_row = 0
+        self.keep(tweet)
+        return True
+
+    def scraped_before(self, tweet) -> bool:
+        """Whether a previous run scraped the tweet (see watermark.Watermark)"""
+        return self.watermark is not None and (
+            self.watermark.covers(tweet.tweet_id, tweet.date_time)
+            or self.watermark.scraped(tweet.tweet_id, tweet.date_time)
+        )
+
+    def keep(self, tweet) -> None:
+        self.data.append(tweet.tweet if self.return_type == "dict" else TweetRecord(tweet.tweet))
+        if self.enricher is not None:
+            self.enricher.submit(tweet.handle, tweet.poster_details)
+        if self.watermark is not None:
+            self.watermark.advance(tweet.tweet_id, tweet.date_time)
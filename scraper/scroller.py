@@ -1,14 +1,83 @@
 import time
 import random
+from collections import deque
+from time import perf_counter
+
+from .locators import get as selector
+from .waits import Waits
+
+# what the controller looks at after each step, in one round trip
+FEED_STATE_JS = """
+const cards = document.querySelectorAll(arguments[0]);
+const last = cards.length ? cards[cards.length - 1].querySelector(arguments[1]) : null;
+return {
+    height: document.documentElement.scrollHeight,
+    y: window.scrollY,
+    viewport: window.innerHeight,
+    last: last ? last.href : null,
+    spinner: document.querySelector(arguments[2]) !== null,
+};
+"""
 
 
 class Scroller:
-    def __init__(self, driver) -> None:
+    """
+    Scroll controller. After the cards of a step are read, advance() either
+    declares the end of the feed or scrolls the next step, in viewport-sized
+    steps, and waits for what it brings to render.
+
+    - the wait after a step near the bottom of the page ends as soon as the
+      page grows or its last card changes, and its limit follows the observed
+      render latency (a slow load makes it longer instead of ending the feed)
+    - the step shrinks when a step at the bottom brings nothing or when one
+      brings many new cards at once, and grows while steps are productive
+    - the feed ends after `patience` steps in a row at the bottom of the page
+      with no new cards, no growth and no loading spinner (or after
+      3 * patience such steps, spinner or not)
+
+    The last history_size decisions are kept in history, with their
+    timings; summary() covers the whole run, from running totals.
+    """
+
+    def __init__(
+        self,
+        driver,
+        waits: Waits | None = None,
+        patience: int = 3,
+        min_step: float = 0.5,
+        max_step: float = 2.0,
+        min_wait: float = 0.25,
+        max_wait: float = 8.0,
+        busy_step: int = 10,
+        history_size: int = 100,
+    ) -> None:
         self.driver = driver
         self.current_position = 0
         self.last_position = driver.execute_script("return window.pageYOffset;")
         self.scrolling = True
         self.scroll_count = 0
+        self.waits = waits if waits is not None else Waits(driver)
+        self.patience = patience
+        # step size, in viewport heights
+        self.min_step = min_step
+        self.max_step = max_step
+        self.step = 1.0
+        # longest wait for a step to render, in seconds
+        self.min_wait = min_wait
+        self.max_wait = max_wait
+        self.wait = 1.0
+        # above that many new cards, a step is made shorter
+        self.busy_step = busy_step
+        self.latency = None  # moving average of the render latency
+        self.stagnant = 0
+        self.last_height = None
+        self.end_reason = None
+        self.history = deque(maxlen=history_size)
+        # totals of the run, for summary()
+        self.scrolls = 0
+        self.distance = 0
+        self.latencies = 0
+        self.latency_total = 0.0
         pass
 
     def reset(self) -> None:
@@ -28,3 +97,108 @@ class Scroller:
     def update_scroll_position(self) -> None:
         self.current_position = self.driver.execute_script("return window.pageYOffset;")
         pass
+
+    def _state(self) -> dict:
+        return self.driver.execute_script(
+            FEED_STATE_JS,
+            selector("tweet_cards").css,
+            selector("tweet_link").css,
+            selector("loading_spinner").css,
+        )
+
+    def _end(self, reason: str) -> bool:
+        self.scrolling = False
+        self.end_reason = reason
+        return False
+
+    def advance(self, new_cards: int) -> bool:
+        """
+        Takes the number of new cards read since the previous step. Returns
+        False once the end of the feed is declared, otherwise scrolls the
+        next step and returns True when it is rendered (or waited for long
+        enough).
+        """
+        state = self._state()
+        grew = self.last_height is not None and state["height"] > self.last_height
+        self.last_height = state["height"]
+        at_bottom = state["y"] + state["viewport"] >= state["height"] - 2
+        decision = {
+            "step": self.scroll_count,
+            "new": new_cards,
+            "height": state["height"],
+            "viewport": state["viewport"],
+            "grew": grew,
+            "spinner": state["spinner"],
+            "latency": None,
+        }
+        self.history.append(decision)
+
+        if new_cards or grew:
+            self.stagnant = 0
+            if new_cards >= self.busy_step:
+                # cards may be missed if a step brings too many at once
+                self.step = max(self.min_step, self.step * 0.75)
+            else:
+                self.step = min(self.max_step, self.step * 1.25)
+        elif at_bottom:
+            self.stagnant += 1
+            # closer to the loader, so that it triggers again
+            self.step = max(self.min_step, self.step / 2)
+        else:
+            # the cards below were read already: catch up with the bottom
+            self.step = self.max_step
+        decision["stagnant"] = self.stagnant
+
+        if self.stagnant >= self.patience and not state["spinner"]:
+            decision["decision"] = "end"
+            return self._end("no new tweets, no growth and nothing loading")
+        if self.stagnant >= 3 * self.patience:
+            decision["decision"] = "end"
+            return self._end("still loading after {} steps".format(self.stagnant))
+
+        distance = int(self.step * state["viewport"])
+        self.driver.execute_script("window.scrollBy(0, arguments[0]);", distance)
+        self.scroll_count += 1
+        self.scrolls += 1
+        self.distance += distance
+        decision["decision"] = "scroll"
+        decision["distance"] = distance
+        decision["wait"] = self.wait
+
+        if state["y"] + distance + 2 * state["viewport"] < state["height"]:
+            # the cards below are rendered already
+            return True
+
+        start = perf_counter()
+        changed = self.waits.until(
+            lambda _: self._rendered(state),
+            self.wait,
+        )
+        if changed:
+            latency = perf_counter() - start
+            decision["latency"] = latency
+            self.latencies += 1
+            self.latency_total += latency
+            self.latency = latency if self.latency is None else 0.7 * self.latency + 0.3 * latency
+            self.wait = min(self.max_wait, max(self.min_wait, 3 * self.latency))
+        else:
+            # a slow load rather than the end: be more patient next time
+            self.wait = min(self.max_wait, self.wait * 1.5)
+        return True
+
+    def _rendered(self, before: dict) -> bool:
+        state = self._state()
+        return state["height"] != before["height"] or state["last"] != before["last"]
+
+    def summary(self) -> str:
+        text = "Scrolling: {} steps of {:.0f} px on average".format(
+            self.scrolls,
+            self.distance / self.scrolls if self.scrolls else 0,
+        )
+        if self.latencies:
+            text += ", render latency {:.0f} ms on average".format(
+                1000 * self.latency_total / self.latencies
+            )
+        if self.end_reason is not None:
+            text += "; end of feed: " + self.end_reason
+        return text
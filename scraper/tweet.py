@@ -1,4 +1,4 @@
-from time import sleep
+from time import perf_counter
 
 from selenium.common.exceptions import (NoSuchElementException,
                                         StaleElementReferenceException)
@@ -6,40 +6,115 @@ from selenium.webdriver.chrome.webdriver import WebDriver
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.remote.webelement import WebElement
 
+from .cache import Cache
 from .card import Card
+from .js_engine import extract_card
+from .locators import get as selector
 from .quote import Quote
+from .resolver import ShortUrlResolver
 from .utils import resolve_short_url
+from .waits import Waits
+
+# keys of Tweet.tweet, in output order
+TWEET_FIELDS = (
+    "user",
+    "handle",
+    "date_time",
+    "content",
+    "truncated",
+    "reply_cnt",
+    "retweet_cnt",
+    "like_cnt",
+    "analytics_cnt",
+    "tags",
+    "mentions",
+    "emojis",
+    "tweet_link",
+    "tweet_id",
+    "quoted_tweet",
+    "image_urls",
+    "videos",
+    "media_urls",
+    "resolved_media_urls",
+    "media_count",
+    "poster_details",
+)
+
+# poster_details keys kept in the poster cache
+POSTER_FIELDS = ("user_id", "following_cnt", "follower_cnt", "verified", "profile_img")
 
 
 class Tweet(Card):
+    LAZY_FIELDS = {
+        **Card.LAZY_FIELDS,
+        "quoted_tweet": "_scrape_quoted_tweet",
+        "has_quote": "_scrape_quoted_tweet",
+        "media_urls": "_scrape_media_cards",
+        "resolved_media_urls": "_resolve_media_urls",
+        "media_count": "_scrape_media_cards",
+        "tweet": "_build_tweet_dict",
+    }
+
     def __init__(
         self,
         card: WebElement,
         driver: WebDriver | None = None,
         actions: ActionChains | None = None,
         scrape_poster_details: bool = False,
+        engine: str = "webdriver",
+        record: dict | None = None,
+        lazy: bool = False,
+        fields: list | None = None,
+        poster_cache: Cache | None = None,
+        resolver: ShortUrlResolver | None = None,
+        waits: Waits | None = None,
     ) -> None:
         """
         actions and driver needed only if scrape_poster_details is True
+        engine is "webdriver" (one call per field) or "js" (one call per card)
+        record is a card already extracted by js_engine; the card is then
+        only used for poster details
+        lazy (webdriver engine only) scrapes nothing up front: each field is
+        scraped on first access and tweet is built when first read
+        fields restricts tweet to those keys (see TWEET_FIELDS); the webdriver
+        engine then scrapes lazily so that only what they need is scraped
+        poster_cache (keyed by handle) is checked before hovering for poster
+        details and filled after
+        resolver resolves media card links in the background: until its
+        join(), resolved_media_urls holds the short links
+        waits (the scraper's, for its speed profile) waits for the hover card
         """
-        super().__init__(card)
+        if engine not in ("webdriver", "js"):
+            raise ValueError(f"Invalid extraction engine: {engine}")
+        self.fields = fields
+        lazy = (lazy or fields is not None) and engine == "webdriver" and record is None
+        super().__init__(card, lazy=lazy)
         self.driver = driver
         self.actions = actions
         self.scrape_poster_details = scrape_poster_details
+        self.poster_cache = poster_cache
+        self.resolver = resolver
+        self.waits = waits
+        self.engine = engine
+        if lazy:
+            return
         self.error = False
         self.tweet = None
         self.poster_details = {}
-        self._scrape()
+        start = perf_counter()
+        if engine == "js" or record is not None:
+            self._scrape_js(record)
+        else:
+            self._scrape()
         # Build final tweet dictionary
         self._build_tweet_dict()
-        
+        self.extraction_time = perf_counter() - start
+
 
     def _scrape_quoted_tweet(self):
         try:
             # Find the div that contains the "Quote" span
-            quote_card = self.card.find_element(
-                "xpath", './/span[text()="Quote"]/parent::div/parent::div'
-            )
+            quote_card = selector("quote_card").find(self.card)
 
             # The quote card is this div
             quote = Quote(quote_card)
@@ -56,9 +131,7 @@ class Tweet(Card):
 
     def _scrape_images(self):
         try:
-            images = self.card.find_elements(
-                "xpath", './/div[@data-testid="tweetPhoto"]//img'
-            )
+            images = selector("images").find_all(self.card)
             image_urls = []
             
             quote_image_urls = set(
@@ -96,9 +169,7 @@ class Tweet(Card):
     def _scrape_videos(self):
         # Extract video data from quoted tweet
         try:
-            video_players = self.card.find_elements(
-                "xpath", './/div[@data-testid="videoPlayer"]'
-            )
+            video_players = selector("video_player").find_all(self.card)
             
             videos = []
             quote_video_ids = set(
@@ -108,7 +179,7 @@ class Tweet(Card):
             for video_player in video_players:
                 try:
                     # Get video blob URL
-                    video_source = video_player.find_element("xpath", './/video//source')
+                    video_source = selector("video_source").find(video_player)
                     video_url = video_source.get_attribute("src")
                     video_id = video_url.split("/")[-1]
                     if video_id in quote_video_ids:
@@ -124,39 +195,46 @@ class Tweet(Card):
 
     def _scrape_media_cards(self):
         try:
-            media_cards = self.card.find_elements(
-                "xpath", './/div[@data-testid="card.wrapper"]'
-            )
+            media_cards = selector("media_cards").find_all(self.card)
             media_urls = []
-            resolved_urls = []
             
             for card in media_cards:
                 try:
-                    links = card.find_elements("xpath", './/a[@href]')
+                    links = selector("media_card_links").find_all(card)
                     for link in links:
                         href = link.get_attribute("href")
                         if href and "t.co/" in href:
                             media_urls.append(href)
-                            resolved_url = resolve_short_url(href)
-                            resolved_urls.append(resolved_url)
                 except:
                     continue
                     
             self.media_urls = media_urls
-            self.resolved_media_urls = resolved_urls
             self.media_count = len(media_urls)
         except NoSuchElementException:
             self.media_urls = []
-            self.resolved_media_urls = []
             self.media_count = 0
 
+    def _resolve_media_urls(self):
+        if self.resolver is not None:
+            self.resolved_media_urls = self.resolver.fill(list(self.media_urls))
+        else:
+            self.resolved_media_urls = [resolve_short_url(url) for url in self.media_urls]
+
     def _scrape_poster_details(self):
         if not self.scrape_poster_details or not self.driver or not self.actions:
             return
+        if self.poster_cache is not None:
+            cached = self.poster_cache.get(self.handle)
+            if cached is not None:
+                self.poster_details.update(cached)
+                return
 
-        el_name = self.card.find_element(
-            "xpath", './/div[@data-testid="User-Name"]//span'
-        )
+        if self.card is None:
+            # extracted after the card left the page: nothing to hover
+            return
+
+        el_name = selector("user").find(self.card)
+        waits = self.waits or Waits(self.driver)
 
         ext_hover_card = False
         ext_user_id = False
@@ -173,17 +251,17 @@ class Tweet(Card):
             try:
                 self.actions.move_to_element(el_name).perform()
 
-                hover_card = self.driver.find_element(
-                    "xpath", '//div[@data-testid="hoverCardParent"]'
-                )
+                # shown after a delay (and not at all if the pointer missed)
+                hover_card = waits.element("hover_card", timeout=waits.short_timeout)
+                if hover_card is None:
+                    raise NoSuchElementException("No hover card")
 
                 ext_hover_card = True
 
                 while not ext_user_id:
                     try:
-                        raw_user_id = hover_card.find_element(
-                            "xpath",
-                            '(.//div[contains(@data-testid, "-follow")]) | (.//div[contains(@data-testid, "-unfollow")])',
+                        raw_user_id = selector("hover_user_id").find(
+                            hover_card
                         ).get_attribute("data-testid")
 
                         if raw_user_id == "":
@@ -200,9 +278,7 @@ class Tweet(Card):
 
                 while not ext_following:
                     try:
-                        following_cnt = hover_card.find_element(
-                            "xpath", './/a[contains(@href, "/following")]//span'
-                        ).text
+                        following_cnt = selector("hover_following").find(hover_card).text
 
                         if following_cnt == "":
                             following_cnt = None
@@ -217,10 +293,7 @@ class Tweet(Card):
 
                 while not ext_followers:
                     try:
-                        followers_cnt = hover_card.find_element(
-                            "xpath",
-                            './/a[contains(@href, "/verified_followers")]//span',
-                        ).text
+                        followers_cnt = selector("hover_followers").find(hover_card).text
 
                         if followers_cnt == "":
                             followers_cnt = None
@@ -237,7 +310,6 @@ class Tweet(Card):
                     self.error = True
                     return
                 hover_attempt += 1
-                sleep(0.5)
                 continue
             except StaleElementReferenceException:
                 self.error = True
@@ -245,30 +317,44 @@ class Tweet(Card):
 
         if ext_hover_card and ext_following and ext_followers:
             self.actions.reset_actions()
+            if self.poster_cache is not None:
+                self.poster_cache.set(
+                    self.handle,
+                    {field: self.poster_details.get(field) for field in POSTER_FIELDS},
+                )
+
+    def _scrape_poster(self):
+        super()._scrape_poster()
+        self._scrape_poster_details()
 
     def _build_tweet_dict(self):
-        self.tweet = {
-            "user": self.user,
-            "handle": self.handle,
-            "date_time": self.date_time,
-            "content": self.content,
-            "reply_cnt": self.reply_cnt,
-            "retweet_cnt": self.retweet_cnt,
-            "like_cnt": self.like_cnt,
-            "analytics_cnt": self.analytics_cnt,
-            "tags": self.tags,
-            "mentions": self.mentions,
-            "emojis": self.emojis,
-            "tweet_link": self.tweet_link,
-            "tweet_id": self.tweet_id,
-            "quoted_tweet": self.quoted_tweet.quote if self.quoted_tweet else None,
-            "image_urls": self.image_urls,
-            "videos": self.videos,
-            "media_urls": self.media_urls,
-            "resolved_media_urls": self.resolved_media_urls,
-            "media_count": self.media_count,
-            "poster_details": self.poster_details
-        }
+        self.tweet = {}
+        for field in self.fields or TWEET_FIELDS:
+            if field == "quoted_tweet":
+                self.tweet[field] = self.quoted_tweet.quote if self.quoted_tweet else None
+            else:
+                self.tweet[field] = getattr(self, field)
+
+    def _scrape_js(self, record: dict | None = None):
+        if record is None:
+            record = extract_card(self.card)
+        self._apply(record)
+
+        if record["quoted_tweet"] is not None:
+            self.quoted_tweet = Quote(None, record=record["quoted_tweet"])
+            self.has_quote = True
+        else:
+            self.quoted_tweet = None
+            self.has_quote = False
+
+        fields = self.fields or TWEET_FIELDS
+        self.media_urls = record["media_urls"]
+        if "resolved_media_urls" in fields:
+            self._resolve_media_urls()
+        self.media_count = len(self.media_urls)
+
+        if "poster_details" in fields:
+            self._scrape_poster_details()
 
     def _scrape(self):
         super()._scrape(scrape_media=False)
@@ -278,6 +364,7 @@ class Tweet(Card):
         self._scrape_videos()
         self._scrape_images()
         self._scrape_media_cards()
+        self._resolve_media_urls()
         
         # Detailed poster information (if requested)
         self._scrape_poster_details()
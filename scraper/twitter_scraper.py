@@ -1,12 +1,29 @@
 import os
 import sys
+import threading
 import pandas as pd
+from .cache import Cache
+from .enrich import PosterEnricher
 from .progress import Progress
 from .scroller import Scroller
-from .tweet import Tweet
+from .tweet import Tweet, TWEET_FIELDS
+from .js_engine import (drain_observed_cards, expand_truncated, extract_new_cards,
+                        observe_cards, prune_cards, status_ids)
+from .watermark import Watermark
+from .waits import Waits
+from . import locators
+from .locators import get as selector
+from .graphql import GraphQLCapture, GraphQLPipeline
+from .pipeline import SnapshotPipeline
+from .ratelimit import PAGE_LOAD_COST, Cooldowns, RateLimiter
+from .accounts import CHALLENGED, FAILED, HEALTHY, AccountPool
+from .normalize import normalize as normalize_frame
+from .record import TweetRecord, to_frame
+from .run import ScrapeRun
+from .resolver import ShortUrlResolver
 
 from datetime import datetime
-from time import sleep
+from time import perf_counter
 
 from selenium import webdriver
 from selenium.webdriver.common.keys import Keys
@@ -40,17 +57,76 @@ class Twitter_Scraper:
         headlessState,
         save_folder_path="./tweets/",
         proxy=None,
-        browser: str = "firefox"
+        browser: str = "firefox",
+        poster_cache_path: str | None = None,
+        poster_cache_ttl: float = 24 * 3600,
+        url_cache_path: str | None = None,
+        speed: str = "normal",
+        network_log: bool = False,
+        rate_limit_path: str | None = None,
+        budget: float | None = None,
+        accounts: AccountPool | None = None,
     ):
         print("Initializing Twitter Scraper...")
+        # with accounts, an account is leased from the pool unless one is
+        # given, and a throttled account is swapped for another one
+        self.accounts = accounts
+        if accounts is not None and username is None:
+            account = accounts.lease()
+            if account is None:
+                raise ValueError("No account of the pool is ready to use")
+            username, password = account["username"], account["password"]
         self.username = username
         self.password = password
+        # asked to confirm the account at the last login
+        self.challenged = False
         self.headlessState = headlessState
         self.interrupted = False
         self.save_folder_path = save_folder_path
-        self.driver = self._get_driver(proxy, browser)
+        self.proxy = proxy
+        self.browser = browser
+        # network events of the page, needed by the graphql engine (Chrome only)
+        if network_log and browser != "chrome":
+            print("Network events are only logged with Chrome: the graphql engine is not available.")
+            network_log = False
+        self.network_log = network_log
+        self.driver = self._get_driver(proxy, browser, network_log)
         self.actions = ActionChains(self.driver)
+        # readiness checks instead of fixed sleeps, see waits.SPEED_PROFILES
+        self.waits = Waits(self.driver, speed)
         self.logged_in = False
+        # poster details by handle, so that each author is hovered only once
+        # per ttl (and per run only if no cache file is given)
+        self.poster_cache = Cache(
+            "poster_details", ttl=poster_cache_ttl, path=poster_cache_path
+        )
+        # t.co links of media cards, resolved off the scroll loop; their
+        # resolutions are kept between runs (in the save folder by default)
+        if url_cache_path is None:
+            os.makedirs(save_folder_path, exist_ok=True)
+            url_cache_path = os.path.join(save_folder_path, "short_urls.db")
+        self.resolver = ShortUrlResolver(
+            cache=Cache("short_urls", maxsize=100_000, path=url_cache_path)
+        )
+        # cooldowns of throttled accounts, kept between runs (in the save
+        # folder by default); setting stop ends a rate limit wait early.
+        # With a budget, page loads and scroll steps are paced to at most
+        # that many scroll steps per 15 minutes (a page load counts as
+        # PAGE_LOAD_COST of them).
+        if accounts is not None:
+            # the pool's accounts have their state in its file
+            cooldowns = accounts.cooldowns
+        else:
+            if rate_limit_path is None:
+                rate_limit_path = os.path.join(save_folder_path, "rate_limits.json")
+            cooldowns = Cooldowns(rate_limit_path)
+        self.budget = budget
+        self.stop = threading.Event()
+        # called with (tweets scraped, waiting) whenever progress is shown
+        self.on_progress = None
+        self.rate_limiter = RateLimiter(
+            username or "anonymous", cooldowns, stop=self.stop, budget=budget
+        )
 
     def _route(self, mode, url: str | None):
         # configure current scraping session
@@ -66,8 +142,8 @@ class Twitter_Scraper:
             router = self.go_to_list
         elif mode == "timeline":
             router = self.go_to_timeline
-        elif mode == "conversation":
-            assert url is not None, "URL is required for conversation mode"
+        elif mode in ("conversation", "url"):
+            assert url is not None, f"URL is required for {mode} mode"
             router = partial(self.go_to_url, url=url)
         else:
             print(ValueError("Invalid mode"))
@@ -77,7 +153,9 @@ class Twitter_Scraper:
     def _get_driver(
         self,
         proxy=None,
-        browser: str = "firefox"
+        browser: str = "firefox",
+        network_log: bool = False,
+        exit_on_failure: bool = True,
     ):
         print("Setup WebDriver...")
         # header = Headers().generate()["User-Agent"] 
@@ -100,6 +178,9 @@ class Twitter_Scraper:
         browser_option.add_argument("--user-agent={}".format(header))
         if proxy is not None:
             browser_option.add_argument("--proxy-server=%s" % proxy)
+        if network_log:
+            # DevTools events, read back with driver.get_log("performance")
+            browser_option.set_capability("goog:loggingPrefs", {"performance": "ALL"})
 
         # Option to hide browser or not
         # If not yes then skips the headless
@@ -151,10 +232,12 @@ class Twitter_Scraper:
                 return driver
             except Exception as e:
                 print(f"Error setting up WebDriver: {e}")
+                if not exit_on_failure:
+                    raise WebDriverException(f"Could not set up WebDriver: {e}") from e
                 sys.exit(1)
         pass
 
-    def login(self):
+    def login(self, exit_on_failure=True):
         print()
         print("Logging in to Twitter...")
 
@@ -162,7 +245,7 @@ class Twitter_Scraper:
             self.driver.maximize_window()
             self.driver.execute_script("document.body.style.zoom='150%'") #set zoom to 150%
             self.driver.get(TWITTER_LOGIN_URL)
-            sleep(3)
+            self.waits.element("username_input")
 
             self._input_username()
             self._input_unusual_activity()
@@ -188,9 +271,16 @@ class Twitter_Scraper:
             print("Login Successful")
             print()
             self.logged_in = True
+            if self.accounts is not None:
+                self.accounts.report(self.username, CHALLENGED if self.challenged else HEALTHY)
         except Exception as e:
             print()
             print(f"Login Failed: {e}")
+            if self.accounts is not None:
+                self.accounts.report(self.username, FAILED)
+            if not exit_on_failure:
+                raise
+            self.driver.quit()
             sys.exit(1)
 
         pass
@@ -200,42 +290,37 @@ class Twitter_Scraper:
 
         while True:
             try:
-                username = self.driver.find_element(
-                    "xpath", "//input[@autocomplete='username']"
-                )
+                username = selector("username_input").find(self.driver)
 
                 username.send_keys(self.username)
                 username.send_keys(Keys.RETURN)
-                sleep(3)
+                # next step asks either to confirm the account or for the password
+                self.waits.element("unusual_activity_input", "password_input")
                 break
             except NoSuchElementException:
                 input_attempt += 1
                 if input_attempt >= 3:
-                    print()
-                    print(
+                    raise ValueError(
                         "There was an error inputting the username.\n\n"
                         "It may be due to the following:\n"
                         "- Internet connection is unstable\n"
                         "- Username is incorrect\n"
                         "- Twitter is experiencing unusual activity"
                     )
-                    self.driver.quit()
-                    sys.exit(1)
                 else:
                     print("Re-attempting to input username...")
-                    sleep(2)
+                    self.waits.element("username_input")
 
     def _input_unusual_activity(self):
         input_attempt = 0
 
         while True:
             try:
-                unusual_activity = self.driver.find_element(
-                    "xpath", "//input[@data-testid='ocfEnterTextTextInput']"
-                )
+                unusual_activity = selector("unusual_activity_input").find(self.driver)
+                self.challenged = True
                 unusual_activity.send_keys(self.username)
                 unusual_activity.send_keys(Keys.RETURN)
-                sleep(3)
+                self.waits.element("password_input")
                 break
             except NoSuchElementException:
                 input_attempt += 1
@@ -247,38 +332,33 @@ class Twitter_Scraper:
 
         while True:
             try:
-                password = self.driver.find_element(
-                    "xpath", "//input[@autocomplete='current-password']"
-                )
+                password = selector("password_input").find(self.driver)
 
                 password.send_keys(self.password)
                 password.send_keys(Keys.RETURN)
-                sleep(3)
+                self.waits.cookie("auth_token")
                 break
             except NoSuchElementException:
                 input_attempt += 1
                 if input_attempt >= 3:
-                    print()
-                    print(
+                    raise ValueError(
                         "There was an error inputting the password.\n\n"
                         "It may be due to the following:\n"
                         "- Internet connection is unstable\n"
                         "- Password is incorrect\n"
                         "- Twitter is experiencing unusual activity"
                     )
-                    self.driver.quit()
-                    sys.exit(1)
                 else:
                     print("Re-attempting to input password...")
-                    sleep(2)
+                    self.waits.element("password_input")
 
     def go_to_timeline(self):
         self.driver.get("https://twitter.com/home")
-        sleep(3)
+        self.waits.cards()
 
     def go_to_url(self, url=None):
         self.driver.get(url)
-        sleep(3)
+        self.waits.cards()
 
     def go_to_profile(self):
         if (
@@ -289,7 +369,7 @@ class Twitter_Scraper:
             sys.exit(1)
         else:
             self.driver.get(f"https://twitter.com/{self.scraper_details['username']}")
-            sleep(3)
+            self.waits.cards()
         pass
 
     def go_to_hashtag(self):
@@ -305,7 +385,7 @@ class Twitter_Scraper:
                 url += "&f=live"
 
             self.driver.get(url)
-            sleep(3)
+            self.waits.cards()
         pass
 
     def go_to_bookmarks(self):
@@ -319,7 +399,7 @@ class Twitter_Scraper:
             url = f"https://twitter..com/i/bookmarks"
 
             self.driver.get(url)
-            sleep(3)
+            self.waits.cards()
         pass
 
     def go_to_search(self):
@@ -332,7 +412,7 @@ class Twitter_Scraper:
                 url += "&f=live"
 
             self.driver.get(url)
-            sleep(3)
+            self.waits.cards()
         pass
 
     def go_to_list(self):
@@ -342,20 +422,16 @@ class Twitter_Scraper:
         else:
             url = f"https://x.com/i/lists/{self.scraper_details['list']}"
             self.driver.get(url)
-            sleep(3)
+            self.waits.cards()
         pass
 
     def get_tweet_cards(self):
-        tweet_cards = self.driver.find_elements(
-            "xpath", '//article[@data-testid="tweet" and not(@disabled)]'
-        )
+        tweet_cards = selector("tweet_cards").find_all(self.driver)
         return tweet_cards
 
     def remove_hidden_cards(self):
         try:
-            hidden_cards = self.driver.find_elements(
-                "xpath", '//article[@data-testid="tweet" and @disabled]'
-            )
+            hidden_cards = selector("hidden_tweet_cards").find_all(self.driver)
 
             for card in hidden_cards[1:-2]:
                 self.driver.execute_script(
@@ -366,158 +442,319 @@ class Twitter_Scraper:
         pass
 
     def _click_all_show_more_buttons(self):
-        # Look for "Show more" buttons and click them
-        show_more_buttons = self.driver.find_elements(
-            "xpath", '//button[@data-testid="tweet-text-show-more-link"]'
-        )
-        for button in show_more_buttons:
+        # Click the "Show more" buttons of the cards not expanded yet in one
+        # call, then wait once for all of them to expand
+        show_more_buttons = expand_truncated(self.driver)
+        if show_more_buttons:
+            self.waits.gone(*show_more_buttons)
+
+    def _new_tweets(self, engine, tweet_ids, scrape_poster_details, pipeline=None, fields=None):
+        # Yields a Tweet for every card not seen yet, followed by None if the
+        # "Discover more" section was reached. Scrolling is left to the Scroller.
+        if engine == "graphql":
+            tweets, boundary = pipeline.step()
+            yield from tweets
+            if boundary:
+                yield None
+            return
+
+        if engine == "snapshot":
+            shipped, boundary = pipeline.step(scroll=False)
+            # nothing new to ship: wait for the cards still being parsed
+            yield from pipeline.ready(block=shipped == 0)
+            if boundary:
+                yield None
+            return
+
+        if engine in ("batch", "observer"):
+            start = perf_counter()
+            step = (extract_new_cards if engine == "batch" else drain_observed_cards)(
+                self.driver, scroll=False
+            )
+            if step["records"]:
+                # share the round trip between the cards it returned
+                step_time = (perf_counter() - start) / len(step["records"])
+            for record in step["records"]:
+                # seen before the page was loaded again (after an account swap)
+                if record["tweet_id"] and not tweet_ids.add(record["tweet_id"]):
+                    continue
+                tweet = Tweet(
+                    card=record["card"],
+                    driver=self.driver,
+                    actions=self.actions,
+                    waits=self.waits,
+                    scrape_poster_details=scrape_poster_details,
+                    poster_cache=self.poster_cache,
+                    resolver=self.resolver,
+                    record=record,
+                    fields=fields,
+                )
+                tweet.extraction_time += step_time
+                yield tweet
+            if step["boundary"]:
+                yield None
+            return
+
+        # Find the "Discover more" section position for boundary check
+        try:
+            discover_more_element = selector("discover_more").find(self.driver)
+            discover_more_position = discover_more_element.location['y']
+        except NoSuchElementException:
+            # If "Discover more" not found, include all tweets
+            discover_more_position = float('inf')
+
+        cards = self.get_tweet_cards()[-15:]
+        # status ids of all the cards in one round trip, so that cards seen
+        # already (even re-rendered ones) are skipped before any extraction
+        for card, tweet_id in zip(cards, status_ids(self.driver, cards)):
             try:
-                # Scroll button into view to ensure it's clickable
-                self.driver.execute_script(
-                    "arguments[0].scrollIntoView({block: 'center'});", 
-                    button
+                # cards without a status link are told apart by element
+                tweet_id = tweet_id or str(card)
+                if tweet_id in tweet_ids:
+                    continue
+
+                tweet_position = card.location['y']
+                if tweet_position >= discover_more_position:
+                    yield None
+                    return
+
+                tweet_ids.add(tweet_id)
+
+                yield Tweet(
+                    card=card,
+                    driver=self.driver,
+                    actions=self.actions,
+                    waits=self.waits,
+                    scrape_poster_details=scrape_poster_details,
+                    poster_cache=self.poster_cache,
+                    resolver=self.resolver,
+                    engine=engine,
+                    fields=fields,
                 )
-                sleep(0.5)
-                # Click the button to expand content
-                button.click()
-                sleep(1)  # Wait for content to expand
-            except Exception as e:
-                # Handle any clicking errors gracefully
-                continue 
-        
+            except NoSuchElementException:
+                continue
+
+    def _back_off(self, signal, progress, scraped, no_tweets_limit, reset_at=None):
+        # Waits out a rate limit, showing the time left. False when it should
+        # not be tried again: too many tries in a row, or stop was set.
+        limiter = self.rate_limiter
+        if limiter.exhausted():
+            print()
+            print(f"Still rate limited after {limiter.strikes} tries")
+            return False
+        limiter.throttle(signal, reset_at)
+
+        def show(limiter):
+            progress.wait_left = limiter.remaining()
+            progress.print_progress(scraped, True, limiter.strikes, no_tweets_limit)
+
+        waited = limiter.wait(show)
+        progress.wait_left = None
+        progress.print_progress(scraped, False, 0, no_tweets_limit)
+        if not waited:
+            print()
+            print("Rate limit wait interrupted")
+        return waited
+
+    def _page_loaded(self, engine):
+        # A feed page was (re)loaded: its scroll history starts over, and the
+        # observer engine starts queueing cards before its first step.
+        if engine == "observer":
+            observe_cards(self.driver)
+        return Scroller(self.driver, self.waits)
+
+    def _switch_account(self, signal, reset_at=None):
+        # Logs a rested account of the pool in, in place of the throttled
+        # one, which cools down meanwhile. False if no account is ready (or
+        # none could log in): the throttled account is kept, and the caller
+        # backs off with it. Each login is a page load paced by the account
+        # it logs in.
+        account = self.accounts.lease()
+        if account is None:
+            return False
+        previous = (self.username, self.password, self.rate_limiter)
+        while account is not None:
+            self.username, self.password = account["username"], account["password"]
+            self.rate_limiter = RateLimiter(
+                self.username, self.accounts.cooldowns, stop=self.stop, budget=self.budget
+            )
+            if not self.rate_limiter.pace(PAGE_LOAD_COST):
+                # stopped: the leased account is given back unused
+                self.accounts.release(self.username)
+                break
+            self.driver.delete_all_cookies()
+            self.challenged = False
+            try:
+                self.login(exit_on_failure=False)
+            except Exception:
+                # reported as failed: left out for a while
+                self.accounts.release(self.username)
+                account = self.accounts.lease()
+                continue
+            previous[2].throttle(signal, reset_at)
+            self.accounts.release(previous[0])
+            print(f"Switched account: {previous[0]} is cooling down, scraping as {self.username}")
+            return True
+
+        self.username, self.password, self.rate_limiter = previous
+        if self.rate_limiter.pace(PAGE_LOAD_COST):
+            self.driver.delete_all_cookies()
+            self.login(exit_on_failure=False)
+        return False
+
     def scrape_tweets(
         self,
         max_tweets: int = 50,
         mode: str = "timeline",
         no_tweets_limit: bool = False,
         scrape_poster_details: bool = False,
-        url: str = None
+        url: str = None,
+        engine: str = "webdriver",
+        workers: int | None = None,
+        fields: list | None = None,
+        return_type: str = "dict",
+        poster_workers: int = 0,
+        dedup_error_rate: float = 0.0001,
+        incremental: bool = False,
+        watermark_slack: int = 5,
+        prune: str | None = None,
     ):
+        """
+        mode "url" scrapes the page at url (a profile, a search...) until
+        its feed ends, "conversation" the tweet at url and its replies
+        engine selects how cards are extracted:
+        - "webdriver": one WebDriver call per field
+        - "js": one in-page script call per card
+        - "batch": one in-page script call per scroll step
+        - "observer": like batch, but the new cards are queued in the page as
+          they are inserted (a MutationObserver), so that none is missed when
+          many are rendered or recycled between two steps
+        - "snapshot": one call per scroll step ships the new cards' HTML to a
+          pool of `workers` processes that parse them while scrolling goes on
+          (poster details are not available)
+        - "graphql": no DOM scraping, tweets are read from the GraphQL
+          responses that fill the page (needs network_log, Chrome only);
+          poster details come with them
+        fields limits every tweet to those keys (see tweet.TWEET_FIELDS), and
+        the work needed for the others (media scans, short URL resolution,
+        poster details...) is skipped
+        return_type is "dict" (a list of tweet dicts) or "record" (a list of
+        record.TweetRecord, much smaller for long runs; counts become ints)
+        poster_workers > 0 fetches poster details from the authors' profile
+        pages in that many extra browsers while scrolling, instead of hovering
+        every card, and fills them in once scraping is done
+        dedup_error_rate is the chance that a new tweet is taken for one
+        already scraped once it is out of the recent window (see dedup.SeenIds)
+        incremental skips the tweets scraped by previous runs on the same page
+        and stops after watermark_slack of them in a row (older tweets can be
+        mixed with new ones: pinned tweets, "Top" results); the newest tweet
+        is recorded per page in watermarks.json in the save folder (once the
+        run gets down to the previous one, or to the end of the feed; a run
+        stopped before records the tweets it scraped, skipped next time)
+        prune drops the cards already scraped once they are scrolled well out
+        of view, so that the page's memory stays flat on long runs: "remove"
+        deletes them, "spacer" leaves an empty block of the same height (the
+        page keeps its layout and scroll position)
+        """
+        if return_type not in ("dict", "record"):
+            raise ValueError(f"Invalid return type: {return_type}")
+        if prune not in (None, "remove", "spacer"):
+            raise ValueError(f"Invalid prune mode: {prune}")
+        if engine == "graphql" and not self.network_log:
+            raise ValueError("The graphql engine needs Chrome and network_log=True")
+        if fields is not None:
+            unknown = [field for field in fields if field not in TWEET_FIELDS]
+            if unknown:
+                raise ValueError(f"Unknown tweet fields: {', '.join(unknown)}")
+
+        run = ScrapeRun(
+            max_tweets=max_tweets,
+            mode=mode,
+            no_tweets_limit=no_tweets_limit,
+            scrape_poster_details=scrape_poster_details,
+            url=url,
+            engine=engine,
+            fields=fields,
+            return_type=return_type,
+            dedup_error_rate=dedup_error_rate,
+            watermark_slack=watermark_slack,
+            prune=prune,
+        )
+        if engine == "graphql":
+            # listening before the page loads, so that its first results are not missed
+            run.pipeline = GraphQLPipeline(
+                self.driver, fields=fields, resolver=self.resolver,
+                poster_details=scrape_poster_details,
+            )
+            run.capture = run.pipeline.capture
+            # no hover cards needed
+            run.scrape_poster_details = False
+        elif self.network_log:
+            run.capture = GraphQLCapture(self.driver, operations=())
+
+        if self.rate_limiter.remaining() > 0:
+            print("Rate limited: waiting for the account's cooldown...")
+            if not self.rate_limiter.wait():
+                return []
+
         # set the router and route accordingly
+        if not self.rate_limiter.pace(PAGE_LOAD_COST):
+            return []
         self._route(mode, url=url)
-        progress = Progress(0, max_tweets)
-        scroller = Scroller(self.driver)
+        run.progress = Progress(0, max_tweets)
+        run.progress.listener = self.on_progress
+        run.scroller = self._page_loaded(engine)
 
         if mode == "timeline":
             print("Scraping Tweets from Home...")
         elif mode == "conversation":
             print(f"Scraping Tweets from conversation: {url} ...")
+        elif mode == "url":
+            print(f"Scraping Tweets from: {url} ...")
         else:
             raise NotImplementedError(f"Mode {mode} is not implemented.")
 
         # Accept cookies to make the banner disappear
         try:
-            accept_cookies_btn = self.driver.find_element(
-            "xpath", "//span[text()='Refuse non-essential cookies']/../../..")
+            accept_cookies_btn = selector("refuse_cookies").find(self.driver)
             accept_cookies_btn.click()
         except NoSuchElementException:
             pass
 
-        progress.print_progress(0, False, 0, no_tweets_limit)
+        run.progress.print_progress(0, False, 0, no_tweets_limit)
 
-        refresh_count = 0
-        added_tweets = 0
-        empty_count = 0
-        retry_cnt = 0
-        data = []
-        tweet_ids = set()
-        discover_more_boundary = False
+        if incremental:
+            run.watermark = Watermark(
+                os.path.join(self.save_folder_path, "watermarks.json"),
+                url if url is not None else self.driver.current_url,
+            )
+
+        if run.scrape_poster_details and poster_workers and (
+            fields is None or "poster_details" in fields
+        ):
+            run.enricher = PosterEnricher(
+                partial(self._get_driver, self.proxy, self.browser, exit_on_failure=False),
+                cookies=self.driver.get_cookies(),
+                workers=poster_workers,
+                cache=self.poster_cache,
+            )
+            # no hover cards in the scroll loop
+            run.scrape_poster_details = False
+
+        if engine == "snapshot":
+            if run.scrape_poster_details:
+                print("Poster details are not scraped with the snapshot engine.")
+                run.scrape_poster_details = False
+            run.pipeline = SnapshotPipeline(
+                self.driver, workers=workers, fields=fields, resolver=self.resolver
+            )
 
-        while scroller.scrolling:
+        while run.scroller.scrolling:
             try:
-                
-                # Find the "Discover more" section position for boundary check
-                try:
-                    discover_more_element = self.driver.find_element(
-                        "xpath", '//span[text()="Discover more"]'
-                    )
-                    discover_more_position = discover_more_element.location['y']
-                except NoSuchElementException:
-                    # If "Discover more" not found, include all tweets
-                    discover_more_position = float('inf')
-
-                self._click_all_show_more_buttons()
-                tweet_cards = self.get_tweet_cards()
-                added_tweets = 0
-
-                for card in tweet_cards[-15:]:
-                    try:
-                        tweet_position = card.location['y']
-                        if tweet_position >= discover_more_position:
-                            # Skip tweets that are after "Discover more"
-                            discover_more_boundary = True
-                            break
-
-                        tweet_id = str(card)
-
-                        if tweet_id not in tweet_ids:
-                            tweet_ids.add(tweet_id)
-
-                            if not scrape_poster_details:
-                                self.driver.execute_script(
-                                    "arguments[0].scrollIntoView();", card
-                                )
-
-                            # import ipdb; ipdb.set_trace()
-                            tweet = Tweet(
-                                card=card,
-                                driver=self.driver,
-                                actions=self.actions,
-                                scrape_poster_details=scrape_poster_details
-                            )
-
-                            if tweet:
-                                if not tweet.error and tweet.tweet is not None:
-                                    if not tweet.is_ad:
-                                        data.append(tweet.tweet)
-                                        added_tweets += 1
-                                        progress.print_progress(len(data), False, 0, no_tweets_limit)
-
-                                        if len(data) >= max_tweets and not no_tweets_limit:
-                                            scroller.scrolling = False
-                                            break
-                                    else:
-                                        continue
-                                else:
-                                    continue
-                            else:
-                                continue
-                        
-                    except NoSuchElementException:
-                        continue
-
-                if discover_more_boundary or (len(data) >= max_tweets and not no_tweets_limit):
+                if not self._scroll_step(run):
                     break
-
-                if added_tweets == 0:
-                    # Check if there is a button "Retry" and click on it with a regular basis until a certain amount of tries
-                    try:
-                        while retry_cnt < 15:
-                            retry_button = self.driver.find_element(
-                            "xpath", "//span[text()='Retry']/../../..")
-                            progress.print_progress(len(data), True, retry_cnt, no_tweets_limit)
-                            sleep(600)
-                            retry_button.click()
-                            retry_cnt += 1
-                            sleep(2)
-                    # There is no Retry button so the counter is reseted
-                    except NoSuchElementException:
-                        retry_cnt = 0
-                        progress.print_progress(len(data), False, 0, no_tweets_limit)
-
-                    if empty_count >= 5:
-                        if refresh_count >= 3:
-                            print()
-                            print("No more tweets to scrape")
-                            break
-                        refresh_count += 1
-                    empty_count += 1
-                    sleep(1)
-                else:
-                    empty_count = 0
-                    refresh_count = 0
             except StaleElementReferenceException:
-                sleep(2)
+                self.waits.pause(2)
                 continue
             except KeyboardInterrupt:
                 print("\n")
@@ -529,48 +766,239 @@ class Twitter_Scraper:
                 print(f"Error scraping tweets: {e}")
                 break
 
+        self._finish_run(run)
+        self._print_run_summary(run)
+        return run.data
+
+    def _scroll_step(self, run):
+        # One step of the scroll loop: takes the new tweets, then either
+        # handles a throttle or scrolls on. False once the loop should stop.
+        if run.engine != "graphql":
+            # full texts are in the responses
+            self._click_all_show_more_buttons()
+        new_cards, added_tweets, boundary = self._take_new_tweets(run)
+
+        if run.reached_watermark:
+            print()
+            print("Reached the tweets scraped by the previous run")
+            return False
+        if boundary:
+            run.feed_ended = True
+            return False
+        if run.full:
+            return False
+
+        if added_tweets:
+            self.rate_limiter.success()
+        else:
+            go_on = self._handle_throttle(run)
+            if go_on is not None:
+                return go_on
+
+        if not self.rate_limiter.pace():
+            print()
+            print("Pacing interrupted")
+            return False
+
+        # scroll the next step, unless the feed has ended
+        if not run.scroller.advance(new_cards):
+            return self._handle_feed_end(run)
+        return True
+
+    def _take_new_tweets(self, run):
+        # Keeps the new tweets of the step, until one of them is past the
+        # watermark or max_tweets are kept. Returns (new cards, tweets kept,
+        # whether "Discover more" was reached).
+        new_cards = 0
+        added_tweets = 0
+        boundary = False
+        processed = []
+        for tweet in self._new_tweets(
+            run.engine, run.tweet_ids, run.scrape_poster_details, run.pipeline, run.fields
+        ):
+            if tweet is None:
+                # Skip tweets that are after "Discover more"
+                boundary = True
+                break
+
+            new_cards += 1
+            if run.prune is not None and tweet.card is not None:
+                processed.append(tweet.card)
+            if run.take(tweet):
+                added_tweets += 1
+                run.progress.print_progress(len(run.data), False, 0, run.no_tweets_limit)
+                if run.full:
+                    break
+            elif run.reached_watermark:
+                break
+
+        if run.prune is not None:
+            # after the loop: every tweet kept was read in full; the
+            # JS heap is shown to tell whether pruning keeps it flat
+            run.progress.heap = prune_cards(self.driver, run.prune, processed)["heap"]
+        return new_cards, added_tweets, boundary
+
+    def _handle_throttle(self, run):
+        # A step that kept nothing: throttled if there is a "Retry" button or
+        # 429 responses. None if not throttled; otherwise whether the loop
+        # goes on, with another account or after backing off.
+        retry_buttons = selector("retry_button").find_all(self.driver)
+        throttled, reset_at = False, None
+        if run.capture is not None:
+            if run.engine != "graphql":
+                # the graphql engine read the events already
+                run.capture.responses()
+            throttled, reset_at = run.capture.rate_limit()
+        if not retry_buttons and not throttled:
+            return None
+
+        signal = "retry button" if retry_buttons else "429"
+        if self.accounts is not None and self._switch_account(signal, reset_at):
+            # A feed page only loads from its top: the new account scrolls
+            # down past the tweets scraped already, which are dropped by
+            # tweet_ids. Those scroll steps are paced like any other; the
+            # tweets are not kept (or hovered) twice.
+            if not self.rate_limiter.pace(PAGE_LOAD_COST):
+                return False
+            self._route(run.mode, url=run.url)
+            run.scroller = self._page_loaded(run.engine)
+            return True
+        if not self._back_off(signal, run.progress, len(run.data), run.no_tweets_limit, reset_at):
+            return False
+        if retry_buttons:
+            retry_buttons[0].click()
+            self.waits.gone(retry_buttons[0])
+        return True
+
+    def _handle_feed_end(self, run):
+        # The feed stopped growing. A feed that never loaded is likely
+        # throttled too: it is loaded again after backing off (a few times
+        # at most). Whether the loop goes on.
+        if (
+            not run.data and not self.get_tweet_cards()
+            and self.rate_limiter.signals["empty feed"] < 3
+        ):
+            if not self._back_off("empty feed", run.progress, 0, run.no_tweets_limit):
+                return False
+            if not self.rate_limiter.pace(PAGE_LOAD_COST):
+                return False
+            self.driver.refresh()
+            self.waits.cards()
+            run.scroller = self._page_loaded(run.engine)
+            return True
+        print()
+        print("No more tweets to scrape")
+        run.feed_ended = True
+        return False
+
+    def _finish_run(self, run):
+        # Collects what is still in flight and saves the state kept between runs
+        if run.engine == "snapshot":
+            # collect the cards that were still being parsed
+            for tweet in run.pipeline.ready(block=True):
+                if run.full:
+                    run.feed_ended = False
+                    break
+                run.timed(tweet)
+                if tweet.error or tweet.is_ad or run.scraped_before(tweet):
+                    continue
+                run.keep(tweet)
+            run.progress.print_progress(len(run.data), False, 0, run.no_tweets_limit)
+            run.pipeline.close()
+
+        # links still being resolved
+        self.resolver.join()
+
+        if run.watermark is not None:
+            # stopped before the watermark: the tweets in between are left for the next run
+            run.watermark.save(complete=run.reached_watermark or run.feed_ended)
+        if self.rate_limiter.bucket is not None:
+            # the pace tuned to, for the next run
+            self.rate_limiter.save()
+
+        if run.enricher is not None:
+            print("\nWaiting for poster details...")
+            run.enricher.join()
+            run.enricher.close()
+
+    def _print_run_summary(self, run):
         print("")
 
-        if len(data) >= max_tweets or no_tweets_limit or mode == "conversation":
+        if (
+            len(run.data) >= run.max_tweets or run.no_tweets_limit
+            or run.mode == "conversation" or run.reached_watermark
+        ):
             print("Scraping Complete")
         else:
             print("Scraping Incomplete")
 
-        if not no_tweets_limit:
-            print("Tweets: {} out of {}\n".format(len(data), max_tweets))
+        if not run.no_tweets_limit:
+            print("Tweets: {} out of {}\n".format(len(run.data), run.max_tweets))
+
+        if run.extracted:
+            print(
+                "Extraction ({}): {:.1f} ms per tweet on average\n".format(
+                    run.engine, 1000 * run.extraction_time / run.extracted
+                )
+            )
+
+        if run.scroller.history:
+            print(run.scroller.summary() + "\n")
 
-        return data
+        if self.rate_limiter.signals or self.rate_limiter.bucket is not None:
+            print(self.rate_limiter.summary() + "\n")
+
+        if self.resolver.requested or self.resolver.cached:
+            print(self.resolver.summary())
+        if run.enricher is not None:
+            print(run.enricher.summary())
+        if run.scrape_poster_details or run.enricher is not None:
+            print(self.poster_cache.summary() + "\n")
     
-    def _save_helper(self, data):
+    def _save_helper(self, data, normalize=False):
         now = datetime.now()
 
         if not os.path.exists(self.save_folder_path):
             os.makedirs(self.save_folder_path)
             print("Created Folder: {}".format(self.save_folder_path))
 
-        df = pd.DataFrame(data)
+        if data and isinstance(data[0], TweetRecord):
+            df = to_frame(data)
+        else:
+            df = pd.DataFrame(data)
+        if normalize:
+            df = normalize_frame(df)
 
         current_time = now.strftime("%Y-%m-%d_%H-%M-%S")
         fn = f"{current_time}_tweets_1-{len(data)}"
 
         return df, fn
 
-    def save_to_csv(self, data):
+    def save_to_csv(self, data, normalize=False):
         print("Saving Tweets to CSV...")
-        df, file_name = self._save_helper(data)
+        df, file_name = self._save_helper(data, normalize)
         file_path = os.path.join(self.save_folder_path, f"{file_name}.csv")
         pd.set_option("display.max_colwidth", None)
         df.to_csv(file_path, index=False, encoding="utf-8")
         print("CSV Saved: {}".format(file_path))
 
-    def save_to_jsonl(self, data):
+    def save_to_jsonl(self, data, normalize=False):
         print("Saving Tweets to JSONL...")
-        df, file_name = self._save_helper(data)
+        df, file_name = self._save_helper(data, normalize)
         file_path = os.path.join(self.save_folder_path, f"{file_name}.jsonl")
-        df.to_json(file_path, orient="records", lines=True)
+        df.to_json(file_path, orient="records", lines=True, date_format="iso")
         print("JSONL Saved: {}".format(file_path))
 
+    def print_selector_stats(self):
+        print("Selector lookups:")
+        locators.print_stats()
+        print()
+
     def close(self):
+        if self.accounts is not None:
+            self.accounts.release(self.username)
+        self.resolver.close()
+        self.poster_cache.close()
         if self.driver is not None:
             self.driver.quit()
             print("Closed session.")
@@ -1,5 +1,15 @@
+import json
+import os
+from contextlib import contextmanager
+
 import requests
 
+try:
+    import fcntl
+except ImportError:
+    # Windows: state files are not locked against other processes
+    fcntl = None
+
 
 def resolve_short_url(url):
     """
@@ -14,4 +24,51 @@ def resolve_short_url(url):
         return response.url
     except Exception as e:
         print(f"Warning: Could not resolve short URL {url}: {e}")
-        return url
\ No newline at end of file
+        return url
+
+COUNT_MULTIPLIERS = {"K": 1_000, "M": 1_000_000, "B": 1_000_000_000}
+
+
+def parse_count(text):
+    """
+    Convert a displayed count ("0", "1,234", "12.5K", "3M") to an int.
+    Returns None if text is not a count.
+    """
+    if text is None:
+        return None
+    if isinstance(text, int):
+        return text
+    text = text.strip().replace(",", "")
+    multiplier = COUNT_MULTIPLIERS.get(text[-1:].upper())
+    if multiplier is not None:
+        text = text[:-1]
+    try:
+        return int(round(float(text) * (multiplier or 1)))
+    except (ValueError, OverflowError):
+        return None
+
+
+def load_json(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@contextmanager
+def locked_json(path: str):
+    """
+    The dict kept in a JSON file, locked against other processes while in
+    use and written back once changed (to a temporary file first, so that
+    a reader never sees half of it)
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path + ".lock", "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        state = load_json(path)
+        yield state
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+        os.replace(temp_path, path)
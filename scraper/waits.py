@@ -0,0 +1,83 @@
+from time import sleep
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from .locators import get as selector
+
+# timeout: longest wait for a page or an input to be ready
+# short_timeout: longest wait for a change that may not happen (a card
+#   expanding, new cards after a scroll at the end of a feed)
+# poll: how often a condition is checked
+# pace: factor applied to the delays kept on purpose (retries, back-off)
+SPEED_PROFILES = {
+    "safe": {"timeout": 20, "short_timeout": 3, "poll": 0.5, "pace": 1.5},
+    "normal": {"timeout": 10, "short_timeout": 1, "poll": 0.2, "pace": 1.0},
+    "fast": {"timeout": 5, "short_timeout": 0.75, "poll": 0.1, "pace": 0.5},
+}
+
+
+class Waits:
+    """
+    Readiness checks replacing fixed sleeps: each one returns as soon as
+    its condition holds, or gives up after the profile's timeout (returning
+    a falsy value rather than raising, as the sleeps they replace did not
+    fail either). Their polls are not counted in the selector stats.
+    """
+
+    def __init__(self, driver: WebDriver, profile: str = "normal") -> None:
+        if profile not in SPEED_PROFILES:
+            raise ValueError(f"Invalid speed profile: {profile}")
+        self.driver = driver
+        self.profile = profile
+        for setting, value in SPEED_PROFILES[profile].items():
+            setattr(self, setting, value)
+
+    def until(self, condition, timeout: float | None = None):
+        """condition(driver)'s first truthy result, None on timeout"""
+        try:
+            return WebDriverWait(
+                self.driver,
+                self.timeout if timeout is None else timeout,
+                poll_frequency=self.poll,
+            ).until(condition)
+        except TimeoutException:
+            return None
+
+    def element(self, *names: str, timeout: float | None = None):
+        """First element found by any of the named selectors"""
+        def found(driver):
+            for name in names:
+                elements = driver.find_elements(*selector(name).by)
+                if elements:
+                    return elements[0]
+            return False
+
+        return self.until(found, timeout)
+
+    def cards(self, timeout: float | None = None) -> bool:
+        """Whether a tweet card was rendered"""
+        return self.element("tweet_cards", timeout=timeout) is not None
+
+    def cards_changed(self, count: int, timeout: float | None = None) -> bool:
+        """Whether the number of rendered cards changed from count"""
+        return bool(self.until(
+            lambda driver: len(driver.find_elements(*selector("tweet_cards").by)) != count,
+            self.short_timeout if timeout is None else timeout,
+        ))
+
+    def gone(self, *elements, timeout: float | None = None) -> bool:
+        """Whether every element was removed from the page"""
+        return bool(self.until(
+            lambda driver: all(EC.staleness_of(element)(driver) for element in elements),
+            self.short_timeout if timeout is None else timeout,
+        ))
+
+    def cookie(self, name: str, timeout: float | None = None):
+        return self.until(lambda driver: driver.get_cookie(name), timeout)
+
+    def pause(self, seconds: float) -> None:
+        """A delay kept on purpose, scaled by the profile"""
+        sleep(seconds * self.pace)
@@ -0,0 +1,135 @@
+from datetime import datetime
+
+from .utils import load_json, locked_json
+
+
+class Watermark:
+    """
+    Newest tweet (id and date) scraped from a target in previous runs,
+    kept in a JSON file shared by every target (and every scraper of a
+    pool, see utils.locked_json), so that the next run can stop where the
+    last one started.
+
+    The watermark only moves once a run has scraped everything down to it
+    (or to the end of the feed). A run stopped before (a tweet limit, an
+    interrupt, a rate limit...) leaves it where it was and records the
+    tweets it did scrape as a resume range instead: the next run skips
+    them, without stopping there, and goes on down to the watermark.
+    """
+
+    def __init__(self, path: str, target: str) -> None:
+        self.path = path
+        self.target = target
+        mark = self._load().get(target, {})
+        self.since_id = int(mark["since_id"]) if mark.get("since_id") else None
+        self.since_date = mark.get("since_date")
+        # scraped by a run stopped before the watermark: (oldest, newest)
+        resume = mark.get("resume") or {}
+        self.resume_ids = (
+            (int(resume["oldest_id"]), int(resume["newest_id"]))
+            if resume.get("newest_id") else None
+        )
+        self.resume_dates = (
+            (resume["oldest_date"], resume["newest_date"])
+            if resume.get("newest_date") else None
+        )
+        # tweets kept by this run: (oldest, newest)
+        self.ids = None
+        self.dates = None
+        # whether this run got down to the resume range
+        self.resumed = False
+
+    @property
+    def newest_id(self) -> int | None:
+        return self.ids[1] if self.ids else None
+
+    @property
+    def newest_date(self) -> str | None:
+        return self.dates[1] if self.dates else None
+
+    def _load(self) -> dict:
+        return load_json(self.path)
+
+    def covers(self, tweet_id: str | None, date_time: str | None) -> bool:
+        """Whether the tweet is not newer than the watermark"""
+        if self.since_id is not None and tweet_id and tweet_id.isdigit():
+            # ids grow with time (snowflake ids)
+            return int(tweet_id) <= self.since_id
+        if self.since_date is not None and date_time and date_time != "skip":
+            return date_time <= self.since_date
+        return False
+
+    def scraped(self, tweet_id: str | None, date_time: str | None) -> bool:
+        """Whether the tweet is in the resume range of a run stopped early"""
+        if self.resume_ids is not None and tweet_id and tweet_id.isdigit():
+            inside = self.resume_ids[0] <= int(tweet_id) <= self.resume_ids[1]
+        elif self.resume_dates is not None and date_time and date_time != "skip":
+            inside = self.resume_dates[0] <= date_time <= self.resume_dates[1]
+        else:
+            inside = False
+        self.resumed = self.resumed or inside
+        return inside
+
+    def advance(self, tweet_id: str | None, date_time: str | None) -> None:
+        if tweet_id and tweet_id.isdigit():
+            self.ids = _widen(self.ids, int(tweet_id))
+        if date_time and date_time != "skip":
+            self.dates = _widen(self.dates, date_time)
+
+    def save(self, complete: bool = True) -> None:
+        """
+        complete: the run got down to the watermark or to the end of the
+        feed, so the watermark moves to its newest tweet (if newer).
+        Otherwise only the resume range is updated.
+        """
+        if complete:
+            ids = [
+                i for i in (self.since_id, self.newest_id, self.resume_ids and self.resume_ids[1])
+                if i is not None
+            ]
+            dates = [
+                d for d in (self.since_date, self.newest_date, self.resume_dates and self.resume_dates[1])
+                if d is not None
+            ]
+            if not ids and not dates:
+                return
+            mark = {
+                "since_id": str(max(ids)) if ids else None,
+                "since_date": max(dates) if dates else None,
+            }
+        else:
+            if self.ids is None and self.dates is None:
+                return
+            # scraped from the top down without a gap: it joins the previous
+            # range only if it got down to it (otherwise that one is dropped,
+            # and scraped again next time)
+            ids, dates = self.ids, self.dates
+            if self.resumed:
+                ids = _join(ids, self.resume_ids)
+                dates = _join(dates, self.resume_dates)
+            resume = {}
+            if ids is not None:
+                resume.update(oldest_id=str(ids[0]), newest_id=str(ids[1]))
+            if dates is not None:
+                resume.update(oldest_date=dates[0], newest_date=dates[1])
+            mark = {
+                "since_id": str(self.since_id) if self.since_id is not None else None,
+                "since_date": self.since_date,
+                "resume": resume,
+            }
+
+        # shared with the other scrapers of a pool
+        with locked_json(self.path) as marks:
+            marks[self.target] = {**mark, "updated": datetime.now().isoformat(timespec="seconds")}
+
+
+def _widen(bounds: tuple | None, value) -> tuple:
+    if bounds is None:
+        return (value, value)
+    return (min(bounds[0], value), max(bounds[1], value))
+
+
+def _join(bounds: tuple | None, other: tuple | None) -> tuple | None:
+    if bounds is None or other is None:
+        return bounds or other
+    return (min(bounds[0], other[0]), max(bounds[1], other[1]))
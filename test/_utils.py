@@ -1,5 +1,17 @@
+import json
+from pathlib import Path
 from typing import Any
 
+import pytest
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+DATA = Path(__file__).parent / "data"
+# the fixture pages: processed ones have their expected first tweet in a
+# .json next to them
+FIXTURES = ["single_tweet", "images_main_and_quote", "videos_main_and_quote"]
+
+
 class Difference:
     def __init__(self, key: str, expected: Any, actual: Any):
         self.key = key
@@ -14,3 +26,54 @@ class Difference:
         out += "\n" + "ACTUAL:\n" + str(self.actual)
         out += "\n"
         return out
+
+
+def assert_same_tweet(expected: dict, actual: dict) -> None:
+    """Fails with every key whose value differs"""
+    differences = [
+        Difference(k, expected.get(k), actual.get(k))
+        for k in set(expected) | set(actual)
+        if expected.get(k) != actual.get(k)
+    ]
+    assert len(differences) == 0, (
+        f"Found {len(differences)} differing keys:\n" +
+        "\n".join(str(d) for d in differences)
+    )
+
+
+def chrome(capabilities: dict | None = None) -> webdriver.Chrome:
+    """Headless Chrome, as every browser test runs it"""
+    options = Options()
+    options.add_argument("--headless")  # Run without GUI
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    for name, value in (capabilities or {}).items():
+        options.set_capability(name, value)
+    return webdriver.Chrome(options=options)
+
+
+def page_url(name: str, folder: str = "processed") -> str:
+    return f"file://{(DATA / folder / f'{name}.html').absolute()}"
+
+
+def load_page(driver, name: str, folder: str = "processed") -> None:
+    try:
+        driver.get(page_url(name, folder))
+    except:
+        pytest.fail("Could not load HTML file")
+
+
+def load_expected(driver, name: str) -> dict:
+    """Loads a processed fixture page and returns its expected first tweet"""
+    load_page(driver, name)
+    with open(DATA / "processed" / f"{name}.json", "r") as f:
+        return json.load(f)
+
+
+def tweet_cards(driver) -> list:
+    try:
+        return driver.find_elements(
+            "xpath", '//article[@data-testid="tweet" and not(@disabled)]'
+        )
+    except:
+        pytest.fail("Could not find tweet cards")
@@ -0,0 +1,13 @@
+import pytest
+
+from _utils import chrome
+
+
+@pytest.fixture
+def driver():
+    """Headless Chrome, quit after the test"""
+    driver = chrome()
+
+    yield driver
+
+    driver.quit()
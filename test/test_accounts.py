@@ -0,0 +1,145 @@
+import multiprocessing
+from pathlib import Path
+from time import time
+
+import pytest
+
+# imports for the package
+import sys
+path_to_repo = Path(__file__).parent.parent
+sys.path.insert(0, str(path_to_repo))
+
+from scraper.accounts import CHALLENGED, FAILED, AccountPool
+from scraper.ratelimit import RateLimiter
+
+
+def lease_and_exit(pool, leased):
+    leased.put(pool.lease()["username"])
+
+
+class TestAccountPool:
+    """Accounts are leased by health and cooldown, one scraper at a time"""
+
+    @pytest.fixture
+    def pool(self, tmp_path):
+        path = tmp_path / "accounts.txt"
+        path.write_text("# scraping accounts\nalice:pa:ss\n\nbob: secret\ncarol:x\n")
+        return AccountPool(str(path), state_path=str(tmp_path / "rate_limits.json"))
+
+
+    def test_file(self, pool, tmp_path):
+        assert pool.accounts == {"alice": "pa:ss", "bob": "secret", "carol": "x"}
+        path = tmp_path / "bad.txt"
+        path.write_text("alice\n")
+        with pytest.raises(ValueError):
+            AccountPool(str(path))
+
+
+    def test_lease(self, pool):
+        # throttled, then challenged at login, then failing to log in
+        RateLimiter("alice", pool.cooldowns).throttle("retry button")
+        pool.report("bob", CHALLENGED)
+        pool.report("carol", FAILED)
+
+        assert pool.lease() == {"username": "bob", "password": "secret"}
+        # leased already, cooling down, failed
+        assert pool.lease() is None
+        assert 0 < pool.next_ready() <= 30
+
+        pool.release("bob")
+        assert pool.lease()["username"] == "bob"
+        summary = pool.summary()
+        assert "alice: ok, cooling down" in summary and "last throttled" in summary
+        assert "bob: challenged, leased" in summary
+
+
+    def test_healthy_first(self, pool):
+        pool.report("alice", CHALLENGED)
+        assert pool.lease()["username"] == "bob"
+        assert pool.lease()["username"] == "carol"
+        assert pool.lease()["username"] == "alice"
+
+
+    def test_lease_of_dead_process(self, pool):
+        leased = multiprocessing.Queue()
+        process = multiprocessing.Process(target=lease_and_exit, args=(pool, leased))
+        process.start()
+        process.join()
+        assert leased.get(timeout=5) == "alice"
+
+        # the process is gone: its account is free again
+        assert pool.lease()["username"] == "alice"
+
+
+    def test_failed_login_is_retried(self, pool):
+        pool.report("alice", FAILED)
+        pool.report("bob", FAILED)
+        pool.report("bob", FAILED)
+        assert pool.lease()["username"] == "carol"
+        assert pool.lease() is None
+        # left out longer after each failure in a row
+        assert 0 < pool.next_ready() <= 30 * 60
+        assert "alice: failed, retried in" in pool.summary()
+
+        with pool.cooldowns.locked() as states:
+            states["alice"]["failed_at"] -= 30 * 60
+            states["bob"]["failed_at"] -= 30 * 60
+        assert pool.lease()["username"] == "alice"
+        assert pool.lease() is None
+
+        # a login that went through clears it
+        pool.report("alice", "ok")
+        assert "failures" not in pool.cooldowns.get("alice")
+
+
+    def test_switch_failed(self, pool):
+        """Test that a swap where no account logs in does not throttle twice"""
+        from scraper.twitter_scraper import Twitter_Scraper
+
+        class Driver:
+            def delete_all_cookies(self):
+                pass
+
+        def login(exit_on_failure=True):
+            if scraper.username != "alice":
+                pool.report(scraper.username, FAILED)
+                raise ValueError("Login failed")
+
+        scraper = Twitter_Scraper.__new__(Twitter_Scraper)
+        scraper.accounts = pool
+        scraper.username, scraper.password = pool.lease().values()
+        scraper.rate_limiter = RateLimiter("alice", pool.cooldowns)
+        scraper.stop = None
+        scraper.budget = None
+        scraper.driver = Driver()
+        scraper.login = login
+
+        assert not scraper._switch_account("retry button")
+        assert scraper.username == "alice"
+        # backing off is left to the caller
+        assert scraper.rate_limiter.strikes == 0
+        assert pool.lease() is None
+
+
+    def test_switch_paced(self, pool):
+        """Test that the login of a swap is charged to the new account's budget"""
+        from scraper.ratelimit import PAGE_LOAD_COST
+        from scraper.twitter_scraper import Twitter_Scraper
+
+        class Driver:
+            def delete_all_cookies(self):
+                pass
+
+        scraper = Twitter_Scraper.__new__(Twitter_Scraper)
+        scraper.accounts = pool
+        scraper.username, scraper.password = pool.lease().values()
+        scraper.rate_limiter = RateLimiter("alice", pool.cooldowns)
+        scraper.stop = None
+        scraper.budget = 900
+        scraper.driver = Driver()
+        scraper.login = lambda exit_on_failure=True: None
+
+        assert scraper._switch_account("retry button")
+        assert scraper.username == "bob"
+        bucket = scraper.rate_limiter.bucket
+        assert bucket.tokens == pytest.approx(bucket.burst - PAGE_LOAD_COST, abs=0.1)
@@ -0,0 +1,148 @@
+import subprocess
+from pathlib import Path
+
+import pytest
+
+# imports for the package
+import sys
+path_to_repo = Path(__file__).parent.parent
+sys.path.insert(0, str(path_to_repo))
+
+from scraper.cache import Cache
+from scraper.offline import OfflineParser
+from scraper.tweet import Tweet
+
+
+class TestCache:
+    """LRU + TTL cache, optionally persisted to SQLite"""
+
+    def test_hit_and_miss(self):
+        cache = Cache("test")
+        assert cache.get("@a") is None
+        cache.set("@a", {"user_id": "1"})
+        assert cache.get("@a") == {"user_id": "1"}
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert cache.hit_rate == 0.5
+
+
+    def test_lru_eviction(self):
+        cache = Cache("test", maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # b is now the least recently used
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+
+    def test_expiry(self):
+        cache = Cache("test", ttl=60)
+        cache.set("a", 1, ttl=-1)
+        cache.set("b", 2)
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+
+
+    def test_persisted(self, tmp_path):
+        path = str(tmp_path / "cache.db")
+        cache = Cache("test", path=path)
+        cache.set("@a", {"user_id": "1"})
+        cache.set("@b", {"user_id": "2"}, ttl=-1)
+        cache.close()
+
+        cache = Cache("test", path=path)
+        assert cache.get("@a") == {"user_id": "1"}
+        assert cache.get("@b") is None
+        # other caches sharing the file do not see these entries
+        assert Cache("other", path=path).get("@a") is None
+
+
+    def test_persisted_eviction(self, tmp_path):
+        """Test that the file is bounded too, least recently used first"""
+        path = str(tmp_path / "cache.db")
+        cache = Cache("test", maxsize=2, path=path)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.close()
+
+        cache = Cache("test", maxsize=2, path=path)
+        assert cache.get("a") == 1  # loaded, so b is now the oldest
+        cache.set("c", 3)
+        cache.close()
+
+        cache = Cache("test", maxsize=2, path=path)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+
+    def test_poster_details_from_cache(self):
+        """Test that a cached author is not hovered"""
+        html = (Path(__file__).parent / "data/processed/single_tweet.html").read_text()
+        record = OfflineParser().parse_records(html)[0]
+        cached = {"user_id": "42", "following_cnt": "10", "follower_cnt": "20"}
+        cache = Cache("poster_details")
+        cache.set(record["handle"], cached)
+
+        # driver and actions would fail if a hover was attempted
+        tweet = Tweet(
+            None, driver=object(), actions=object(), scrape_poster_details=True,
+            record=record, poster_cache=cache,
+        )
+        assert tweet.poster_details["user_id"] == "42"
+        assert tweet.poster_details["follower_cnt"] == "20"
+        assert cache.hits == 1
+
+
+    def test_batched_writes(self, tmp_path):
+        """Test that the file is written in batches, and trimmed in batches"""
+        path = str(tmp_path / "cache.db")
+        cache = Cache("test", maxsize=10, path=path, flush_every=5, flush_interval=3600)
+        other = Cache("test", path=path)
+        for i in range(4):
+            cache.set(str(i), i)
+        assert other._count() == 0
+        cache.set("4", 4)
+        assert other._count() == 5
+
+        # the file grows a little past maxsize before it is trimmed
+        for i in range(5, 11):
+            cache.set(str(i), i)
+        assert other._count() == 10
+        for i in range(11, 15):
+            cache.set(str(i), i)
+        assert other._count() == 10
+        assert other.get("0") is None and other.get("14") == 14
+
+        cache.set("15", 15)
+        cache.close()
+        assert other._count() == 10
+
+
+    def test_loaded_entries_are_bounded(self, tmp_path):
+        """Test that entries loaded from the file are evicted from memory too"""
+        path = str(tmp_path / "cache.db")
+        cache = Cache("test", maxsize=100, path=path)
+        for i in range(100):
+            cache.set(str(i), i)
+        cache.close()
+
+        # smaller now: the file is only trimmed once written to
+        cache = Cache("test", maxsize=10, path=path, flush_interval=3600)
+        for i in range(100):
+            assert cache.get(str(i)) == i
+        assert len(cache.entries) == 10
+        cache.close()
+
+
+    def test_flushed_at_exit(self, tmp_path):
+        """Test that a cache left open keeps its pending writes"""
+        path = str(tmp_path / "cache.db")
+        script = (
+            "import sys; sys.path.insert(0, {!r});"
+            "from scraper.cache import Cache;"
+            "cache = Cache('test', path={!r}); cache.set('a', 1); sys.exit(1)"
+        ).format(str(path_to_repo), path)
+        subprocess.run([sys.executable, "-c", script])
+        assert Cache("test", path=path).get("a") == 1
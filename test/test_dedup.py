@@ -0,0 +1,43 @@
+from pathlib import Path
+
+import pytest
+
+# imports for the package
+import sys
+path_to_repo = Path(__file__).parent.parent
+sys.path.insert(0, str(path_to_repo))
+
+from scraper.dedup import BloomFilter, SeenIds
+
+
+class TestSeenIds:
+    """Bounded de-duplication by status id"""
+
+    def test_add(self):
+        seen = SeenIds(window=2)
+        assert seen.add("1")
+        assert not seen.add("1")
+        assert seen.add("2")
+        assert "1" in seen
+        assert "3" not in seen
+
+
+    def test_window(self):
+        """Test that ids out of the window are kept in the filter only"""
+        seen = SeenIds(window=3, capacity=1000)
+        for i in range(10):
+            assert seen.add(str(i))
+        assert len(seen.recent_ids) == 3
+        assert len(seen) == 10
+        for i in range(10):
+            assert not seen.add(str(i))
+
+
+    def test_bloom_error_rate(self):
+        """Test that the false positive rate is close to the requested one"""
+        bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+        for i in range(10_000):
+            bloom.add(f"seen-{i}")
+        assert all(f"seen-{i}" in bloom for i in range(10_000))
+        false_positives = sum(f"new-{i}" in bloom for i in range(10_000))
+        assert false_positives < 200
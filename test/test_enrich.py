@@ -0,0 +1,119 @@
+from pathlib import Path
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from _utils import chrome
+
+# imports for the package
+import sys
+path_to_repo = Path(__file__).parent.parent
+sys.path.insert(0, str(path_to_repo))
+
+from scraper.cache import Cache
+from scraper.enrich import PosterEnricher
+
+
+PROFILES = Path(__file__).parent / "data/profiles"
+
+
+class TestPosterEnricher:
+    """Poster details fetched from profile pages by a pool of browsers"""
+
+    @pytest.fixture
+    def enricher(self):
+        enricher = PosterEnricher(
+            chrome,
+            workers=1,
+            cache=Cache("poster_details"),
+            profile_url=f"file://{PROFILES.absolute()}/{{}}.html",
+            timeout=2,
+        )
+
+        yield enricher
+
+        enricher.close()
+
+
+    def test_join(self, enricher):
+        """Test that every tweet of an author gets the profile's details,
+        keeping what the card itself gave"""
+        first = {"verified": False, "profile_img": "from-card.jpg"}
+        second = {"verified": False, "profile_img": "from-card.jpg"}
+        enricher.submit("@someone", first)
+        enricher.submit("@someone", second)
+        enricher.join()
+
+        assert first == {
+            "verified": False,
+            "profile_img": "from-card.jpg",
+            "user_id": "1234567890",
+            "following_cnt": "120",
+            "follower_cnt": "4.5K",
+        }
+        assert second == first
+        assert (enricher.fetched, enricher.failed) == (1, 0)
+        assert enricher.cache.get("@someone")["verified"] is True
+
+
+    def test_cached_and_failed(self, enricher):
+        """Test that cached authors are not fetched and missing profiles are
+        counted as failed"""
+        enricher.cache.set("@cached", {"user_id": "1", "following_cnt": "2", "follower_cnt": "3"})
+        cached = {}
+        missing = {}
+        enricher.submit("@cached", cached)
+        enricher.submit("@nobody", missing)
+        enricher.join()
+
+        assert cached == {"user_id": "1", "following_cnt": "2", "follower_cnt": "3"}
+        assert missing == {}
+        assert (enricher.fetched, enricher.cached, enricher.failed) == (0, 1, 1)
+
+
+    def test_browser_not_started(self):
+        """Test that a browser failing to start fails its authors only"""
+        def make_driver():
+            raise WebDriverException("Could not set up WebDriver")
+
+        enricher = PosterEnricher(make_driver, workers=1)
+        poster_details = {"verified": False}
+        enricher.submit("@someone", poster_details)
+        enricher.join()
+        enricher.close()
+
+        assert poster_details == {"verified": False}
+        assert enricher.failed == 1
+
+
+    def test_crashed_browser_replaced(self):
+        """Test that a browser that crashed is not used again"""
+        class Driver:
+            def __init__(self, crashes):
+                self.crashes = crashes
+                self.quit_called = False
+
+            def get(self, url):
+                if self.crashes:
+                    raise WebDriverException("invalid session id")
+
+            def quit(self):
+                self.quit_called = True
+
+        drivers = []
+
+        def make_driver():
+            drivers.append(Driver(crashes=not drivers))
+            return drivers[-1]
+
+        enricher = PosterEnricher(make_driver, workers=1)
+        enricher._extract = lambda driver: {"user_id": "1"}
+        enricher.submit("@first", {})
+        enricher.join()
+        second = {}
+        enricher.submit("@second", second)
+        enricher.join()
+        enricher.close()
+
+        assert len(drivers) == 2 and drivers[0].quit_called
+        assert enricher.failed == 1 and second["user_id"] == "1"
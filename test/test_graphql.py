@@ -0,0 +1,196 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import pytest
+
+from _utils import DATA, chrome
+
+# imports for the package
+import sys
+path_to_repo = Path(__file__).parent.parent
+sys.path.insert(0, str(path_to_repo))
+
+from scraper.graphql import GraphQLPipeline, ResponseParser
+from scraper.tweet import Tweet
+from scraper.waits import Waits
+
+
+PAGE = """<html><body style="height: 5000px">
+<script>
+  // the first page of results on load, the next one on scroll
+  const load = (path) => fetch(path).then((r) => r.json());
+  load("/i/api/graphql/q1/HomeTimeline?variables=%7B%7D");
+  load("/i/api/graphql/q2/UserByScreenName?variables=%7B%7D");
+  window.addEventListener("scroll", () => load("/i/api/graphql/q3/TweetDetail?variables=%7B%7D"), { once: true });
+</script>
+</body></html>"""
+
+
+def _load(operation):
+    with open(DATA / f"graphql/{operation}.json", "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    """Serves PAGE and replays the recorded GraphQL responses"""
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == "/":
+            body, content_type = PAGE.encode(), "text/html"
+        else:
+            operation = path.rsplit("/", 1)[-1]
+            recorded = DATA / f"graphql/{operation}.json"
+            body = recorded.read_bytes() if recorded.exists() else b'{"data": {}}'
+            content_type = "application/json"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestResponseParser:
+    """Recorded responses map to the tweet schema"""
+
+    def test_matches_page_fixture(self):
+        """Test that a tweet read from a response gives the dict scraped from
+        its card"""
+        records, boundary = ResponseParser().parse(_load("HomeTimeline"))
+        assert not boundary
+        tweet = Tweet(None, record=records[0]).tweet
+        with open(DATA / "processed/single_tweet.json", "r") as f:
+            expected = json.load(f)
+
+        # the page fixture was saved locally: its links point to file://
+        assert tweet.pop("tweet_link") == "https://x.com/aryaman2020/status/1933920674323833170"
+        expected.pop("tweet_link")
+        assert tweet == expected
+
+
+    def test_timeline_items(self):
+        """Test that ads are flagged, unavailable tweets skipped and reposts
+        read as the tweet they repost"""
+        records, _ = ResponseParser().parse(_load("HomeTimeline"))
+        assert [r["tweet_id"] for r in records] == [
+            "1933920674323833170",
+            "1934000000000000001",
+            "1933000000000000002",
+            "1932954702255141031",
+        ]
+        assert [r["is_ad"] for r in records] == [False, True, False, False]
+
+        repost = records[2]
+        assert repost["handle"] == "@levelsio"
+        # no reply mention nor media link, links expanded, entities decoded
+        assert repost["content"] == "Shipping it today & more #buildinpublic https://example.com/launch"
+        assert repost["mentions"] == []
+        assert repost["tags"] == ["#buildinpublic"]
+        assert repost["analytics_cnt"] == "150000"
+        assert repost["image_urls"] == ["https://pbs.twimg.com/media/GtAbCdEfXYZ?format=jpg&name=large"]
+
+
+    def test_long_post(self):
+        """Test that long posts come in full, with their best video file, the
+        quoted tweet and the card link"""
+        records, _ = ResponseParser().parse(_load("HomeTimeline"))
+        record = records[3]
+        assert not record["truncated"]
+        assert len(record["content"]) > 280
+        assert record["content"].endswith("The end \U0001f389")
+        assert record["emojis"] == ["\\U0001f389"]
+        assert record["videos"] == [{
+            "video_id": "1932953615766814720",
+            "source": "https://video.twimg.com/amplify_video/1932953615766814720/vid/avc1/1280x720/e.mp4",
+            "duration": "0:57",
+            "thumbnail": "https://pbs.twimg.com/amplify_video_thumb/1932953615766814720/img/v5i_m0VpIMq3tv0X.jpg",
+        }]
+        assert record["media_urls"] == ["https://t.co/card123"]
+
+        quote = record["quoted_tweet"]
+        assert quote["handle"] == "@CharlesPattson"
+        assert quote["content"] == "A 100x dev did this"
+        assert quote["videos"][0]["source"].endswith("/b.mp4")
+
+
+    def test_poster_details(self):
+        records, _ = ResponseParser().parse(_load("HomeTimeline"))
+        assert set(records[0]["poster_details"]) == {"verified", "profile_img"}
+
+        records, _ = ResponseParser(poster_details=True).parse(_load("HomeTimeline"))
+        assert records[0]["poster_details"]["user_id"] == "1191553453470064640"
+        assert records[0]["poster_details"]["following_cnt"] == "987"
+        assert records[0]["poster_details"]["follower_cnt"] == "4321"
+
+        # counts missing from the response stay missing
+        text = (DATA / "graphql/HomeTimeline.json").read_text(encoding="utf-8")
+        payload = json.loads(text.replace('"followers_count": 4321,', ""))
+        records, _ = ResponseParser(poster_details=True).parse(payload)
+        assert records[0]["poster_details"]["follower_cnt"] is None
+
+
+    def test_conversation(self):
+        """Test that a conversation stops at its "Discover more" section"""
+        records, boundary = ResponseParser().parse(_load("TweetDetail"))
+        assert boundary
+        assert [r["tweet_id"] for r in records] == ["1933920674323833170", "1933920999999999999"]
+        assert records[1]["content"] == "congrats"
+
+
+class TestGraphQLPipeline:
+    """Responses captured from the browser's network events"""
+
+    @pytest.fixture
+    def server(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), ReplayHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        yield f"http://127.0.0.1:{server.server_address[1]}/"
+
+        server.shutdown()
+        server.server_close()
+
+
+    @pytest.fixture
+    def driver(self):
+        # the responses are read from the performance log
+        driver = chrome({"goog:loggingPrefs": {"performance": "ALL"}})
+
+        yield driver
+
+        driver.quit()
+
+
+    def test_captures_responses(self, driver, server):
+        # listening before the page loads, as scrape_tweets does
+        pipeline = GraphQLPipeline(driver, fields=["tweet_id", "handle"])
+        driver.get(server)
+
+        waits = Waits(driver)
+        steps = []
+        assert waits.until(lambda _: steps.append(pipeline.step()) or steps[-1][0])
+        tweets, boundary = steps[-1]
+        assert not boundary
+        assert [t.tweet["tweet_id"] for t in tweets] == [
+            "1933920674323833170",
+            "1934000000000000001",
+            "1933000000000000002",
+            "1932954702255141031",
+        ]
+        assert tweets[1].is_ad
+
+        # scrolling requests the next results; tweets returned already are skipped
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        assert waits.until(lambda _: steps.append(pipeline.step()) or steps[-1][0])
+        tweets, boundary = steps[-1]
+        assert boundary
+        assert [t.tweet for t in tweets] == [
+            {"tweet_id": "1933920999999999999", "handle": "@levelsio"}
+        ]
@@ -0,0 +1,192 @@
+from pathlib import Path
+
+import pytest
+
+from _utils import FIXTURES, assert_same_tweet, load_expected, load_page, tweet_cards
+
+# imports for the package
+import sys
+path_to_repo = Path(__file__).parent.parent
+sys.path.insert(0, str(path_to_repo))
+
+from scraper.js_engine import (drain_observed_cards, expand_truncated, extract_new_cards,
+                                observe_cards, prune_cards, snapshot_new_cards)
+from scraper.offline import parse_snapshot
+from scraper.tweet import Tweet
+from scraper.waits import Waits
+
+
+class TestJsEngine:
+    """The single round-trip engine must match the WebDriver engine on every
+    processed fixture"""
+
+    @pytest.mark.parametrize("name", FIXTURES)
+    def test_matches_fixture(self, driver, name):
+        """Test that the js engine produces the expected tweet dict, including
+        the quoted tweet"""
+        main_tweet = load_expected(driver, name)
+        tweet = Tweet(tweet_cards(driver)[0], engine="js").tweet
+        assert tweet is not None, "Could not create Tweet object"
+
+        assert_same_tweet(main_tweet, tweet)
+
+
+    @pytest.mark.parametrize("name", FIXTURES)
+    def test_matches_webdriver_engine(self, driver, name):
+        """Test that both engines agree on the same card"""
+        load_page(driver, name)
+        card = tweet_cards(driver)[0]
+        assert Tweet(card, engine="js").tweet == Tweet(card).tweet
+
+
+    def test_batch_step_returns_only_new_cards(self, driver):
+        """Test that a batched step matches per-card extraction and that the
+        following step does not return the same cards again"""
+        load_page(driver, "single_tweet", "original")
+
+        step = extract_new_cards(driver, scroll=False)
+        batched = [
+            Tweet(record["card"], record=record).tweet for record in step["records"]
+        ]
+        expected = [Tweet(card).tweet for card in tweet_cards(driver)]
+
+        assert step["boundary"], "Expected the \"Discover more\" boundary"
+        assert len(batched) > 0
+        assert batched == expected[:len(batched)]
+        assert extract_new_cards(driver, scroll=False)["records"] == []
+
+
+    def test_snapshot_step_parses_like_batch_step(self, driver):
+        """Test that snapshots parsed offline give the same tweets as the
+        batched in-page extraction"""
+        load_page(driver, "single_tweet", "original")
+        step = snapshot_new_cards(driver, scroll=False)
+        parsed = [
+            Tweet(None, record=record).tweet
+            for snapshot in step["snapshots"]
+            for record in parse_snapshot(snapshot["html"], step["url"])
+        ]
+
+        load_page(driver, "single_tweet", "original")
+        batched = [
+            Tweet(record["card"], record=record).tweet
+            for record in extract_new_cards(driver, scroll=False)["records"]
+        ]
+
+        assert len(parsed) > 0
+        assert parsed == batched
+
+
+    def test_expand_truncated(self, driver):
+        """Test that every "Show more" button is clicked once, in one call,
+        and that the expanded tweets are no longer reported as truncated"""
+        load_page(driver, "single_tweet", "original")
+        # a saved page does not react to clicks: expand the text as the
+        # site would, by removing the button
+        driver.execute_script(
+            """
+            for (const button of document.querySelectorAll(
+                'button[data-testid="tweet-text-show-more-link"]'
+            )) {
+                button.addEventListener("click", () => setTimeout(() => button.remove(), 100));
+            }
+            """
+        )
+        cards = tweet_cards(driver)
+        truncated = [Tweet(card, engine="js").truncated for card in cards]
+        assert any(truncated)
+
+        buttons = expand_truncated(driver)
+        assert len(buttons) == sum(truncated)
+        assert Waits(driver).gone(*buttons, timeout=5)
+        assert not any(Tweet(card, engine="js").truncated for card in cards)
+        assert not any(Tweet(card).truncated for card in cards)
+        assert expand_truncated(driver) == []
+
+
+    @pytest.mark.parametrize("mode", ["remove", "spacer"])
+    def test_prune_cards(self, driver, mode):
+        """Test that only processed cards scrolled out of view are pruned and
+        that the visible cards do not move"""
+        load_page(driver, "single_tweet", "original")
+        count = len(tweet_cards(driver))
+
+        assert prune_cards(driver, None)["pruned"] == 0
+        # nothing processed yet
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        assert prune_cards(driver, mode, margin=0)["pruned"] == 0
+
+        processed = tweet_cards(driver)[:-1]
+        last = tweet_cards(driver)[-1]
+        top = last.rect["y"]
+        step = prune_cards(driver, mode, processed, margin=0)
+        assert 0 < step["pruned"] < count
+        assert step["heap"] is None or step["heap"] > 0
+        assert len(tweet_cards(driver)) < count
+        # the card that was not processed is kept, in place
+        assert last.rect["y"] == top
+
+
+    def test_observer_step(self, driver):
+        """Test that the observer queue starts with the cards of the batched
+        step and then returns the cards inserted since, including the ones
+        removed before the step"""
+        load_page(driver, "single_tweet", "original")
+        drained = drain_observed_cards(driver, scroll=False)
+
+        load_page(driver, "single_tweet", "original")
+        batched = extract_new_cards(driver, scroll=False)
+        assert drained["boundary"] == batched["boundary"]
+        assert [r["tweet_id"] for r in drained["records"]] == [
+            r["tweet_id"] for r in batched["records"]
+        ]
+        assert drain_observed_cards(driver, scroll=False)["records"] == []
+
+        # a card inserted at the top, one inserted and recycled before the
+        # step, and one already returned
+        driver.execute_script(
+            """
+            const card = document.querySelector('article[data-testid="tweet"]');
+            const copy = (id) => {
+                const clone = card.cloneNode(true);
+                clone.querySelectorAll('a[href*="/status/"]').forEach((a) => {
+                    a.href = a.href.replace(/status\\/\\d+/, "status/" + id);
+                });
+                return clone;
+            };
+            card.parentNode.insertBefore(copy("1"), card);
+            const recycled = copy("2");
+            card.parentNode.appendChild(recycled);
+            setTimeout(() => recycled.remove(), 0);
+            card.parentNode.appendChild(card.cloneNode(true));
+            """
+        )
+        step = drain_observed_cards(driver, scroll=False)
+        assert [r["tweet_id"] for r in step["records"]] == ["1", "2"]
+        assert step["records"][0]["card"] is not None
+        assert step["records"][1]["card"] is None
+        assert step["records"][1]["content"] == step["records"][0]["content"]
+
+
+    def test_observed_on_load(self, driver):
+        """Test that observe_cards starts the queue before the first step, and
+        that a card recycled meanwhile reads the same as the cards on the page"""
+        load_page(driver, "single_tweet", "original")
+        assert observe_cards(driver) == len(tweet_cards(driver))
+
+        driver.execute_script(
+            """
+            const card = document.querySelector('article[data-testid="tweet"]');
+            const clone = card.cloneNode(true);
+            clone.querySelectorAll('a[href*="/status/"]').forEach((a) => {
+                a.href = a.href.replace(/status\\/\\d+/, "status/3");
+            });
+            card.parentNode.appendChild(clone);
+            clone.remove();
+            """
+        )
+        records = drain_observed_cards(driver, scroll=False)["records"]
+        live, recycled = records[0], records[-1]
+        assert recycled["tweet_id"] == "3" and recycled["card"] is None
+        for field in ("user", "handle", "content", "reply_cnt", "like_cnt", "tags", "mentions"):
+            assert recycled[field] == live[field], field
@@ -0,0 +1,65 @@
+from pathlib import Path
+
+import pytest
+
+from _utils import FIXTURES, assert_same_tweet, load_expected, tweet_cards
+
+# imports for the package
+import sys
+path_to_repo = Path(__file__).parent.parent
+sys.path.insert(0, str(path_to_repo))
+
+from scraper import locators
+from scraper.tweet import Tweet
+
+
+class TestLazyTweet:
+    """A lazy Tweet scrapes a field only when it is first accessed"""
+
+    def _load(self, driver, name):
+        """Helper function to load a fixture page and its first tweet card"""
+        return load_expected(driver, name), tweet_cards(driver)[0]
+
+
+    @pytest.mark.parametrize("name", FIXTURES)
+    def test_matches_fixture(self, driver, name):
+        """Test that the materialized dict of a lazy tweet is the eager one"""
+        main_tweet, card = self._load(driver, name)
+        tweet = Tweet(card, lazy=True).tweet
+        assert tweet is not None, "Could not create Tweet object"
+
+        assert_same_tweet(main_tweet, tweet)
+
+
+    def test_scrapes_only_accessed_fields(self, driver):
+        """Test that reading a field only runs the selectors it needs"""
+        _, card = self._load(driver, "videos_main_and_quote")
+        locators.reset_stats()
+        tweet = Tweet(card, lazy=True)
+        assert locators.stats() == []
+
+        tweet_id = tweet.tweet_id
+        assert tweet_id != ""
+        assert [row["name"] for row in locators.stats()] == ["tweet_link"]
+
+        # cached: a second read does not touch the DOM again
+        assert tweet.tweet_id == tweet_id
+        assert locators.get("tweet_link").hits == 1
+        assert "content" not in vars(tweet)
+        assert "tweet" not in vars(tweet)
+
+
+    @pytest.mark.parametrize("engine", ["webdriver", "js"])
+    def test_fields_projection(self, driver, engine):
+        """Test that fields restricts the tweet dict, in the requested order,
+        and that the webdriver engine skips the groups it does not need"""
+        main_tweet, card = self._load(driver, "videos_main_and_quote")
+        fields = ["tweet_id", "handle", "date_time", "content"]
+        locators.reset_stats()
+        tweet = Tweet(card, engine=engine, fields=fields)
+
+        assert list(tweet.tweet) == fields
+        assert tweet.tweet == {field: main_tweet[field] for field in fields}
+        if engine == "webdriver":
+            scanned = set(row["name"] for row in locators.stats())
+            assert not scanned & {"video_player", "images", "media_cards", "quote_card"}
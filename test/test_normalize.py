@@ -0,0 +1,64 @@
+import json
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# imports for the package
+import sys
+path_to_repo = Path(__file__).parent.parent
+sys.path.insert(0, str(path_to_repo))
+
+from scraper.normalize import normalize, parse_counts, snowflake_time
+from scraper.record import TweetRecord, to_frame
+from scraper.utils import parse_count
+
+
+FIXTURES = ["single_tweet", "images_main_and_quote", "videos_main_and_quote"]
+
+
+class TestNormalize:
+    """Column-wise typing of saved tweets"""
+
+    def _load(self):
+        tweets = []
+        for name in FIXTURES:
+            with open(Path(__file__).parent / f"data/processed/{name}.json", "r") as f:
+                tweets.append(json.load(f))
+        return tweets
+
+
+    def test_parse_counts(self):
+        """Test that the column parser agrees with utils.parse_count"""
+        texts = ["0", "87", "1,234", "12.5K", "3M", "1.2b", "", None, "n/a"]
+        counts = parse_counts(pd.Series(texts, dtype=object))
+        assert str(counts.dtype) == "Int64"
+        assert [None if pd.isna(c) else c for c in counts] == [parse_count(t) for t in texts]
+
+
+    def test_snowflake_time(self):
+        times = snowflake_time(pd.Series(["1933920674323833170", "", None]))
+        assert times[0] == pd.Timestamp("2025-06-14 16:13:13.924", tz="UTC")
+        assert times[1:].isna().all()
+
+
+    def test_normalize(self):
+        tweets = self._load()
+        tweets[0]["poster_details"]["follower_cnt"] = "1.2K"
+        df = normalize(pd.DataFrame(tweets))
+
+        assert str(df["like_cnt"].dtype) == "Int64"
+        assert df["like_cnt"].tolist() == [parse_count(t["like_cnt"]) for t in tweets]
+        assert isinstance(df["date_time"].dtype, pd.DatetimeTZDtype)
+        assert df["handle"].dtype == "category"
+        assert df["poster_follower_cnt"][0] == 1200
+        # the tweet id encodes the time the tweet was posted
+        assert abs(df["tweet_time"][0] - df["date_time"][0]) < pd.Timedelta(seconds=1)
+
+
+    def test_normalize_projection_and_records(self):
+        """Test that missing columns are skipped and records are accepted"""
+        tweets = [{"tweet_id": t["tweet_id"], "like_cnt": t["like_cnt"]} for t in self._load()]
+        df = normalize(to_frame([TweetRecord(t) for t in tweets]))
+        assert list(df.columns) == ["like_cnt", "tweet_id", "tweet_time"]
+        assert df["like_cnt"].tolist() == [parse_count(t["like_cnt"]) for t in tweets]
@@ -0,0 +1,57 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from _utils import FIXTURES, assert_same_tweet
+
+# imports for the package
+import sys
+path_to_repo = Path(__file__).parent.parent
+sys.path.insert(0, str(path_to_repo))
+
+from scraper.offline import OfflineParser
+
+
+class TestOfflineParser:
+    """The offline parser must produce the same tweets as the browser engines
+    for the processed fixtures"""
+
+    def _parse(self, name):
+        """Helper function to parse a processed fixture page"""
+        html_path = Path(__file__).parent / f"data/processed/{name}.html"
+        # links resolve against the page, as they do when the browser loads it
+        parser = OfflineParser(base_url=f"file://{html_path.absolute()}")
+        with open(html_path, "r", encoding="utf-8") as f:
+            return parser.parse(f.read())
+
+
+    @pytest.mark.parametrize("name", FIXTURES)
+    def test_matches_fixture(self, name):
+        """Test that the first tweet of the page, including the quoted tweet,
+        matches the expected properties"""
+        with open(Path(__file__).parent / f"data/processed/{name}.json", "r") as f:
+            main_tweet = json.load(f)
+        tweet = self._parse(name)[0]
+
+        assert_same_tweet(main_tweet, tweet)
+
+
+    def test_single_card_html(self):
+        """Test that a card's outerHTML parses on its own"""
+        html_path = Path(__file__).parent / "data/processed/single_tweet.html"
+        with open(html_path, "r", encoding="utf-8") as f:
+            page = f.read()
+        card = page[page.index("<article"):page.rindex("</article>") + len("</article>")]
+
+        tweets = OfflineParser(base_url=f"file://{html_path.absolute()}").parse(card)
+        assert tweets == self._parse("single_tweet")
+
+
+    def test_original_page(self):
+        """Test that every card of a full saved page is parsed"""
+        html_path = Path(__file__).parent / "data/original/single_tweet.html"
+        with open(html_path, "r", encoding="utf-8") as f:
+            tweets = OfflineParser().parse(f.read())
+        assert len(tweets) > 1
+        assert len(set(t["tweet_id"] for t in tweets)) == len(tweets)
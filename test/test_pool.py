@@ -0,0 +1,81 @@
+import json
+import os
+from pathlib import Path
+
+# imports for the package
+import sys
+path_to_repo = Path(__file__).parent.parent
+sys.path.insert(0, str(path_to_repo))
+
+from scraper.pool import JsonlWriter, ScraperPool, auto_size
+
+
+def fake_worker(index, scraper_kwargs, scrape_kwargs, inbox, outbox, log_path):
+    # a worker without browser: "crash" kills it the first time, "fail"
+    # always fails, any other URL gives one tweet
+    outbox.put(("ready", index))
+    while True:
+        item = inbox.get()
+        if item is None:
+            break
+        number, target = item
+        if target["url"] == "crash" and not os.path.exists(scraper_kwargs["crashed"]):
+            open(scraper_kwargs["crashed"], "w").close()
+            os._exit(1)
+        if target["url"] == "fail":
+            outbox.put(("failed", index, number, "no tweets"))
+            continue
+        outbox.put(("progress", index, 1, False))
+        outbox.put(("done", index, number, [{"tweet_id": target["url"], **scrape_kwargs}]))
+
+
+class TestScraperPool:
+    """Targets are shared between workers, whose results one writer saves"""
+
+    def test_auto_size(self):
+        assert 1 <= auto_size() <= (os.cpu_count() or 1)
+        assert auto_size(targets=1) == 1
+
+
+    def test_run(self, tmp_path):
+        writer = JsonlWriter(str(tmp_path / "tweets.jsonl"))
+        pool = ScraperPool(
+            {"crashed": str(tmp_path / "crashed")},
+            scrape_kwargs={"engine": "batch"},
+            workers=2,
+            writer=writer,
+            save_folder_path=str(tmp_path),
+            work=fake_worker,
+        )
+        counts = pool.run(["a", "crash", "fail", {"mode": "url", "url": "b"}])
+
+        # the target of the worker that died was scraped by another one
+        assert counts == {0: 1, 1: 1, 3: 1}
+        assert sum(pool.restarts.values()) == 1
+        assert pool.failed == {2: "no tweets"}
+        assert pool.attempts[2] == pool.max_attempts
+
+        with open(writer.path, "r", encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+        assert sorted(line["target"] for line in lines) == ["a", "b", "crash"]
+        assert all(line["engine"] == "batch" for line in lines)
+        assert "3 of 4 targets done, 1 failed" in pool.summary()
+
+
+    def test_normalized_writer(self, tmp_path):
+        writer = JsonlWriter(str(tmp_path / "tweets.jsonl"), normalize=True)
+        writer.write({"mode": "url", "url": "a"}, [{
+            "tweet_id": "1933920674323833170",
+            "date_time": "2025-06-14T16:13:13.000Z",
+            "like_cnt": "1.2K",
+            "poster_details": {"following_cnt": "10", "follower_cnt": None},
+        }])
+        writer.close()
+
+        with open(writer.path, "r", encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+        assert len(lines) == 1 and writer.written == 1
+        assert lines[0]["target"] == "a"
+        assert lines[0]["like_cnt"] == 1200
+        assert lines[0]["poster_following_cnt"] == 10
+        assert lines[0]["tweet_time"].startswith("2025-06-14T16:13:13")
@@ -0,0 +1,113 @@
+import random
+import threading
+from pathlib import Path
+from time import perf_counter, time
+
+# imports for the package
+import sys
+path_to_repo = Path(__file__).parent.parent
+sys.path.insert(0, str(path_to_repo))
+
+from scraper.ratelimit import Backoff, Cooldowns, RateLimiter, TokenBucket
+
+
+class TestRateLimiter:
+    """Throttled accounts back off longer each time, and remember it"""
+
+    def test_backoff(self):
+        backoff = Backoff(base=10, factor=2, cap=100, jitter=0.5, rng=random.Random(0))
+        for attempt, ceiling in enumerate([10, 20, 40, 80, 100, 100]):
+            delay = backoff.delay(attempt)
+            assert ceiling / 2 <= delay <= ceiling
+
+
+    def test_cooldown_is_kept(self, tmp_path):
+        path = str(tmp_path / "rate_limits.json")
+        limiter = RateLimiter("alice", Cooldowns(path), Backoff(base=60))
+        delay = limiter.throttle("retry button")
+        assert 30 <= delay <= 60
+        assert limiter.strikes == 1
+
+        # the next run waits for the rest of it, and backs off longer
+        limiter = RateLimiter("alice", Cooldowns(path), Backoff(base=60))
+        assert 0 < limiter.remaining() <= delay
+        assert 60 <= limiter.throttle("429") <= 120
+        assert RateLimiter("bob", Cooldowns(path)).remaining() == 0
+
+        limiter.success()
+        limiter = RateLimiter("alice", Cooldowns(path))
+        assert limiter.remaining() == 0 and limiter.strikes == 0
+
+
+    def test_reset_time(self):
+        limiter = RateLimiter("alice", backoff=Backoff(base=1000))
+        # the server knows better than the backoff
+        delay = limiter.throttle("429", reset_at=time() + 5)
+        assert 5 <= delay <= 6 + 100
+
+
+    def test_wait_interrupted(self):
+        stop = threading.Event()
+        limiter = RateLimiter("alice", backoff=Backoff(base=60), stop=stop, tick=0.05)
+        limiter.throttle("retry button")
+        ticks = []
+        threading.Timer(0.3, stop.set).start()
+
+        start = perf_counter()
+        assert not limiter.wait(ticks.append)
+        assert perf_counter() - start < 5
+        assert limiter.interrupted
+        assert ticks and limiter.remaining() > 0
+        assert "interrupted" in limiter.summary()
+
+
+    def test_wait(self):
+        limiter = RateLimiter("alice", backoff=Backoff(base=0.2), tick=0.05)
+        limiter.throttle("empty feed")
+        assert limiter.wait()
+        assert limiter.remaining() == 0
+        assert "empty feed: 1" in limiter.summary()
+
+
+    def test_pacing(self):
+        bucket = TokenBucket(rate=20, burst=2)
+        start = perf_counter()
+        for _ in range(6):
+            assert bucket.take()
+        # the burst goes through at once, the rest at the rate
+        assert 0.15 <= perf_counter() - start < 2
+        assert bucket.waited > 0
+
+
+    def test_pace_tuning(self, tmp_path):
+        path = str(tmp_path / "rate_limits.json")
+        limiter = RateLimiter("alice", Cooldowns(path), budget=60, window=60)
+        assert limiter.bucket.rate == 1
+        limiter.throttle("429")
+        assert limiter.bucket.rate == 0.5
+        limiter.throttle("429")
+        assert limiter.bucket.rate == 0.25
+
+        # the next run starts at the pace tuned to, and speeds up slowly
+        limiter = RateLimiter("alice", Cooldowns(path), budget=60, window=60)
+        assert limiter.bucket.rate == 0.25
+        assert limiter.pace()
+        assert 0.25 < limiter.bucket.rate < 0.3
+        assert "paced at" in limiter.summary()
+
+
+    def test_pace_interrupted(self):
+        stop = threading.Event()
+        limiter = RateLimiter("alice", budget=1, window=3600, burst=1, stop=stop)
+        assert limiter.pace()
+        threading.Timer(0.2, stop.set).start()
+        assert not limiter.pace()
+
+
+    def test_costly_request(self):
+        bucket = TokenBucket(rate=20, burst=2)
+        assert bucket.take(5)
+        # paid for by the next requests
+        start = perf_counter()
+        assert bucket.take()
+        assert perf_counter() - start >= 0.1
@@ -0,0 +1,73 @@
+import json
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# imports for the package
+import sys
+path_to_repo = Path(__file__).parent.parent
+sys.path.insert(0, str(path_to_repo))
+
+from scraper.record import TweetRecord, to_dicts, to_frame
+from scraper.utils import parse_count
+
+
+FIXTURES = ["single_tweet", "images_main_and_quote", "videos_main_and_quote"]
+COUNTS = ["reply_cnt", "retweet_cnt", "like_cnt", "analytics_cnt"]
+
+
+class TestTweetRecord:
+    """Compact records must hold the same data as the tweet dicts"""
+
+    def _load(self, name):
+        with open(Path(__file__).parent / f"data/processed/{name}.json", "r") as f:
+            return json.load(f)
+
+
+    @pytest.mark.parametrize("name", FIXTURES)
+    def test_round_trip(self, name):
+        """Test that a record converts back to its dict, counts as ints"""
+        tweet = self._load(name)
+        record = TweetRecord(tweet)
+
+        expected = dict(tweet)
+        for field in COUNTS:
+            expected[field] = parse_count(tweet[field])
+        assert record.to_dict() == expected
+        assert list(record.to_dict()) == list(tweet)
+        assert isinstance(record.like_cnt, int)
+
+
+    def test_projection(self):
+        """Test that a record of a projected tweet only has those fields"""
+        tweet = self._load("single_tweet")
+        record = TweetRecord({"tweet_id": tweet["tweet_id"], "content": tweet["content"]})
+        assert record.to_dict() == {"tweet_id": tweet["tweet_id"], "content": tweet["content"]}
+        assert not hasattr(record, "handle")
+
+
+    def test_interned_and_read_only(self):
+        """Test that handles are shared between records and cannot be changed"""
+        tweet = self._load("single_tweet")
+        copy = json.loads(json.dumps(tweet))
+        assert TweetRecord(tweet).handle is TweetRecord(copy).handle
+        with pytest.raises(AttributeError):
+            TweetRecord(tweet).handle = "@other"
+
+
+    def test_to_frame(self):
+        """Test that the column-wise frame matches the frame of the dicts"""
+        records = [TweetRecord(self._load(name)) for name in FIXTURES]
+        expected = pd.DataFrame(to_dicts(records))
+        frame = to_frame(records)
+        assert list(frame.columns) == list(expected.columns)
+        assert frame.to_dict("records") == expected.to_dict("records")
+
+
+    @pytest.mark.parametrize("text, count", [
+        ("0", 0), ("87", 87), ("1,234", 1234), ("12.5K", 12500),
+        ("3M", 3000000), ("1.2b", 1200000000), ("", None), (None, None),
+    ])
+    def test_parse_count(self, text, count):
+        assert parse_count(text) == count
@@ -0,0 +1,147 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# imports for the package
+import sys
+path_to_repo = Path(__file__).parent.parent
+sys.path.insert(0, str(path_to_repo))
+
+from scraper.cache import Cache
+from scraper.resolver import ShortUrlResolver
+
+
+class RedirectHandler(BaseHTTPRequestHandler):
+    """/a -> /b -> /final, /slow answers after a delay"""
+
+    redirects = {"/a": "/b", "/b": "/final"}
+    active = 0
+    max_active = 0
+    requests = 0
+    lock = threading.Lock()
+
+    def do_HEAD(self):
+        cls = type(self)
+        with cls.lock:
+            cls.requests += 1
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+        try:
+            if self.path.startswith("/slow"):
+                time.sleep(0.2)
+            if self.path in self.redirects:
+                self.send_response(301)
+                self.send_header("Location", self.redirects[self.path])
+            else:
+                self.send_response(200)
+            self.end_headers()
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+class TestShortUrlResolver:
+    """Background resolution against a local redirect server"""
+
+    @pytest.fixture
+    def server(self):
+        RedirectHandler.active = RedirectHandler.max_active = RedirectHandler.requests = 0
+        server = ThreadingHTTPServer(("127.0.0.1", 0), RedirectHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+
+        server.shutdown()
+        server.server_close()
+
+
+    def _resolver(self, server, **kwargs):
+        return ShortUrlResolver(prefixes=(server,), **kwargs)
+
+
+    def test_follows_redirects(self, server):
+        resolver = self._resolver(server)
+        assert resolver.resolve(f"{server}/a") == f"{server}/final"
+        # not a short link: returned as is, without a request
+        assert resolver.resolve("https://example.com/x") == "https://example.com/x"
+        resolver.close()
+
+
+    def test_unreachable(self):
+        resolver = ShortUrlResolver(prefixes=("http://127.0.0.1:9/",), timeout=1)
+        assert resolver.resolve("http://127.0.0.1:9/a") == "http://127.0.0.1:9/a"
+        resolver.close()
+
+
+    def test_fill_and_join(self, server):
+        """Test that filled lists keep the short links until join"""
+        resolver = self._resolver(server)
+        urls = [f"{server}/slow", f"{server}/a"]
+        filled = resolver.fill(urls)
+        assert filled is urls
+        resolver.join()
+        assert urls == [f"{server}/slow", f"{server}/final"]
+        resolver.close()
+
+
+    def test_in_flight_dedup(self, server):
+        resolver = self._resolver(server)
+        first = resolver.submit(f"{server}/slow")
+        second = resolver.submit(f"{server}/slow")
+        assert first is second
+        first.result()
+        assert RedirectHandler.requests == 1
+        assert (resolver.requested, resolver.shared) == (1, 1)
+        resolver.close()
+
+
+    def test_per_host_limit(self, server):
+        resolver = self._resolver(server, workers=8, per_host=2)
+        urls = resolver.fill([f"{server}/slow{i}" for i in range(6)])
+        resolver.join()
+        assert urls == [f"{server}/slow{i}" for i in range(6)]
+        assert RedirectHandler.max_active <= 2
+        resolver.close()
+
+
+    def test_persistent_cache(self, server, tmp_path):
+        """Test that a link resolved in a previous run is not requested again"""
+        path = str(tmp_path / "short_urls.db")
+        resolver = self._resolver(server, cache=Cache("short_urls", path=path))
+        assert resolver.resolve(f"{server}/a") == f"{server}/final"
+        resolver.close()
+        assert RedirectHandler.requests == 3
+
+        cache = Cache("short_urls", path=path)
+        resolver = self._resolver(server, cache=cache)
+        assert resolver.resolve(f"{server}/a") == f"{server}/final"
+        assert RedirectHandler.requests == 3
+        assert cache.get(f"{server}/a") == {
+            "url": f"{server}/final",
+            "chain": [f"{server}/a", f"{server}/b", f"{server}/final"],
+            "ok": True,
+        }
+        resolver.close()
+
+
+    def test_negative_cache(self):
+        """Test that a dead link is cached with its own ttl"""
+        cache = Cache("short_urls")
+        resolver = ShortUrlResolver(
+            prefixes=("http://127.0.0.1:9/",), timeout=1, cache=cache, fail_ttl=60
+        )
+        url = "http://127.0.0.1:9/a"
+        assert resolver.resolve(url) == url
+        assert cache.get(url)["ok"] is False
+        # expires after fail_ttl, not the default ok_ttl
+        assert cache.entries[url][0] <= time.time() + 60
+        assert resolver.resolve(url) == url
+        assert resolver.requested == 1
+        resolver.close()
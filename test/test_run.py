@@ -0,0 +1,69 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+# imports for the package
+import sys
+path_to_repo = Path(__file__).parent.parent
+sys.path.insert(0, str(path_to_repo))
+
+from scraper.record import TweetRecord
+from scraper.run import ScrapeRun
+from scraper.watermark import Watermark
+
+
+PAGE = "https://x.com/search?q=python&f=live"
+
+
+def tweet(tweet_id, error=False, is_ad=False):
+    return SimpleNamespace(
+        tweet_id=tweet_id,
+        date_time=None,
+        handle="@levelsio",
+        error=error,
+        is_ad=is_ad,
+        tweet=None if error else {"tweet_id": tweet_id, "handle": "@levelsio"},
+        poster_details={},
+        extraction_time=0.01,
+    )
+
+
+class TestScrapeRun:
+    """The tweets a scrape_tweets call keeps, and when it has enough"""
+
+    def test_take(self):
+        run = ScrapeRun(max_tweets=2)
+        assert not run.take(tweet("1", error=True))
+        assert not run.take(tweet("2", is_ad=True))
+        assert run.take(tweet("3"))
+        assert not run.full
+        assert run.take(tweet("4"))
+        assert run.full
+        assert [t["tweet_id"] for t in run.data] == ["3", "4"]
+        # every tweet read counts in the extraction time, kept or not
+        assert run.extracted == 4
+
+        run = ScrapeRun(max_tweets=1, no_tweets_limit=True, return_type="record")
+        run.take(tweet("3"))
+        run.take(tweet("4"))
+        assert not run.full
+        assert all(isinstance(record, TweetRecord) for record in run.data)
+
+
+    def test_watermark_slack(self, tmp_path):
+        path = str(tmp_path / "watermarks.json")
+        watermark = Watermark(path, PAGE)
+        watermark.advance("100", None)
+        watermark.save()
+
+        run = ScrapeRun(watermark_slack=2)
+        run.watermark = Watermark(path, PAGE)
+        # a pinned tweet older than the watermark does not stop the run
+        assert not run.take(tweet("90"))
+        assert run.take(tweet("120"))
+        assert not run.reached_watermark
+        assert not run.take(tweet("100"))
+        assert not run.take(tweet("99"))
+        assert run.reached_watermark
+        assert run.scraped_before(tweet("99"))
+        assert not run.scraped_before(tweet("120"))
+        assert run.watermark.newest_id == 120
@@ -0,0 +1,119 @@
+from pathlib import Path
+
+import pytest
+
+# imports for the package
+import sys
+path_to_repo = Path(__file__).parent.parent
+sys.path.insert(0, str(path_to_repo))
+
+from scraper.locators import get as selector
+from scraper.scroller import Scroller
+from scraper.waits import Waits
+
+# a feed loading 5 more cards, with a spinner, whenever its bottom is reached,
+# until it has 20
+FEED = """<html><body style="margin: 0">
+<div id="feed"></div>
+<script>
+  const feed = document.getElementById("feed");
+  let count = 0, loading = false;
+  const more = () => {
+    for (let i = 0; i < 5; i++, count++) {
+      feed.insertAdjacentHTML("beforeend",
+        `<article data-testid="tweet" style="height: 1000px">` +
+        `<a href="/user/status/${count}">tweet ${count}</a></article>`);
+    }
+  };
+  more();
+  window.addEventListener("scroll", () => {
+    const bottom = window.scrollY + window.innerHeight >= document.body.scrollHeight - 500;
+    if (!bottom || loading || count >= 20) return;
+    loading = true;
+    feed.insertAdjacentHTML("afterend", '<div id="spinner" role="progressbar"></div>');
+    setTimeout(() => {
+      document.getElementById("spinner").remove();
+      more();
+      loading = false;
+    }, 300);
+  });
+</script>
+</body></html>"""
+
+
+class TestScroller:
+    """The feed is scrolled until it stops growing, at the pace it renders"""
+
+    @pytest.fixture
+    def driver(self, driver, tmp_path):
+        html_path = tmp_path / "feed.html"
+        html_path.write_text(FEED)
+        driver.get(f"file://{html_path.absolute()}")
+        return driver
+
+
+    def _links(self, driver):
+        return {
+            card.find_element("css selector", "a").get_attribute("href")
+            for card in selector("tweet_cards").find_all(driver)
+        }
+
+
+    def test_end_of_feed(self, driver):
+        scroller = Scroller(driver, Waits(driver, "fast"), patience=2)
+        seen = set()
+        steps = 0
+        while True:
+            links = self._links(driver)
+            new = len(links - seen)
+            seen |= links
+            if not scroller.advance(new):
+                break
+            steps += 1
+            assert steps < 50
+
+        assert len(seen) == 20
+        assert not scroller.scrolling
+        assert scroller.end_reason == "no new tweets, no growth and nothing loading"
+        # the steps waiting for the next cards measured their latency
+        assert scroller.latency is not None
+        assert scroller.history[-1]["decision"] == "end"
+        assert "end of feed" in scroller.summary()
+
+
+    def test_step_size(self, driver):
+        scroller = Scroller(driver, Waits(driver, "fast"))
+        scroller.advance(3)
+        assert scroller.step == 1.25
+        assert scroller.history[0]["distance"] == int(1.25 * scroller.history[0]["viewport"])
+        # too many cards at once
+        scroller.advance(12)
+        assert scroller.step < 1.25
+
+
+    def test_bounded_history(self):
+        """Test that a long run keeps the last decisions only, and totals"""
+        class Feed:
+            # a page growing by a viewport whenever it is scrolled
+            height, y = 2000, 0
+
+            def execute_script(self, script, *args):
+                if script.startswith("window.scrollBy"):
+                    self.y += args[0]
+                    self.height += 1000
+                    return None
+                if "scrollHeight" in script:
+                    return {"height": self.height, "y": self.y, "viewport": 1000,
+                            "last": str(self.height), "spinner": False}
+                return self.y
+
+        class Waits:
+            def until(self, condition, timeout):
+                return condition(None)
+
+        scroller = Scroller(Feed(), Waits(), history_size=10)
+        for _ in range(50):
+            assert scroller.advance(1)
+        assert len(scroller.history) == 10
+        assert scroller.history[-1]["step"] == 49
+        assert scroller.summary().startswith("Scrolling: 50 steps")
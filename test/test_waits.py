@@ -0,0 +1,79 @@
+from pathlib import Path
+from time import perf_counter
+
+import pytest
+
+from _utils import load_page
+
+# imports for the package
+import sys
+path_to_repo = Path(__file__).parent.parent
+sys.path.insert(0, str(path_to_repo))
+
+from scraper import locators
+from scraper.locators import get as selector
+from scraper.waits import Waits
+
+
+class TestWaits:
+    """Readiness checks return as soon as the page is ready and give up
+    quietly otherwise"""
+
+    @pytest.fixture
+    def driver(self, driver):
+        load_page(driver, "single_tweet")
+        return driver
+
+
+    def test_invalid_profile(self, driver):
+        with pytest.raises(ValueError):
+            Waits(driver, "reckless")
+
+
+    def test_ready(self, driver):
+        waits = Waits(driver, "safe")
+        start = perf_counter()
+        assert waits.cards()
+        # no fixed delay when the cards are there already
+        assert perf_counter() - start < 1
+
+
+    def test_timeout(self, driver):
+        waits = Waits(driver, "fast")
+        assert waits.element("password_input", timeout=0.3) is None
+        count = len(selector("tweet_cards").find_all(driver))
+        assert not waits.cards_changed(count, timeout=0.3)
+
+
+    def test_changes(self, driver):
+        waits = Waits(driver)
+        card = selector("tweet_cards").find_all(driver)[0]
+        # detached later, then attached again: a card removed, then a new one
+        driver.execute_script(
+            "window.card = arguments[0];"
+            "setTimeout(() => window.card.remove(), 200);",
+            card,
+        )
+        assert waits.gone(card, timeout=5)
+
+        count = len(selector("tweet_cards").find_all(driver))
+        driver.execute_script(
+            "setTimeout(() => document.body.appendChild(window.card), 200);"
+        )
+        assert waits.cards_changed(count, timeout=5)
+
+
+    def test_not_in_selector_stats(self):
+        """Test that polling does not count as selector lookups"""
+        class Driver:
+            polls = 0
+
+            def find_elements(self, by, value):
+                self.polls += 1
+                return ["card"] if self.polls >= 3 else []
+
+        locators.reset_stats()
+        driver = Driver()
+        assert Waits(driver, "fast").element("tweet_cards") == "card"
+        assert driver.polls >= 3
+        assert locators.stats() == []
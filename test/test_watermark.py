@@ -0,0 +1,151 @@
+import json
+import multiprocessing
+from pathlib import Path
+
+import pytest
+
+# imports for the package
+import sys
+path_to_repo = Path(__file__).parent.parent
+sys.path.insert(0, str(path_to_repo))
+
+from scraper.watermark import Watermark
+
+
+PAGE = "https://x.com/search?q=python&f=live"
+
+
+def save_marks(path, worker):
+    # a pool worker saving the marks of its own targets
+    for target in range(20):
+        watermark = Watermark(path, f"{worker}/{target}")
+        watermark.advance(str(100 + target), None)
+        watermark.save()
+
+
+class TestWatermark:
+    """Newest tweet per page, kept between runs"""
+
+    def test_first_run(self, tmp_path):
+        watermark = Watermark(str(tmp_path / "watermarks.json"), PAGE)
+        assert not watermark.covers("1933920674323833170", "2025-06-14T16:13:13.000Z")
+        # nothing scraped: nothing written
+        watermark.save()
+        assert not (tmp_path / "watermarks.json").exists()
+
+
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / "watermarks.json")
+        watermark = Watermark(path, PAGE)
+        watermark.advance("1933114338073608453", "2025-06-12T10:49:08.000Z")
+        watermark.advance("1933920674323833170", "2025-06-14T16:13:13.000Z")
+        watermark.advance("1932954702255141031", "2025-06-12T00:14:48.000Z")
+        watermark.save()
+        Watermark(path, "https://x.com/home").save()
+
+        watermark = Watermark(path, PAGE)
+        assert watermark.since_id == 1933920674323833170
+        assert watermark.covers("1933920674323833170", None)
+        assert watermark.covers("1933114338073608453", None)
+        assert not watermark.covers("1933920674323833171", None)
+        # other pages have their own watermark
+        assert Watermark(path, "https://x.com/home").since_id is None
+        assert list(json.loads(Path(path).read_text())) == [PAGE]
+
+
+    def test_only_moves_forward(self, tmp_path):
+        path = str(tmp_path / "watermarks.json")
+        watermark = Watermark(path, PAGE)
+        watermark.advance("200", "2025-06-14T16:13:13.000Z")
+        watermark.save()
+
+        watermark = Watermark(path, PAGE)
+        watermark.advance("100", "2025-06-12T00:14:48.000Z")
+        watermark.save()
+        assert Watermark(path, PAGE).since_id == 200
+
+
+    def test_date_fallback(self, tmp_path):
+        """Test that tweets without an id are compared by date"""
+        path = str(tmp_path / "watermarks.json")
+        watermark = Watermark(path, PAGE)
+        watermark.advance("", "2025-06-14T16:13:13.000Z")
+        watermark.save()
+
+        watermark = Watermark(path, PAGE)
+        assert watermark.covers("", "2025-06-14T16:13:13.000Z")
+        assert not watermark.covers("", "2025-06-15T00:00:00.000Z")
+
+
+    def test_capped_run(self, tmp_path):
+        """Test that a run stopped before the watermark leaves no gap"""
+        path = str(tmp_path / "watermarks.json")
+        watermark = Watermark(path, PAGE)
+        watermark.advance("100", None)
+        watermark.save()
+
+        # newer tweets 101..150, the run stops after 150..141
+        watermark = Watermark(path, PAGE)
+        for tweet_id in range(150, 140, -1):
+            watermark.advance(str(tweet_id), None)
+        watermark.save(complete=False)
+
+        watermark = Watermark(path, PAGE)
+        assert watermark.since_id == 100
+        assert not watermark.covers("120", None)
+        assert not watermark.scraped("120", None)
+        assert watermark.scraped("145", None)
+
+        # a newer tweet, the ones scraped already skipped, then down to the watermark
+        watermark.advance("151", None)
+        assert watermark.scraped("150", None)
+        for tweet_id in range(140, 100, -1):
+            watermark.advance(str(tweet_id), None)
+        watermark.save(complete=True)
+        watermark = Watermark(path, PAGE)
+        assert watermark.since_id == 151
+        assert watermark.resume_ids is None
+
+
+    def test_capped_again(self, tmp_path):
+        path = str(tmp_path / "watermarks.json")
+        watermark = Watermark(path, PAGE)
+        watermark.advance("100", None)
+        watermark.save()
+        watermark = Watermark(path, PAGE)
+        watermark.advance("150", None)
+        watermark.advance("141", None)
+        watermark.save(complete=False)
+
+        # got down into the previous range: the two join
+        watermark = Watermark(path, PAGE)
+        watermark.advance("155", None)
+        watermark.scraped("150", None)
+        watermark.advance("130", None)
+        watermark.save(complete=False)
+        assert Watermark(path, PAGE).resume_ids == (130, 155)
+
+        # stopped before it: the older range is dropped, to be scraped again
+        watermark = Watermark(path, PAGE)
+        watermark.advance("170", None)
+        watermark.advance("160", None)
+        watermark.save(complete=False)
+        watermark = Watermark(path, PAGE)
+        assert watermark.resume_ids == (160, 170)
+        assert watermark.since_id == 100
+        assert not watermark.scraped("140", None)
+
+
+    def test_pool_workers(self, tmp_path):
+        """Test that scrapers saving at once keep each other's marks"""
+        path = str(tmp_path / "watermarks.json")
+        processes = [
+            multiprocessing.Process(target=save_marks, args=(path, worker))
+            for worker in range(4)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        assert all(process.exitcode == 0 for process in processes)
+        assert len(json.loads(Path(path).read_text())) == 80